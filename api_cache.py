@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+MediaWiki API Response Cache
+Stores API responses in an SQLite file keyed by the normalized query
+parameters, so a rerun of the crawler re-filters from disk instead of
+reissuing every categorymembers / subcat / imageinfo query.
+- each query type has its own TTL (file lists change more often than
+  subcategories or image URLs)
+- the file is bounded to max_bytes; least recently used entries go first
+- offline mode answers only from the cache (expired entries included)
+  and raises CacheMiss for anything else
+- an expired entry is still returned when the network request fails
+Bodies are stored zlib-compressed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, '.api-cache.sqlite')
+
+DAY = 24 * 3600
+
+# Seconds a response stays fresh, per query type
+DEFAULT_TTLS = {
+    'categorymembers': 1 * DAY,     # files come and go
+    'subcat': 7 * DAY,              # the category tree rarely changes
+    'imageinfo': 30 * DAY,          # thumbnail URLs of a file are stable
+    'other': 1 * DAY,
+}
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Parameters that do not change the answer
+_IGNORED_PARAMS = {'format', 'formatversion', 'maxlag', 'requestid', 'curtimestamp'}
+
+
+class CacheMiss(Exception):
+    """Offline mode and the query is not cached"""
+
+
+def normalize(params):
+    """Canonical text of the query parameters (order and pipe lists normalized)"""
+    items = {}
+    for name, value in params.items():
+        if name in _IGNORED_PARAMS:
+            continue
+        value = str(value)
+        # 'subcat|file' and 'file|subcat' are the same query; titles keep their order
+        if name in ('prop', 'iiprop', 'cmtype', 'gcmtype', 'list'):
+            value = '|'.join(sorted(value.split('|')))
+        items[name] = value
+    return json.dumps(items, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+
+def query_kind(params):
+    """TTL class of a query"""
+    cmtype = params.get('cmtype', params.get('gcmtype', ''))
+    if 'categorymembers' in (params.get('list'), params.get('generator')):
+        return 'subcat' if cmtype == 'subcat' else 'categorymembers'
+    if 'imageinfo' in str(params.get('prop', '')).split('|'):
+        return 'imageinfo'
+    return 'other'
+
+
+class ApiCache:
+    """
+    Usage:
+        cache = get_api_cache()
+        body = cache.get(params)            # None on a miss
+        ... body = fetch(...) ...
+        cache.put(params, body)
+        print(cache.report())
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttls=None, offline=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.offline = offline
+        self.refresh = False        # ignore cached answers (still stores new ones)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS responses (
+                                key TEXT PRIMARY KEY,
+                                kind TEXT NOT NULL,
+                                params TEXT NOT NULL,
+                                body BLOB NOT NULL,
+                                size INTEGER NOT NULL,
+                                fetched REAL NOT NULL,
+                                accessed REAL NOT NULL)''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stale_served': 0,
+                      'stored': 0, 'evicted': 0}
+
+    def get(self, params, stale_ok=False):
+        """Cached body, or None when missing/expired (offline: CacheMiss instead)"""
+        text = normalize(params)
+        key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            row = self._db.execute('SELECT kind, body, fetched FROM responses WHERE key = ?',
+                                   (key,)).fetchone()
+            if row and (stale_ok or not self.refresh):
+                kind, body, fetched = row
+                fresh = time.time() - fetched < self.ttls.get(kind, self.ttls['other'])
+                if fresh or self.offline or stale_ok:
+                    self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?',
+                                     (time.time(), key))
+                    self.stats['hits' if fresh else 'stale_served'] += 1
+                    return zlib.decompress(body)
+                self.stats['expired'] += 1
+            elif not stale_ok:
+                self.stats['misses'] += 1
+        if self.offline:
+            raise CacheMiss(f'not cached (offline): {text[:80]}')
+        return None
+
+    def put(self, params, body):
+        text = normalize(params)
+        key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        packed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (key, query_kind(params), text, packed, len(packed), now, now))
+            self.stats['stored'] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the total fits max_bytes"""
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+                'SELECT key, size FROM responses ORDER BY accessed').fetchall():
+            self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self.stats['evicted'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def size(self):
+        """(entries, bytes)"""
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+
+    def report(self):
+        """One-line summary for the end of a run"""
+        s = self.stats
+        entries, size = self.size()
+        mode = ' (offline)' if self.offline else ' (refresh)' if self.refresh else ''
+        return (f"API cache{mode}: {s['hits']} hits, {s['misses']} misses, "
+                f"{s['expired']} expired, {s['stale_served']} stale served, "
+                f"{s['stored']} stored, {s['evicted']} evicted; "
+                f"{entries} entries, {size / 1024:.0f} KB")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_api_cache():
+    """Shared cache used by the MediaWiki crawler"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ApiCache()
+        return _default_cache
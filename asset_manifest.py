@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Asset Manifest
+Records URL, ETag, Last-Modified, size and hash of every downloaded asset
+so reruns can send conditional GETs and only transfer changed bodies.
+A file whose size or hash no longer matches the manifest is re-downloaded.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:      # Windows
+    fcntl = None
+    import msvcrt
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(BASE_DIR, 'images', 'vehicles', '.manifest.json')
+
+
+def file_sha256(filepath):
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on a lock file, held across processes"""
+    with open(path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class AssetManifest:
+    """
+    filename -> {url, etag, last_modified, size, sha256, checked[, fallback_for]}
+
+    Usage:
+        manifest = get_manifest()
+        headers.update(manifest.conditional_headers(filename, url, filepath))
+        ... 304 -> manifest.touch(filename) / 200 -> manifest.record(...)
+        manifest.save()
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Corrupt manifest: start over, everything gets re-validated
+            return {}
+
+    def get(self, filename):
+        with self._lock:
+            return self.entries.get(filename)
+
+    def is_intact(self, filename, filepath):
+        """True if the file on disk still matches its recorded size and hash"""
+        entry = self.get(filename)
+        if not entry or not os.path.exists(filepath):
+            return False
+        if os.path.getsize(filepath) != entry.get('size'):
+            return False
+        return file_sha256(filepath) == entry.get('sha256')
+
+    def conditional_headers(self, filename, url, filepath):
+        """If-None-Match / If-Modified-Since for an intact file from the same URL"""
+        entry = self.get(filename)
+        if not entry or entry.get('url') != url or not self.is_intact(filename, filepath):
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, filename, url, size, sha256, etag=None, last_modified=None,
+               fallback_for=None):
+        """
+        Store the metadata of a freshly downloaded body
+        fallback_for: the file this one stands in for (another format of
+        the same image), so it can be removed once that file is back
+        """
+        with self._lock:
+            self.entries[filename] = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': size,
+                'sha256': sha256,
+                'checked': int(time.time()),
+            }
+            if fallback_for:
+                self.entries[filename]['fallback_for'] = fallback_for
+            self._dirty.add(filename)
+
+    def forget(self, filename):
+        """Drop the entry of a file that was removed"""
+        with self._lock:
+            if filename in self.entries:
+                del self.entries[filename]
+                self._dirty.add(filename)
+
+    def update_local(self, filename, size, sha256):
+        """The file was rewritten locally (e.g. optimized); keep the upstream validators"""
+        with self._lock:
+            if filename in self.entries:
+                self.entries[filename].update(size=size, sha256=sha256)
+                self._dirty.add(filename)
+
+    def touch(self, filename, fallback=False):
+        """
+        Mark an entry as revalidated (304 Not Modified)
+        Revalidating a file for itself (fallback=False) clears its fallback_for mark
+        """
+        with self._lock:
+            if filename in self.entries:
+                self.entries[filename]['checked'] = int(time.time())
+                if not fallback:
+                    self.entries[filename].pop('fallback_for', None)
+                self._dirty.add(filename)
+
+    def save(self):
+        # Merge into the file on disk so scripts running side by side
+        # don't drop each other's entries; the lock file keeps another
+        # process from saving between our load and replace
+        with self._lock:
+            if not self._dirty:
+                return
+            with _file_lock(self.path + '.lock'):
+                entries = self._load()
+                for filename in self._dirty:
+                    if filename in self.entries:
+                        entries[filename] = self.entries[filename]
+                    else:
+                        entries.pop(filename, None)
+                self.entries = entries
+                self._dirty.clear()
+                data = json.dumps(entries, ensure_ascii=False, indent=2, sort_keys=True)
+                tmp = f'{self.path}.{os.getpid()}.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp, self.path)
+
+
+_default_manifest = None
+_default_lock = threading.Lock()
+
+
+def get_manifest():
+    """Shared manifest used by all download scripts"""
+    global _default_manifest
+    with _default_lock:
+        if _default_manifest is None:
+            _default_manifest = AssetManifest()
+        return _default_manifest
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Asset Pipeline
+One entry point for every asset step, modelled as a dependency graph of
+targets. Each target has input files, output files and a command (one of
+the existing scripts). A target is rebuilt only when it is stale:
+- never built, or an output is missing
+- the content hash (sha256) of any input changed since the last build
+Independent targets run in parallel; output of each is printed as a block.
+A target may rewrite inputs of the targets it depends on (optimize
+recompresses the PNGs validate checked); those files are listed as its
+outputs, and the upstream fingerprints are refreshed after it runs, so
+the rewrite does not make them stale on the next run.
+
+Fingerprints and a hash cache (keyed by mtime and size) are kept in
+.asset-pipeline.json.
+
+Usage:
+    python3 asset_pipeline.py                 # build everything that is stale
+    python3 asset_pipeline.py atlas sprite    # just these (and their deps)
+    python3 asset_pipeline.py --plan          # show what would run and why
+    python3 asset_pipeline.py --force icons   # rebuild even if up to date
+    python3 asset_pipeline.py --offline       # skip targets that need network
+    python3 asset_pipeline.py --jobs 2
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(BASE_DIR, '.asset-pipeline.json')
+IMAGE_DIR = 'images/vehicles'
+ATLAS_DIR = 'images/vehicles/atlas'
+DEFAULT_JOBS = 4
+
+
+def _image_outputs(module, table, ext=None):
+    """Files a download script is expected to produce, from its mapping table"""
+    def outputs():
+        names = getattr(__import__(module), table)
+        if ext:
+            names = [os.path.splitext(name)[0] + ext for name in names]
+        return [f'{IMAGE_DIR}/{name}' for name in names]
+    return outputs
+
+
+class Target:
+    """
+    A build step
+    inputs/outputs: paths or glob patterns relative to BASE_DIR, or a
+    callable returning them
+    """
+
+    def __init__(self, name, command, inputs=(), outputs=(), deps=(), network=False):
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = deps
+        self.network = network
+
+    def input_files(self):
+        return _expand(self.inputs)
+
+    def output_files(self):
+        return _expand(self.outputs)
+
+
+def _expand(patterns):
+    if callable(patterns):
+        patterns = patterns()
+    files = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            files.update(os.path.relpath(p, BASE_DIR).replace(os.sep, '/')
+                         for p in glob.glob(os.path.join(BASE_DIR, pattern)))
+        else:
+            files.add(pattern)
+    return sorted(files)
+
+
+_IMAGES = _image_outputs('download_images', 'VEHICLE_IMAGES')
+_ICONS = _image_outputs('download_icons', 'VEHICLE_ICONS', '.svg')
+_TWEMOJI = _image_outputs('download_twemoji', 'TWEMOJI_VEHICLES')
+
+TARGETS = [
+    Target('icons', ['download_icons.py'],
+           inputs=['download_icons.py', 'svg_tools.py'],
+           outputs=_ICONS,
+           network=True),
+    Target('twemoji', ['download_twemoji.py'],
+           inputs=['download_twemoji.py'],
+           outputs=_TWEMOJI,
+           network=True),
+    # Falls back to the same Twemoji/Iconify files (and staging names), so
+    # it must not run alongside those two
+    Target('images', ['download_images.py'],
+           inputs=['download_images.py'],
+           outputs=_IMAGES,
+           deps=['icons', 'twemoji'],
+           network=True),
+    Target('construction', ['download_construction_vehicles.py'],
+           inputs=['download_construction_vehicles.py', 'keyword_matcher.py'],
+           outputs=['construction_vehicles_data.json'],
+           network=True),
+    Target('verify-icons', ['download_icons.py', '--verify-only'],
+           inputs=lambda: ['download_icons.py'] + _ICONS(),
+           outputs=['verify-icons.html'],
+           deps=['icons']),
+    Target('verify-twemoji', ['download_twemoji.py', '--verify-only'],
+           inputs=lambda: ['download_twemoji.py'] + _TWEMOJI(),
+           outputs=['verify-twemoji.html'],
+           deps=['twemoji']),
+    Target('validate', ['validate_assets.py'],
+           inputs=['validate_assets.py', 'png_codec.py', 'svg_tools.py',
+                   f'{IMAGE_DIR}/*.png', f'{IMAGE_DIR}/*.svg'],
+           deps=['images', 'icons', 'twemoji', 'construction']),
+    Target('optimize', ['optimize_images.py'],
+           inputs=['optimize_images.py', 'png_codec.py', 'jpeg_codec.py', f'{IMAGE_DIR}/*.png'],
+           outputs=[f'{IMAGE_DIR}/*.png', f'{IMAGE_DIR}/variants/*.png'],
+           deps=['validate']),
+    # After optimize, which rewrites the PNGs this checks
+    Target('vehicles-data', ['build_vehicles_data.py'],
+           inputs=['build_vehicles_data.py', 'construction_vehicles_data.json', 'download_icons.py',
+                   'download_twemoji.py', f'{IMAGE_DIR}/*.png', f'{IMAGE_DIR}/*.svg'],
+           outputs=['js/vehicles-data.js'],
+           deps=['optimize']),
+    Target('atlas', ['build_atlas.py'],
+           inputs=['build_atlas.py', 'png_codec.py', 'js/vehicles-data.js', f'{IMAGE_DIR}/*.png'],
+           outputs=[f'{ATLAS_DIR}/atlas.css', f'{ATLAS_DIR}/atlas.json', f'{ATLAS_DIR}/atlas.js'],
+           deps=['vehicles-data']),
+    Target('sprite', ['build_svg_sprite.py'],
+           inputs=['build_svg_sprite.py', 'svg_tools.py', 'js/vehicles-data.js', f'{IMAGE_DIR}/*.svg'],
+           outputs=[f'{ATLAS_DIR}/symbols.svg', f'{ATLAS_DIR}/symbols.js'],
+           deps=['vehicles-data']),
+    Target('dist', ['build_dist.py'],
+           inputs=['build_dist.py', '*.html', 'js/*.js', f'{IMAGE_DIR}/*.png', f'{IMAGE_DIR}/*.svg',
+                   f'{ATLAS_DIR}/*.png', f'{ATLAS_DIR}/*.svg', f'{ATLAS_DIR}/*.css', f'{ATLAS_DIR}/*.js'],
+           outputs=['dist/sw.js', 'dist/asset-manifest.json'],
+           deps=['vehicles-data', 'atlas', 'sprite']),
+    Target('bundle', ['bundle_pages.py'],
+           inputs=['bundle_pages.py', 'minify.py', 'vehicles.html', 'quiz.html', 'learn.html',
+                   'listen-quiz.html', 'js/*.js', f'{ATLAS_DIR}/*.css', f'{ATLAS_DIR}/*.js'],
+           outputs=['vehicles.min.html', 'quiz.min.html', 'learn.min.html', 'listen-quiz.min.html'],
+           deps=['vehicles-data', 'atlas', 'sprite']),
+    Target('precompress', ['precompress.py'],
+           inputs=['precompress.py', '*.html', 'js/*.js', 'verify/*/*.html', f'{IMAGE_DIR}/*.svg',
+                   f'{ATLAS_DIR}/*.css', f'{ATLAS_DIR}/*.js', f'{ATLAS_DIR}/*.svg'],
+           deps=['verify-icons', 'verify-twemoji', 'atlas', 'sprite', 'dist', 'bundle']),
+]
+
+
+class State:
+    """Fingerprints of built targets plus a sha256 cache keyed by (mtime, size)"""
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.fingerprints = data.get('fingerprints', {})
+        self.hashes = data.get('hashes', {})
+
+    def file_hash(self, relpath):
+        """sha256 of a file, or None if it does not exist"""
+        path = os.path.join(BASE_DIR, relpath)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = [st.st_mtime_ns, st.st_size]
+        with self._lock:
+            cached = self.hashes.get(relpath)
+        if cached and cached[:2] == key:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        with self._lock:
+            self.hashes[relpath] = key + [digest.hexdigest()]
+        return digest.hexdigest()
+
+    def fingerprint(self, target):
+        """Hash of the target definition and the content of its inputs"""
+        digest = hashlib.sha256(json.dumps(target.command).encode('utf-8'))
+        for relpath in target.input_files():
+            digest.update(f'\0{relpath}\0{self.file_hash(relpath)}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def save(self):
+        with self._lock:
+            data = {'fingerprints': self.fingerprints, 'hashes': self.hashes}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def stale_reason(target, state, force=False):
+    """Why the target needs a rebuild, or None if it is up to date"""
+    if force:
+        return 'forced'
+    old = state.fingerprints.get(target.name)
+    if old is None:
+        return 'never built'
+    missing = [p for p in target.output_files() if not os.path.exists(os.path.join(BASE_DIR, p))]
+    if missing:
+        more = f' (+{len(missing) - 1} more)' if len(missing) > 1 else ''
+        return f'output missing: {missing[0]}{more}'
+    if state.fingerprint(target) != old['fingerprint']:
+        changed = [p for p in target.input_files()
+                   if state.file_hash(p) != old.get('inputs', {}).get(p)]
+        if changed:
+            more = f' (+{len(changed) - 1} more)' if len(changed) > 1 else ''
+            return f'input changed: {changed[0]}{more}'
+        return 'inputs removed'
+    return None
+
+
+def upstream_of(target, targets):
+    """Every target the given one depends on, directly or indirectly"""
+    by_name = {t.name: t for t in targets}
+    found = set()
+    pending = list(target.deps)
+    while pending:
+        name = pending.pop()
+        if name not in found and name in by_name:
+            found.add(name)
+            pending.extend(by_name[name].deps)
+    return [t for t in targets if t.name in found]
+
+
+def record(target, targets, state):
+    """Fingerprint a built target, and refresh upstream ones whose inputs it rewrote"""
+    outputs = set(target.output_files())
+    rewritten = [t for t in upstream_of(target, targets)
+                 if t.name in state.fingerprints and outputs & set(t.input_files())]
+    for t in [target] + rewritten:
+        state.fingerprints[t.name] = {
+            'fingerprint': state.fingerprint(t),
+            'inputs': {p: state.file_hash(p) for p in t.input_files()},
+        }
+    state.save()
+
+
+def select(targets, names):
+    """The named targets plus everything they depend on, in graph order"""
+    by_name = {t.name: t for t in targets}
+    unknown = [n for n in names if n not in by_name]
+    if unknown:
+        raise SystemExit(f'Unknown target(s): {", ".join(unknown)}. '
+                         f'Known: {", ".join(by_name)}')
+    wanted = set()
+    pending = list(names or by_name)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].deps)
+    return [t for t in targets if t.name in wanted]
+
+
+def plan(targets, state, force=(), offline=False):
+    """[(target, reason or None)]; a rebuilt dependency makes dependents pending"""
+    rows = []
+    will_run = set()
+    for target in targets:
+        if offline and target.network:
+            rows.append((target, None))
+            continue
+        reason = stale_reason(target, state, target.name in force)
+        if reason is None:
+            upstream = [d for d in target.deps if d in will_run]
+            if upstream:
+                reason = f'after {", ".join(upstream)} (if its files change)'
+        if reason:
+            will_run.add(target.name)
+        rows.append((target, reason))
+    return rows
+
+
+def run_target(target):
+    """Run the target's script; returns (returncode, output, seconds)"""
+    start = time.time()
+    proc = subprocess.run([sys.executable] + target.command, cwd=BASE_DIR,
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          env=dict(os.environ, PYTHONIOENCODING='utf-8'))
+    return proc.returncode, proc.stdout.decode('utf-8', 'replace'), time.time() - start
+
+
+def build(targets, state, jobs=DEFAULT_JOBS, force=(), offline=False):
+    """Run stale targets, each as soon as its dependencies are done"""
+    names = {t.name for t in targets}
+    done = set()
+    failed = set()
+    results = {'built': [], 'fresh': [], 'failed': [], 'skipped': []}
+    pending = list(targets)
+    running = {}
+
+    def ready(target):
+        return all(d in done or d not in names for d in target.deps)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for target in [t for t in pending if ready(t) or any(d in failed for d in t.deps)]:
+                pending.remove(target)
+                if any(d in failed for d in target.deps):
+                    failed.add(target.name)
+                    results['skipped'].append(target.name)
+                    print(f'  [SKIP] {target.name}: dependency failed')
+                    continue
+                # Checked now, after dependencies have (re)written our inputs
+                reason = None if offline and target.network else \
+                    stale_reason(target, state, target.name in force)
+                if reason is None:
+                    done.add(target.name)
+                    results['fresh'].append(target.name)
+                    print(f'  [FRESH] {target.name}')
+                    continue
+                print(f'  [RUN] {target.name}: {reason}')
+                running[pool.submit(run_target, target)] = target
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                target = running.pop(future)
+                code, output, seconds = future.result()
+                print(f'\n----- {target.name} ({seconds:.1f}s) -----')
+                print(output.rstrip())
+                print('-' * 40)
+
+                missing = [p for p in target.output_files()
+                           if not os.path.exists(os.path.join(BASE_DIR, p))]
+                if code != 0 or missing:
+                    failed.add(target.name)
+                    results['failed'].append(target.name)
+                    why = f'exit code {code}' if code else f'{len(missing)} outputs missing'
+                    print(f'  [FAIL] {target.name}: {why}')
+                    continue
+
+                record(target, targets, state)
+                done.add(target.name)
+                results['built'].append(target.name)
+                print(f'  [DONE] {target.name}')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the vehicle assets incrementally')
+    parser.add_argument('targets', nargs='*', help='targets to build (default: all)')
+    parser.add_argument('--plan', action='store_true', help='show what would run and why')
+    parser.add_argument('--force', action='store_true', help='rebuild the named targets even if fresh')
+    parser.add_argument('--offline', action='store_true', help='treat network targets as up to date')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help='targets run in parallel')
+    args = parser.parse_args()
+
+    targets = select(TARGETS, args.targets)
+    force = set(args.targets or [t.name for t in targets]) if args.force else set()
+    state = State()
+
+    print('=' * 60)
+    print('Asset Pipeline' + (' (plan)' if args.plan else ''))
+    print('=' * 60)
+
+    if args.plan:
+        rows = plan(targets, state, force, args.offline)
+        for target, reason in rows:
+            deps = f" <- {', '.join(target.deps)}" if target.deps else ''
+            status = 'run ' if reason else 'ok  '
+            print(f"  {status} {target.name:<16}{reason or 'up to date'}{deps}")
+        state.save()
+        print(f'\n{sum(1 for _, r in rows if r)} of {len(rows)} targets would run')
+        print('=' * 60)
+        return
+
+    results = build(targets, state, args.jobs, force, args.offline)
+    state.save()
+
+    print('\n' + '=' * 60)
+    print(f"Built: {len(results['built'])}, up to date: {len(results['fresh'])}, "
+          f"failed: {len(results['failed'])}, skipped: {len(results['skipped'])}")
+    if results['failed']:
+        print(f"Failed: {', '.join(results['failed'])}")
+    print('=' * 60)
+    if results['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
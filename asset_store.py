@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Content-addressed Asset Store
+Fetches each source URL once per run, even when several map entries (and
+several worker threads) ask for it, and stores each distinct body once.
+Aliases with the same content are materialized as hardlinks (or copies
+when the filesystem does not support links).
+
+Bodies are streamed in chunks to a .part file, fsynced and renamed into
+place, so an interrupted run never leaves a truncated asset behind. A
+leftover .part is resumed with an HTTP Range request on the next run.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+
+from http_pool import HTTPError, get_pool
+
+# Bytes read from the network per chunk
+CHUNK_SIZE = 64 * 1024
+
+# Bytes of the body handed to validate() callbacks
+HEAD_SIZE = 1024
+
+# Result of a download:
+#   status: 200 (new body) or 304 (not modified, file untouched)
+#   saved: 'written', 'linked', 'copied' or None for 304
+Downloaded = namedtuple('Downloaded', 'status saved size sha256 etag last_modified')
+
+
+class DownloadTooLarge(Exception):
+    """Body is bigger than the caller's max_bytes cap"""
+
+
+class InvalidContent(Exception):
+    """validate() rejected the downloaded body"""
+
+
+class DownloadCancelled(Exception):
+    """The caller's cancel event was set while the body was streaming"""
+
+
+def _fsync_dir(path):
+    # Make the rename itself durable (not supported on Windows)
+    if os.name != 'posix':
+        return
+    fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class AssetStore:
+    """
+    Deduplicates downloads by URL and writes by body hash
+
+    Usage:
+        store = get_store()
+        result = store.download(url, filepath, headers, max_bytes=256 * 1024,
+                                validate=lambda head, size: None if ok else 'reason',
+                                verify=lambda path: None if ok else 'reason')
+        if result.status == 304: ...   # unchanged
+        result.saved                   # 'written', 'linked' or 'copied'
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool or get_pool()
+        self._downloads = {}     # (url, validators) -> Future((first path, Downloaded))
+        self._paths = {}         # sha256 -> first path written this run
+        self._moved = {}         # path -> where move() put it
+        self._lock = threading.Lock()
+        self._move_lock = threading.Lock()
+        self.stats = {
+            'fetched': 0,
+            'deduped': 0,
+            'resumed': 0,
+            'written': 0,
+            'linked': 0,
+        }
+
+    def download(self, url, filepath, headers=None, timeout=None, max_bytes=None, validate=None,
+                 cancel=None, verify=None):
+        """
+        Stream url into filepath (atomic); repeated URLs are fetched once
+        and later callers get a link to the first copy.
+        validate(head, size) sees the first HEAD_SIZE bytes; verify(path)
+        gets the complete .part file, for checks that need the whole body.
+        Either rejects the body by returning an error string, and filepath
+        is left untouched.
+        cancel: optional threading.Event; once set the body stops streaming
+        and the partial file is dropped.
+        Raises HTTPError, DownloadTooLarge, InvalidContent, DownloadCancelled or OSError.
+        """
+        headers = headers or {}
+        key = (url, headers.get('If-None-Match'), headers.get('If-Modified-Since'))
+        with self._lock:
+            future = self._downloads.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._downloads[key] = future
+                self.stats['fetched'] += 1
+            else:
+                self.stats['deduped'] += 1
+
+        if owner:
+            try:
+                result = self._download(url, filepath, headers, timeout, max_bytes, validate, cancel,
+                                        verify)
+                future.set_result((filepath, result))
+            except Exception as e:
+                # Let a later call retry instead of caching the failure
+                with self._lock:
+                    self._downloads.pop(key, None)
+                future.set_exception(e)
+            return future.result()[1]
+
+        try:
+            source, result = future.result()
+        except DownloadCancelled:
+            # Someone else's download was cancelled, not ours: fetch it ourselves
+            if cancel is not None and cancel.is_set():
+                raise
+            return self.download(url, filepath, headers, timeout, max_bytes, validate, cancel, verify)
+        if result.status != 200:
+            return result
+        with self._move_lock:
+            saved = self._place(self._moved.get(source, source), filepath, result.sha256)
+        return result._replace(saved=saved)
+
+    def move(self, source, dest):
+        """Rename a downloaded file; later callers of the same URL link to the new name"""
+        with self._move_lock:
+            os.replace(source, dest)
+            _fsync_dir(dest)
+            with self._lock:
+                self._moved[source] = dest
+                for sha256, path in self._paths.items():
+                    if path == source:
+                        self._paths[sha256] = dest
+
+    def _download(self, url, filepath, headers, timeout, max_bytes, validate, cancel, verify):
+        part = filepath + '.part'
+        meta_path = part + '.json'
+        headers = dict(headers)
+
+        # Resume an interrupted body from the same URL (If-Range needs a
+        # strong ETag or a Last-Modified date)
+        offset = 0
+        meta = self._read_meta(meta_path)
+        if os.path.exists(part) and meta.get('url') == url:
+            etag = meta.get('etag') or ''
+            validator = (etag if not etag.startswith('W/') else '') or meta.get('last_modified')
+            offset = os.path.getsize(part)
+            if validator and offset:
+                headers.pop('If-None-Match', None)
+                headers.pop('If-Modified-Since', None)
+                headers['Range'] = f'bytes={offset}-'
+                headers['If-Range'] = validator
+            else:
+                offset = 0
+
+        with self.pool.request('GET', url, headers=headers, timeout=timeout,
+                               allow_errors=True) as response:
+            if response.status == 304:
+                return Downloaded(304, None, None, None,
+                                  response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            if response.status == 416 and offset:
+                # Our .part no longer fits the source; start over next time
+                _remove(part)
+                _remove(meta_path)
+            if response.status not in (200, 206):
+                raise HTTPError(url, response.status, response.reason, response.headers)
+            if response.status == 200:
+                offset = 0
+
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            length = response.headers.get('Content-Length')
+            if max_bytes and length and length.isdigit() and offset + int(length) > max_bytes:
+                raise DownloadTooLarge(f'{offset + int(length)} bytes > cap {max_bytes}')
+
+            self._write_meta(meta_path, url, etag, last_modified)
+            digest = hashlib.sha256()
+            size = offset
+            with open(part, 'r+b' if offset else 'wb') as f:
+                if offset:
+                    # Hash the bytes we already have, then append
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                    self._count('resumed')
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        break
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_bytes and size > max_bytes:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+        if max_bytes and size > max_bytes:
+            _remove(part)
+            _remove(meta_path)
+            raise DownloadTooLarge(f'more than cap {max_bytes} bytes')
+        if cancel is not None and cancel.is_set():
+            _remove(part)
+            _remove(meta_path)
+            raise DownloadCancelled(url)
+
+        if validate:
+            with open(part, 'rb') as f:
+                head = f.read(HEAD_SIZE)
+            error = validate(head, size)
+            if error:
+                _remove(part)
+                _remove(meta_path)
+                raise InvalidContent(error)
+        if verify:
+            error = verify(part)
+            if error:
+                _remove(part)
+                _remove(meta_path)
+                raise InvalidContent(error)
+
+        sha256 = digest.hexdigest()
+        saved = self._place(part, filepath, sha256, rename=True)
+        _remove(meta_path)
+        return Downloaded(200, saved, size, sha256, etag, last_modified)
+
+    def _place(self, source, filepath, sha256, rename=False):
+        """Move/link a finished body into filepath, reusing an identical file"""
+        with self._lock:
+            existing = self._paths.get(sha256)
+            if existing is None or not os.path.exists(existing):
+                self._paths[sha256] = filepath
+                existing = None
+
+        if existing is None or os.path.abspath(existing) == os.path.abspath(filepath):
+            if rename:
+                # Rename over the old file, so an old hardlink alias keeps its content
+                os.replace(source, filepath)
+                _fsync_dir(filepath)
+                self._count('written')
+                return 'written'
+            existing = source
+
+        if rename:
+            _remove(source)
+        saved = link_or_copy(existing, filepath)
+        self._count('linked')
+        return saved
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta_path, url, etag, last_modified):
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'etag': etag, 'last_modified': last_modified}, f)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def report(self):
+        s = self.stats
+        return (f"Dedup: {s['fetched']} fetched, {s['deduped']} repeated URLs skipped, "
+                f"{s['resumed']} resumed, {s['written']} files written, "
+                f"{s['linked']} aliases linked")
+
+
+def link_or_copy(source, dest):
+    """Replace dest with a hardlink to source, falling back to a copy"""
+    tmp = dest + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(source, tmp)
+        status = 'linked'
+    except OSError:
+        shutil.copyfile(source, tmp)
+        status = 'copied'
+    os.replace(tmp, dest)
+    return status
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_store():
+    """Shared store used by all download scripts"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = AssetStore()
+        return _default_store
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Download Benchmark (offline)
+Starts a local HTTP server that stands in for flaticon, Iconify (and its
+mirrors), jsDelivr/cdnjs Twemoji and Wikimedia Commons (API and uploads),
+then runs each download script unmodified against it and reports wall
+time, requests per second, bytes and retries.
+
+Each host has a profile: latency + jitter before the headers, bandwidth
+of the body, a share of 500 errors, 429 bursts (every N requests the next
+M are refused with Retry-After) and, for the API, maxlag refusals. The
+scripts reach the server through $ASSET_HOST_OVERRIDES (see http_pool.py)
+and run in a temporary copy of the repo, so images/ is never touched.
+Counters are taken on the server side; a "retry" is a request for a URL
+the same run already asked for.
+
+Results are written as JSON (default bench_results/downloads-<commit>.json);
+--compare prints the change against an earlier result file.
+
+Usage: python3 bench_downloads.py [images icons twemoji construction]
+           [--runs 2] [--latency 0.2] [--error-rate 0.05] [--compare old.json]
+"""
+
+import argparse
+import glob
+import hashlib
+import http.server
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import zlib
+
+from bench_keyword_matcher import make_titles
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, 'bench_results')
+
+# Script runs benchmarked, by name
+SCRIPTS = {
+    'images': 'download_images.py',
+    'icons': 'download_icons.py',
+    'twemoji': 'download_twemoji.py',
+    'construction': 'download_construction_vehicles.py',
+}
+SCRIPT_TIMEOUT = 900
+
+# Hosts the server plays, and what they serve
+HOSTS = {
+    'cdn-icons-png.flaticon.com': 'png',
+    'cdn.jsdelivr.net': 'png',
+    'cdnjs.cloudflare.com': 'png',
+    'api.iconify.design': 'svg',
+    'api.simplesvg.com': 'svg',
+    'api.unisvg.com': 'svg',
+    'upload.wikimedia.org': 'jpeg',
+    'commons.wikimedia.org': 'mediawiki',
+}
+
+DEFAULT_PROFILE = {
+    'latency': 0.05,        # seconds before the response headers
+    'jitter': 0.05,         # plus a random 0..jitter seconds
+    'bandwidth': 2000000,   # body bytes/second per response (0 = unlimited)
+    'error_rate': 0.01,     # share of requests answered with a 500
+    'burst_every': 100,     # every burst_every requests to a host ...
+    'burst_length': 3,      # ... the last burst_length get a 429 (0 = never)
+    'retry_after': 1,       # Retry-After of those 429s
+    'maxlag_rate': 0.0,     # share of API requests refused with a maxlag error
+}
+
+# Roughly how the real hosts behave
+HOST_PROFILES = {
+    'cdn-icons-png.flaticon.com': {'latency': 0.15, 'jitter': 0.3, 'error_rate': 0.03,
+                                   'burst_every': 40},
+    'api.iconify.design': {'latency': 0.08},
+    'upload.wikimedia.org': {'latency': 0.1, 'bandwidth': 1000000},
+    'commons.wikimedia.org': {'latency': 0.12, 'maxlag_rate': 0.02},
+}
+
+# Category tree served by the API stand-in
+SUBCATS_PER_CATEGORY = 2
+FILES_PER_CATEGORY = 80
+
+# Body sent per chunk when the bandwidth is limited
+CHUNK_SIZE = 16 * 1024
+
+
+def asset_body(kind, path):
+    """Deterministic body for an asset URL"""
+    seed = hashlib.sha256(path.encode('utf-8')).digest()
+    if kind == 'svg':
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 128 128">'
+                f'<circle cx="64" cy="64" r="{20 + seed[0] % 40}" fill="#{seed[:3].hex()}"/>'
+                f'</svg>').encode('utf-8')
+    if kind == 'png':
+        head, size = b'\x89PNG\r\n\x1a\n', 1500 + seed[0] * 16
+    else:
+        head, size = b'\xff\xd8\xff\xe0', 12000 + seed[0] * 64
+    return head + (seed * (size // len(seed) + 1))[:size]
+
+
+def category_members(category, types):
+    """Subcategories first, then files, like the real API"""
+    members = []
+    if 'subcat' in types and '/' not in category:
+        members += [{'pageid': zlib.crc32(f'{category}/{i}'.encode()), 'ns': 14,
+                     'title': f'Category:{category}/{i}'} for i in range(SUBCATS_PER_CATEGORY)]
+    if 'file' in types:
+        titles = make_titles(FILES_PER_CATEGORY, seed=zlib.crc32(category.encode('utf-8')))
+        members += [{'pageid': zlib.crc32(t.encode('utf-8')), 'ns': 6, 'title': t} for t in titles]
+    return members
+
+
+def mediawiki_response(query):
+    """JSON answer of the API stand-in (categorymembers and imageinfo only)"""
+    if query.get('list') == 'categorymembers':
+        category = query['cmtitle'].split(':', 1)[1]
+        members = category_members(category, query.get('cmtype', 'page|subcat|file').split('|'))
+        offset = int(query.get('cmcontinue', 0))
+        limit = int(query.get('cmlimit', 10))
+        data = {'batchcomplete': '', 'query': {'categorymembers': members[offset:offset + limit]}}
+        if offset + limit < len(members):
+            data['continue'] = {'cmcontinue': str(offset + limit), 'continue': '-||'}
+        return data
+
+    if 'titles' in query and 'imageinfo' in query.get('prop', ''):
+        pages = {}
+        for title in query['titles'].split('|'):
+            name = urllib.parse.quote(title.split(':', 1)[1].replace(' ', '_'))
+            digest = hashlib.md5(name.encode('utf-8')).hexdigest()
+            url = f'https://upload.wikimedia.org/wikipedia/commons/{digest[0]}/{digest[:2]}/{name}'
+            thumb = f'https://upload.wikimedia.org/wikipedia/commons/thumb/{digest[0]}/{digest[:2]}/{name}/256px-{name}'
+            pageid = zlib.crc32(title.encode('utf-8'))
+            pages[str(pageid)] = {'pageid': pageid, 'ns': 6, 'title': title,
+                                  'imageinfo': [{'thumburl': thumb, 'url': url}]}
+        return {'batchcomplete': '', 'query': {'pages': pages}}
+
+    return {'batchcomplete': ''}
+
+
+class SimulatedHandler(http.server.BaseHTTPRequestHandler):
+    # Keep-alive, like the real CDNs
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        sim = self.server
+        host = (self.headers.get('Host') or '').rsplit(':', 1)[0]
+        kind = HOSTS.get(host)
+        profile = sim.profile(host)
+        count = sim.count_request(host, self.path)
+        time.sleep(profile['latency'] + sim.random() * profile['jitter'])
+
+        if kind is None:
+            return self.reply(host, 404, b'unknown host')
+        every, length = profile['burst_every'], profile['burst_length']
+        if every and length and count % every >= every - length:
+            return self.reply(host, 429, b'slow down', {'Retry-After': str(profile['retry_after'])})
+        if sim.random() < profile['error_rate']:
+            return self.reply(host, 500, b'simulated error')
+
+        if kind == 'mediawiki':
+            query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+            if 'maxlag' in query and sim.random() < profile['maxlag_rate']:
+                data = {'error': {'code': 'maxlag', 'info': 'Waiting for a database server', 'lag': 1}}
+                return self.reply(host, 200, json.dumps(data).encode('utf-8'),
+                                  {'Content-Type': 'application/json', 'Retry-After': '1'})
+            body = json.dumps(mediawiki_response(query)).encode('utf-8')
+            return self.reply(host, 200, body, {'Content-Type': 'application/json'},
+                              profile['bandwidth'])
+
+        body = asset_body(kind, urllib.parse.urlsplit(self.path).path)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.reply(host, 304, b'', {'ETag': etag})
+        content_type = {'png': 'image/png', 'svg': 'image/svg+xml', 'jpeg': 'image/jpeg'}[kind]
+        self.reply(host, 200, body, {'Content-Type': content_type, 'ETag': etag},
+                   profile['bandwidth'])
+
+    def reply(self, host, status, body, headers=None, bandwidth=0):
+        sent = 0
+        try:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            for start in range(0, len(body), CHUNK_SIZE):
+                chunk = body[start:start + CHUNK_SIZE]
+                if bandwidth:
+                    time.sleep(len(chunk) / bandwidth)
+                self.wfile.write(chunk)
+                sent += len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (a cancelled hedge)
+            self.close_connection = True
+        self.server.count_response(host, status, sent)
+
+
+class SimulatedCDN(http.server.ThreadingHTTPServer):
+    """Local stand-in for every host in HOSTS"""
+
+    daemon_threads = True
+
+    def __init__(self, profiles, seed=1):
+        super().__init__(('127.0.0.1', 0), SimulatedHandler)
+        self.profiles = profiles
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections when they exit are expected
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    def profile(self, host):
+        return self.profiles.get(host, self.profiles['default'])
+
+    def random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+            self._seen = set()
+
+    def _host(self, host):
+        return self.stats.setdefault(host, {'requests': 0, 'retries': 0, 'bytes': 0, 'status': {}})
+
+    def count_request(self, host, path):
+        """Number of this request at the host (from 1)"""
+        with self._lock:
+            s = self._host(host)
+            s['requests'] += 1
+            if (host, path) in self._seen:
+                s['retries'] += 1
+            self._seen.add((host, path))
+            return s['requests']
+
+    def count_response(self, host, status, sent):
+        with self._lock:
+            s = self._host(host)
+            s['bytes'] += sent
+            s['status'][str(status)] = s['status'].get(str(status), 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, name='simulated-cdn', daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        return False
+
+
+def build_profiles(overrides):
+    """Effective profile per host: defaults, HOST_PROFILES, then command line overrides"""
+    profiles = {'default': dict(DEFAULT_PROFILE, **overrides)}
+    for host in HOSTS:
+        profiles[host] = {**DEFAULT_PROFILE, **HOST_PROFILES.get(host, {}), **overrides}
+    return profiles
+
+
+def make_workspace():
+    """Temporary copy of the scripts (and js/, read by the verify pages)"""
+    workspace = tempfile.mkdtemp(prefix='bench-downloads-')
+    for path in glob.glob(os.path.join(BASE_DIR, '*.py')):
+        shutil.copy2(path, workspace)
+    shutil.copytree(os.path.join(BASE_DIR, 'js'), os.path.join(workspace, 'js'))
+    return workspace
+
+
+def count_files(workspace):
+    image_dir = os.path.join(workspace, 'images', 'vehicles')
+    if not os.path.isdir(image_dir):
+        return 0
+    return sum(1 for name in os.listdir(image_dir)
+               if not name.startswith('.') and os.path.isfile(os.path.join(image_dir, name)))
+
+
+def run_script(name, workspace, env, server, run):
+    server.reset()
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, SCRIPTS[name]], cwd=workspace, env=env,
+                          capture_output=True, text=True, encoding='utf-8',
+                          errors='replace', timeout=SCRIPT_TIMEOUT)
+    wall = time.perf_counter() - start
+    hosts = server.snapshot()
+
+    totals = {'requests': 0, 'retries': 0, 'bytes': 0, 'throttled': 0, 'errors': 0,
+              'not_modified': 0}
+    for s in hosts.values():
+        totals['requests'] += s['requests']
+        totals['retries'] += s['retries']
+        totals['bytes'] += s['bytes']
+        totals['throttled'] += s['status'].get('429', 0)
+        totals['errors'] += sum(n for code, n in s['status'].items() if code.startswith('5'))
+        totals['not_modified'] += s['status'].get('304', 0)
+
+    done = re.findall(r'^Done! (.*)$', proc.stdout, re.M)
+    return dict(script=name, run=run, wall_s=round(wall, 3),
+                rps=round(totals['requests'] / wall, 2) if wall else 0.0,
+                **totals, files=count_files(workspace), summary=done[-1] if done else None,
+                returncode=proc.returncode, hosts=hosts,
+                stderr=proc.stderr[-2000:] if proc.returncode else '')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_result(r):
+    print(f"  {r['script']:<13}{r['run']:>3} {r['wall_s']:8.2f}s {r['rps']:8.1f} req/s "
+          f"{r['requests']:6} req {r['bytes'] / 1024:9.0f} KB {r['retries']:5} retries "
+          f"{r['throttled']:4} x429 {r['errors']:4} x5xx {r['not_modified']:4} x304 {r['files']:5} files")
+    if r['returncode']:
+        print(f"    [FAIL] exit code {r['returncode']}: {r['stderr'].strip().splitlines()[-1:]}")
+
+
+def compare(results, path):
+    """Print the change of each (script, run) against an earlier result file"""
+    with open(path, encoding='utf-8') as f:
+        old = json.load(f)
+    before = {(r['script'], r['run']): r for r in old['results']}
+    print(f"\nCompared with {os.path.basename(path)} (commit {old.get('commit')}):")
+    for r in results:
+        o = before.get((r['script'], r['run']))
+        if o is None:
+            continue
+
+        def change(key):
+            return f"{(r[key] - o[key]) * 100 / o[key]:+.0f}%" if o[key] else 'n/a'
+        print(f"  {r['script']:<13}{r['run']:>3}  wall {o['wall_s']:.2f}s -> {r['wall_s']:.2f}s "
+              f"({change('wall_s')}), req/s {change('rps')}, retries {o['retries']} -> {r['retries']}, "
+              f"files {o['files']} -> {r['files']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the download scripts against a local CDN stand-in')
+    parser.add_argument('scripts', nargs='*', default=list(SCRIPTS),
+                        help=f'scripts to run (default: all of {", ".join(SCRIPTS)})')
+    parser.add_argument('--runs', type=int, default=1,
+                        help='runs per script in the same workspace (2nd run = warm caches)')
+    for key, value in DEFAULT_PROFILE.items():
+        parser.add_argument('--' + key.replace('_', '-'), type=type(value),
+                            help=f'set {key} for every host (default {value}, some hosts differ)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='result file (default bench_results/downloads-<commit>.json)')
+    parser.add_argument('--compare', help='earlier result file to compare with')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary workspaces')
+    args = parser.parse_args()
+    unknown = [name for name in args.scripts if name not in SCRIPTS]
+    if unknown:
+        parser.error(f'unknown script {unknown[0]!r} (choose from {", ".join(SCRIPTS)})')
+
+    overrides = {key: getattr(args, key) for key in DEFAULT_PROFILE if getattr(args, key) is not None}
+    profiles = build_profiles(overrides)
+    commit = git_commit()
+
+    print('=' * 60)
+    print('Download Benchmark (local CDN stand-in)')
+    print('=' * 60)
+    print(f'\nCommit: {commit}, scripts: {" ".join(args.scripts)}, runs: {args.runs}')
+    if overrides:
+        print(f'Profile overrides: {overrides}')
+    print()
+
+    results = []
+    with SimulatedCDN(profiles, seed=args.seed) as server:
+        port = server.server_address[1]
+        env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONDONTWRITEBYTECODE='1')
+        env['ASSET_HOST_OVERRIDES'] = json.dumps({host: f'127.0.0.1:{port}' for host in HOSTS})
+        for name in args.scripts:
+            workspace = make_workspace()
+            try:
+                for run in range(1, args.runs + 1):
+                    result = run_script(name, workspace, env, server, run)
+                    print_result(result)
+                    results.append(result)
+            finally:
+                if args.keep:
+                    print(f'    workspace: {workspace}')
+                else:
+                    shutil.rmtree(workspace, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'downloads-{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'commit': commit, 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'python': platform.python_version(), 'seed': args.seed,
+                   'profiles': profiles, 'results': results}, f, indent=1)
+    print(f'\nResults: {output}')
+
+    if args.compare:
+        compare(results, args.compare)
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher Micro-benchmark
+Runs synthetic Wikimedia-style titles through the old linear substring scan
+and the trie-based KeywordMatcher, and reports timing and differing results.
+
+Usage: python3 bench_keyword_matcher.py [count]
+"""
+
+import random
+import re
+import sys
+import time
+
+from download_construction_vehicles import CONSTRUCTION_KEYWORDS, extract_vehicle_name
+from keyword_matcher import KeywordMatcher
+
+# Filler words for synthetic titles
+FILLER = [
+    'yellow', 'old', 'new', 'site', 'in', 'action', 'at', 'work', 'city', 'road',
+    'berlin', 'tokyo', 'caterpillar', 'komatsu', 'liebherr', 'volvo', 'jcb', 'hitachi',
+    'museum', 'parked', 'near', 'bridge', 'railway', 'station', 'harbour', 'quarry',
+    'building', 'demolition', 'mining', 'winter', 'summer', 'view', 'detail', 'cab',
+]
+
+EXTENSIONS = ['jpg', 'JPG', 'jpeg', 'png', 'svg', 'webp']
+
+
+def make_titles(count, seed=42):
+    """Deterministic synthetic titles; about 70% contain a keyword"""
+    rng = random.Random(seed)
+    titles = []
+    for i in range(count):
+        words = rng.sample(FILLER, rng.randint(2, 6))
+        if rng.random() < 0.7:
+            keyword = rng.choice(CONSTRUCTION_KEYWORDS)
+            if rng.random() < 0.2:
+                keyword += 's'
+            words.insert(rng.randint(0, len(words)), keyword)
+        if rng.random() < 0.3:
+            words = [w.capitalize() for w in words]
+        sep = rng.choice([' ', ' ', '_', '-'])
+        titles.append(f'File:{sep.join(words)} {i % 1000}.{rng.choice(EXTENSIONS)}')
+    return titles
+
+
+def old_extract_vehicle_name(wiki_title, keywords=CONSTRUCTION_KEYWORDS):
+    """The original O(keywords) substring scan, first hit wins"""
+    name = wiki_title.replace('File:', '')
+    name = re.sub(r'\.(jpg|jpeg|png|gif|svg|webp)$', '', name, flags=re.IGNORECASE)
+    name_lower = name.lower()
+    for keyword in keywords:
+        if keyword in name_lower:
+            return name, keyword
+    return name, None
+
+
+def new_extract_vehicle_name(keywords):
+    """extract_vehicle_name() with a matcher built from another keyword list"""
+    matcher = KeywordMatcher(keywords)
+
+    def extract(wiki_title):
+        name = wiki_title.replace('File:', '')
+        name = re.sub(r'\.(jpg|jpeg|png|gif|svg|webp)$', '', name, flags=re.IGNORECASE)
+        return name, matcher.match(name)
+
+    return extract
+
+
+def run(label, func, titles):
+    start = time.perf_counter()
+    results = [func(t)[1] for t in titles]
+    elapsed = time.perf_counter() - start
+    matched = sum(1 for r in results if r)
+    print(f'  {label:<8} {elapsed:8.3f}s  {len(titles) / elapsed:>10,.0f} titles/s  '
+          f'matched: {matched:,}')
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print('=' * 60)
+    print('Keyword Matcher Benchmark')
+    print('=' * 60)
+    print(f'\nTitles: {count:,}, keywords: {len(CONSTRUCTION_KEYWORDS)}\n')
+
+    titles = make_titles(count)
+    old = run('old', old_extract_vehicle_name, titles)
+    new = run('new', extract_vehicle_name, titles)
+
+    diffs = [(t, o, n) for t, o, n in zip(titles, old, new) if o != n]
+    print(f'\nDifferent results: {len(diffs):,}')
+    for title, o, n in diffs[:10]:
+        print(f'  {title[:50]:<50} old={o!r} new={n!r}')
+
+    # The old scan grows with the keyword list, the trie does not
+    big_keywords = CONSTRUCTION_KEYWORDS + [f'machine type {i}' for i in range(10 * len(CONSTRUCTION_KEYWORDS))]
+    print(f'\nWith {len(big_keywords)} keywords:\n')
+    run('old', lambda t: old_extract_vehicle_name(t, big_keywords), titles)
+    run('new', new_extract_vehicle_name(big_keywords), titles)
+
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Sprite Atlas Builder
+Packs the raster icons referenced by js/vehicles-data.js into one atlas PNG
+per category, plus a coordinate map (atlas.json, atlas.css, atlas.js), so a
+category page draws all its icons from a single image request.
+
+Packing is deterministic (data-file order, fixed grid, fixed encoder), and
+files are only rewritten when their bytes change, so browser caches stay valid.
+"""
+
+import json
+import os
+import re
+import sys
+
+import png_codec
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_JS = os.path.join(BASE_DIR, 'js', 'vehicles-data.js')
+IMAGE_DIR = os.path.join(BASE_DIR, 'images', 'vehicles')
+ATLAS_DIR = os.path.join(IMAGE_DIR, 'atlas')
+
+# Icons are shown at 72x72 CSS px; atlases are drawn at 2x for retina iPads
+CELL_SIZE = 72
+SCALE = 2
+COLUMNS = 8
+
+# Matches both the hand-written layout (image: 'car.png') and the generated
+# one-line-per-category layout (cars:[{"image":"car.png",...}])
+_CATEGORY_RE = re.compile(r'^\s*(\w+):\s*\[')
+_IMAGE_RE = re.compile(r'''\bimage"?:\s*["']([^"']+)["']''')
+
+
+def read_categories(path=DATA_JS):
+    """{category: [image filename, ...]} in file order"""
+    categories = {}
+    current = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            m = _CATEGORY_RE.match(line)
+            if m:
+                current = m.group(1)
+            if not current:
+                continue
+            for image in _IMAGE_RE.findall(line):
+                images = categories.setdefault(current, [])
+                if image not in images:
+                    images.append(image)
+    return categories
+
+
+def css_class(filename):
+    return 'vi-' + re.sub(r'[^a-z0-9-]', '-', os.path.splitext(filename)[0].lower())
+
+
+def load_icon(filename, size):
+    """Decode an icon onto a square size x size canvas, or None if not a PNG"""
+    path = os.path.join(IMAGE_DIR, filename)
+    if not filename.endswith('.png') or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not png_codec.is_png(data):
+        return None
+    width, height, rgba = png_codec.decode(data)
+    side, square = png_codec.pad_to_square(width, height, rgba)
+    return png_codec.resize(side, side, square, size, size)
+
+
+def pack(icons, cell):
+    """Grid-pack equally sized icons; returns (width, height, rgba, {name: (x, y)})"""
+    columns = min(COLUMNS, len(icons))
+    rows = (len(icons) + columns - 1) // columns
+    width = columns * cell
+    height = rows * cell
+    canvas = bytearray(width * height * 4)
+    positions = {}
+    for index, (name, pixels) in enumerate(icons):
+        x = (index % columns) * cell
+        y = (index // columns) * cell
+        for row in range(cell):
+            dst = ((y + row) * width + x) * 4
+            src = row * cell * 4
+            canvas[dst:dst + cell * 4] = pixels[src:src + cell * 4]
+        positions[name] = (x, y)
+    return width, height, canvas, positions
+
+
+def write_if_changed(path, data):
+    """Write bytes only when they differ; returns True if written"""
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def build(categories):
+    """Build every atlas; returns (files {path: bytes}, icon map, skipped list)"""
+    px = CELL_SIZE * SCALE
+    files = {}
+    icon_map = {}
+    skipped = []
+    css = ['/* Generated by build_atlas.py - do not edit */',
+           f'.vi {{ display: inline-block; width: {CELL_SIZE}px; height: {CELL_SIZE}px; '
+           f'background-repeat: no-repeat; }}']
+
+    for category, filenames in categories.items():
+        icons = []
+        for filename in filenames:
+            pixels = load_icon(filename, px)
+            if pixels is None:
+                skipped.append(filename)
+            else:
+                icons.append((filename, pixels))
+        if not icons:
+            continue
+
+        width, height, canvas, positions = pack(icons, px)
+        atlas_file = f'{category}.png'
+        files[atlas_file] = png_codec.encode(width, height, canvas)
+
+        bg_size = f'{width // SCALE}px {height // SCALE}px'
+        for filename, (x, y) in positions.items():
+            cls = css_class(filename)
+            icon_map[filename] = {'atlas': atlas_file, 'x': x // SCALE, 'y': y // SCALE, 'class': cls}
+            css.append(f'.{cls} {{ background-image: url({atlas_file}); '
+                       f'background-position: -{x // SCALE}px -{y // SCALE}px; '
+                       f'background-size: {bg_size}; }}')
+
+    files['atlas.css'] = ('\n'.join(css) + '\n').encode('utf-8')
+    files['atlas.json'] = (json.dumps({'cellSize': CELL_SIZE, 'scale': SCALE, 'icons': icon_map},
+                                      ensure_ascii=False, indent=2, sort_keys=True) + '\n').encode('utf-8')
+    classes = {name: info['class'] for name, info in sorted(icon_map.items())}
+    files['atlas.js'] = ('// Generated by build_atlas.py - do not edit\n'
+                         f'window.VehicleAtlas = {json.dumps(classes, sort_keys=True)};\n').encode('utf-8')
+    return files, icon_map, skipped
+
+
+def main():
+    print('=' * 50)
+    print('Sprite Atlas Builder')
+    print('=' * 50)
+
+    categories = read_categories()
+    total = sum(len(v) for v in categories.values())
+    print(f'\nCategories: {len(categories)}, images referenced: {total}')
+
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    files, icon_map, skipped = build(categories)
+
+    for name, data in files.items():
+        changed = write_if_changed(os.path.join(ATLAS_DIR, name), data)
+        print(f"  [{'WRITE' if changed else 'SAME'}] atlas/{name} ({len(data):,} bytes)")
+
+    print(f'\nPacked {len(icon_map)} icons')
+    if skipped:
+        print(f'Not packed (SVG, JPEG or missing), served individually: {len(skipped)}')
+    print('=' * 50)
+
+
+if __name__ == '__main__':
+    main()
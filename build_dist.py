@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Offline Build (dist/)
+Copies the game into dist/ with every asset renamed to a content-hashed
+name (car.png -> car.1a2b3c4d5e.png) and every reference rewritten, so
+assets can be cached forever ("immutable"). Pages keep their names.
+
+Then generates dist/sw.js, a service worker that precaches every page and
+asset, so the game starts on the iPad without the server. When a new build
+is installed, URLs that were already cached (same hash = same content) are
+copied from the old cache instead of being downloaded again.
+
+References rewritten in HTML/JS/CSS:
+- quoted paths and CSS url(...) relative to the file or the site root
+- bare image names in JS data ('car.png' in vehicles-data.js, the atlas
+  and sprite maps), since pages build images/vehicles/${image} at runtime
+
+Usage: python3 build_dist.py        then: python3 serve.py 8080 --directory dist
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+
+from asset_store import link_or_copy
+from build_atlas import write_if_changed
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(BASE_DIR, 'dist')
+IMAGE_PREFIX = 'images/vehicles/'
+
+# What goes into dist/ (relative to BASE_DIR)
+ASSET_DIRS = ['js', 'css', 'images']
+SKIP_DIRS = {'variants'}
+SKIP_PAGES = ('verify-',)
+SKIP_PAGE_SUFFIXES = ('.min.html',)     # single-file pages from bundle_pages.py
+ASSET_EXTENSIONS = {'.js', '.css', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg',
+                    '.mp3', '.wav', '.ogg', '.woff', '.woff2', '.ico'}
+TEXT_EXTENSIONS = {'.js', '.css', '.html'}
+
+HASH_LENGTH = 10
+SERVICE_WORKER = 'sw.js'
+MANIFEST = 'asset-manifest.json'
+
+_QUOTED_RE = re.compile(r'''(["'])([^"'\n<>]+?)\1''')
+_CSS_URL_RE = re.compile(r'''url\(\s*([^)"'\s]+)\s*\)''')
+
+SW_REGISTER = ('<script>if (\'serviceWorker\' in navigator) '
+               '{ navigator.serviceWorker.register(\'sw.js\'); }</script>\n')
+
+SW_TEMPLATE = '''// Generated by build_dist.py - do not edit
+const CACHE = 'enggame-__VERSION__';
+const RUNTIME = 'enggame-runtime';
+const PAGES = __PAGES__;
+const ASSETS = __ASSETS__;
+
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE);
+    await Promise.all(PAGES.concat(ASSETS).map(async url => {
+      // Hashed assets already cached by an older build are reused, not refetched
+      const old = ASSETS.includes(url) ? await caches.match(url) : undefined;
+      const response = old || await fetch(url, { cache: 'no-cache' });
+      if (!response.ok) throw new Error(`${url}: ${response.status}`);
+      await cache.put(url, response);
+    }));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    for (const key of await caches.keys()) {
+      if (key !== CACHE && key !== RUNTIME) await caches.delete(key);
+    }
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+
+  if (url.origin !== location.origin) {
+    // Icon fonts from the CDN: cache after the first online load
+    event.respondWith(caches.open(RUNTIME).then(cache =>
+      cache.match(request).then(hit => hit || fetch(request).then(response => {
+        if (response.ok || response.type === 'opaque') cache.put(request, response.clone());
+        return response;
+      }))));
+    return;
+  }
+
+  if (request.mode === 'navigate') {
+    // Pages: fresh when the server is reachable, cached otherwise
+    event.respondWith(fetch(request).catch(() =>
+      caches.match(url.pathname === '/' ? 'index.html' : request, { ignoreSearch: true })));
+    return;
+  }
+
+  // Hashed assets never change: cache first
+  event.respondWith(caches.match(request).then(hit => hit || fetch(request)));
+});
+'''
+
+
+def hashed_name(relpath, content):
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    stem, ext = posixpath.splitext(relpath)
+    return f'{stem}.{digest}{ext}'
+
+
+def list_assets():
+    found = []
+    for top in ASSET_DIRS:
+        for root, dirs, files in os.walk(os.path.join(BASE_DIR, top)):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS)
+            for name in files:
+                if not name.startswith('.') and os.path.splitext(name)[1].lower() in ASSET_EXTENSIONS:
+                    found.append(os.path.relpath(os.path.join(root, name), BASE_DIR).replace(os.sep, '/'))
+    return sorted(found)
+
+
+def list_pages():
+    return sorted(name for name in os.listdir(BASE_DIR)
+                  if name.endswith('.html') and not name.startswith(SKIP_PAGES)
+                  and not name.endswith(SKIP_PAGE_SUFFIXES))
+
+
+def rewrite(text, relpath, mapping, bare_images):
+    """Replace asset references in a text file with their hashed names"""
+    base = posixpath.dirname(relpath)
+    is_js = relpath.endswith('.js') or relpath.endswith('.html')
+
+    def resolve(value):
+        path, sep, rest = value.partition('#')
+        path, qsep, query = path.partition('?')
+        suffix = (qsep + query) + (sep + rest)
+        if not path or '://' in path or path.startswith(('data:', '/')):
+            return None
+        target = posixpath.normpath(posixpath.join(base, path))
+        if target in mapping:
+            return posixpath.relpath(mapping[target], base or '.') + suffix
+        if is_js and '/' not in path and path in bare_images:
+            return posixpath.basename(mapping[bare_images[path]]) + suffix
+        return None
+
+    def quoted(m):
+        new = resolve(m.group(2))
+        return f'{m.group(1)}{new}{m.group(1)}' if new else m.group(0)
+
+    def css_url(m):
+        new = resolve(m.group(1))
+        return f'url({new})' if new else m.group(0)
+
+    text = _QUOTED_RE.sub(quoted, text)
+    return _CSS_URL_RE.sub(css_url, text)
+
+
+def build():
+    """Returns ({original: hashed}, [pages], {dist relpath: source or bytes})"""
+    assets = list_assets()
+    bare_images = {posixpath.basename(a): a for a in assets if a.startswith(IMAGE_PREFIX)
+                   and posixpath.dirname(a) == IMAGE_PREFIX.rstrip('/')}
+    mapping = {}
+    outputs = {}
+
+    # Binary assets first, then text assets, whose hashes depend on the
+    # rewritten references to the binaries
+    binaries = [a for a in assets if posixpath.splitext(a)[1] not in TEXT_EXTENSIONS]
+    texts = [a for a in assets if posixpath.splitext(a)[1] in TEXT_EXTENSIONS]
+    for relpath in binaries:
+        with open(os.path.join(BASE_DIR, relpath), 'rb') as f:
+            mapping[relpath] = hashed_name(relpath, f.read())
+        outputs[mapping[relpath]] = os.path.join(BASE_DIR, relpath)
+    for relpath in texts:
+        with open(os.path.join(BASE_DIR, relpath), encoding='utf-8') as f:
+            content = rewrite(f.read(), relpath, mapping, bare_images).encode('utf-8')
+        mapping[relpath] = hashed_name(relpath, content)
+        outputs[mapping[relpath]] = content
+
+    pages = list_pages()
+    for page in pages:
+        with open(os.path.join(BASE_DIR, page), encoding='utf-8') as f:
+            html = rewrite(f.read(), page, mapping, bare_images)
+        if '</body>' in html:
+            html = html.replace('</body>', SW_REGISTER + '</body>', 1)
+        outputs[page] = html.encode('utf-8')
+
+    hashed = sorted(mapping.values())
+    version = hashlib.sha256('\n'.join(pages + hashed).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+    outputs[SERVICE_WORKER] = (SW_TEMPLATE
+                               .replace('__VERSION__', version)
+                               .replace('__PAGES__', json.dumps(pages))
+                               .replace('__ASSETS__', json.dumps(hashed, indent=0))).encode('utf-8')
+    outputs[MANIFEST] = (json.dumps(mapping, indent=2, sort_keys=True) + '\n').encode('utf-8')
+    return mapping, pages, outputs
+
+
+def write_dist(outputs):
+    """Write/link outputs into dist/ and remove files from older builds"""
+    written = 0
+    for relpath, source in outputs.items():
+        dest = os.path.join(DIST_DIR, relpath)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if isinstance(source, bytes):
+            written += write_if_changed(dest, source)
+        elif not os.path.exists(dest):
+            # Same hash, same content: an existing file never needs rewriting
+            link_or_copy(source, dest)
+            written += 1
+
+    removed = 0
+    keep = {os.path.normpath(os.path.join(DIST_DIR, p)) for p in outputs}
+    for root, dirs, files in os.walk(DIST_DIR, topdown=False):
+        for name in files:
+            path = os.path.join(root, name)
+            # Precompressed siblings are managed by precompress.py
+            if os.path.normpath(path) not in keep and not name.endswith(('.gz', '.br')):
+                os.remove(path)
+                removed += 1
+        if root != DIST_DIR and not os.listdir(root):
+            shutil.rmtree(root)
+    return written, removed
+
+
+def main():
+    print('=' * 60)
+    print('Offline Build (dist/)')
+    print('=' * 60)
+
+    mapping, pages, outputs = build()
+    written, removed = write_dist(outputs)
+
+    print(f'\nPages: {len(pages)}, hashed assets: {len(mapping)}')
+    print(f'Written: {written}, unchanged: {len(outputs) - written}, removed: {removed}')
+    print(f'Service worker: dist/{SERVICE_WORKER} (precaches {len(pages) + len(mapping)} URLs)')
+    print('\nServe with: python3 serve.py 8080 --directory dist')
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+SVG Symbol Sprite Builder
+Validates and minifies the Iconify SVGs in images/vehicles and merges them
+into one <symbol> sprite (images/vehicles/atlas/symbols.svg) with an id per
+icon, plus symbols.js listing which images the sprite covers. The valid
+standalone SVGs (which pages load when an image has no PNG) are rewritten
+minified as well, keeping their manifest entries intact.
+
+By default only the SVGs referenced by js/vehicles-data.js go into the
+sprite, since the page downloads the whole sprite; --all includes every
+valid SVG. Invalid or empty files are always reported and never shipped.
+
+Usage: python3 build_svg_sprite.py [--all]
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import svg_tools
+from asset_manifest import get_manifest
+from build_atlas import ATLAS_DIR, IMAGE_DIR, read_categories, write_if_changed
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+SPRITE_FILE = 'symbols.svg'
+SPRITE_JS = 'symbols.js'
+
+
+def symbol_id(filename):
+    return 'sym-' + os.path.splitext(filename)[0]
+
+
+def list_svgs(directory=IMAGE_DIR):
+    return sorted(name for name in os.listdir(directory) if name.lower().endswith('.svg'))
+
+
+def minify_files(filenames):
+    """Rewrite valid SVGs minified in place; returns (files rewritten, bytes saved)"""
+    manifest = get_manifest()
+    rewritten = saved = 0
+    for filename in filenames:
+        path = os.path.join(IMAGE_DIR, filename)
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            small = svg_tools.minify(data)
+        except svg_tools.SVGError:
+            continue            # reported by build()
+        if len(small) >= len(data):
+            continue
+        write_if_changed(path, small)
+        # Keep the manifest entry intact so conditional GETs still apply
+        manifest.update_local(filename, len(small), hashlib.sha256(small).hexdigest())
+        rewritten += 1
+        saved += len(data) - len(small)
+    manifest.save()
+    return rewritten, saved
+
+
+def build(filenames):
+    """Returns (sprite bytes, {filename: symbol id}, [(filename, error)], before, after)"""
+    symbols = []
+    ids = {}
+    rejected = []
+    before = after = 0
+    for filename in filenames:
+        with open(os.path.join(IMAGE_DIR, filename), 'rb') as f:
+            data = f.read()
+        try:
+            symbol = svg_tools.to_symbol(data, symbol_id(filename))
+        except svg_tools.SVGError as e:
+            rejected.append((filename, str(e)))
+            continue
+        before += len(data)
+        after += len(symbol.encode('utf-8'))
+        symbols.append(symbol)
+        ids[filename] = symbol_id(filename)
+
+    sprite = (f'<svg xmlns="{svg_tools.SVG_NS}" xmlns:xlink="{svg_tools.XLINK_NS}" style="display:none">'
+              + ''.join(symbols) + '</svg>\n').encode('utf-8')
+    return sprite, ids, rejected, before, after
+
+
+def main():
+    print('=' * 50)
+    print('SVG Symbol Sprite Builder')
+    print('=' * 50)
+
+    all_svgs = list_svgs()
+    rewritten, saved = minify_files(all_svgs)
+    print(f'\nStandalone SVGs minified: {rewritten} rewritten, {saved:,} bytes saved')
+    if '--all' in sys.argv:
+        chosen = all_svgs
+    else:
+        referenced = {image for images in read_categories().values() for image in images}
+        chosen = [name for name in all_svgs if name in referenced]
+
+    # Validate everything, even files left out of the sprite
+    _, _, rejected, _, _ = build(all_svgs)
+    sprite, ids, _, before, after = build(chosen)
+    print(f'\nSVG files: {len(all_svgs)}, in sprite: {len(ids)}')
+
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    outputs = {
+        SPRITE_FILE: sprite,
+        SPRITE_JS: ('// Generated by build_svg_sprite.py - do not edit\n'
+                    f'window.VehicleSymbols = {json.dumps(ids, sort_keys=True)};\n').encode('utf-8'),
+    }
+    for name, data in outputs.items():
+        changed = write_if_changed(os.path.join(ATLAS_DIR, name), data)
+        print(f"  [{'WRITE' if changed else 'SAME'}] atlas/{name} ({len(data):,} bytes)")
+
+    if before:
+        print(f'\nMinified: {before:,} -> {after:,} bytes ({100 - after * 100 // before}% smaller)')
+    if rejected:
+        print(f'\nRejected {len(rejected)} invalid SVG files:')
+        for filename, error in rejected:
+            print(f'  - {filename}: {error}')
+    print('=' * 50)
+
+
+if __name__ == '__main__':
+    main()
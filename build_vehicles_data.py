@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Vehicles Data Generator
+Writes js/vehicles-data.js from:
+- the curated catalog below (categories, names, emoji; one emoji per
+  vehicle, no synonyms, to avoid confusing learners)
+- construction_vehicles_data.json from download_construction_vehicles.py;
+  vehicles whose Chinese name is not in the catalog yet are appended to
+  constructionVehicles
+- the Twemoji/Iconify mapping tables: an icon saved under the other
+  extension (.png <-> .svg) is used when the listed file is missing, and
+  an entry with no emoji gets the one from its Twemoji code
+- the files actually on disk: an image that is missing or empty is dropped,
+  the entry then shows its emoji
+
+Every string goes through json.dumps, so quotes and backslashes in names
+cannot break the script. Output is one line per category, in catalog order,
+and the file is only rewritten when its content changes.
+
+Usage: python3 build_vehicles_data.py [--check]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from build_atlas import write_if_changed
+from download_icons import VEHICLE_ICONS
+from download_twemoji import TWEMOJI_VEHICLES
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_JS = os.path.join(BASE_DIR, 'js', 'vehicles-data.js')
+IMAGE_DIR = os.path.join(BASE_DIR, 'images', 'vehicles')
+CONSTRUCTION_JSON = os.path.join(BASE_DIR, 'construction_vehicles_data.json')
+
+CONSTRUCTION_KEY = 'constructionVehicles'
+CONSTRUCTION_EMOJI = '🚧'
+
+# (key, English name, Chinese name, emoji, [(name, chinese, image or None, emoji)])
+CATEGORIES = [
+    ('cars', 'Cars', '轿车', '🚗', [
+        ('Car', '汽车', 'car.png', '🚗'),
+        ('Taxi', '出租车', 'taxi.png', '🚕'),
+        ('SUV', '越野车', 'suv.png', '🚙'),
+        ('Pickup Truck', '皮卡车', 'pickup-truck.png', '🛻'),
+        ('Racing Car', '赛车', 'racing-car.png', '🏎️'),
+        ('Minivan', '面包车', 'minivan.svg', '🚐'),
+    ]),
+    ('trucks', 'Trucks', '卡车', '🚚', [
+        ('Delivery Truck', '送货车', 'delivery-truck.png', '🚚'),
+        ('Semi Truck', '半挂车', 'articulated-truck.png', '🚛'),
+    ]),
+    ('publicTransport', 'Buses', '巴士', '🚌', [
+        ('Bus', '公交车', 'bus.png', '🚌'),
+        ('Trolleybus', '无轨电车', 'trolleybus.png', '🚎'),
+    ]),
+    ('emergencyVehicles', 'Emergency', '特种车辆', '🚑', [
+        ('Ambulance', '救护车', 'ambulance.png', '🚑'),
+        ('Fire Engine', '消防车', 'fire-engine.png', '🚒'),
+        ('Police Car', '警车', 'police-car.png', '🚓'),
+    ]),
+    ('motorcycles', 'Motorcycles', '摩托车', '🏍️', [
+        ('Motorcycle', '摩托车', 'motorcycle.png', '🏍️'),
+        ('Scooter', '踏板车', 'motor-scooter.png', '🛵'),
+    ]),
+    ('bicycles', 'Bicycles', '自行车', '🚲', [
+        ('Bicycle', '自行车', 'bicycle.png', '🚲'),
+        ('Kick Scooter', '滑板车', 'kick-scooter.png', '🛴'),
+    ]),
+    ('otherLand', 'Other Land', '其他陆地', '🚜', [
+        ('Tractor', '拖拉机', 'tractor.png', '🚜'),
+        ('Rickshaw', '三轮车', 'rickshaw.png', '🛺'),
+        ('Skateboard', '滑板', 'skateboard.png', '🛹'),
+        ('Roller Skate', '轮滑鞋', 'roller-skate.png', '🛼'),
+        ('Sled', '雪橇', 'sled.png', '🛷'),
+        ('Wheelchair', '轮椅', 'wheelchair.png', '🦽'),
+        ('Electric Wheelchair', '电动轮椅', 'motorized-wheelchair.png', '🦼'),
+    ]),
+    ('railVehicles', 'Trains', '火车', '🚂', [
+        ('Train', '火车', 'train.png', '🚂'),
+        ('High Speed Train', '高铁', 'high-speed-train.png', '🚄'),
+        ('Bullet Train', '子弹头列车', 'bullet-train.png', '🚅'),
+        ('Metro', '地铁', 'metro.png', '🚇'),
+        ('Tram', '有轨电车', 'tram.png', '🚊'),
+        ('Monorail', '单轨列车', 'monorail.png', '🚝'),
+        ('Light Rail', '轻轨', 'light-rail.png', '🚈'),
+        ('Cable Car', '缆车', 'cable-car.png', '🚡'),
+        ('Gondola', '吊舱缆车', 'gondola.png', '🚠'),
+        ('Funicular', '登山缆车', 'funicular.png', '🚞'),
+    ]),
+    ('aircraft', 'Aircraft', '飞行器', '✈️', [
+        ('Airplane', '飞机', 'airplane.png', '✈️'),
+        ('Small Airplane', '小型飞机', 'small-airplane.png', '🛩️'),
+        ('Helicopter', '直升机', 'helicopter.png', '🚁'),
+        ('Rocket', '火箭', 'rocket.png', '🚀'),
+        ('UFO', '飞碟', 'flying-saucer.png', '🛸'),
+        ('Parachute', '降落伞', 'parachute.png', '🪂'),
+        ('Hot Air Balloon', '热气球', 'hot-air-balloon.png', '🎈'),
+    ]),
+    ('watercraft', 'Boats', '船只', '⛵', [
+        ('Sailboat', '帆船', 'sailboat.png', '⛵'),
+        ('Speedboat', '快艇', 'speedboat.png', '🚤'),
+        ('Ferry', '渡轮', 'ferry.png', '⛴️'),
+        ('Canoe', '独木舟', 'canoe.png', '🛶'),
+        ('Ship', '轮船', 'cargo-ship.svg', '🚢'),
+        ('Cruise Ship', '游轮', 'houseboat.svg', '🛳️'),
+        ('Rowboat', '划艇', 'rowboat.svg', '🚣'),
+    ]),
+    (CONSTRUCTION_KEY, 'Construction', '工程车', '🏗️', [
+        ('Excavator', '挖掘机', 'construction-excavator.png', '🚧'),
+        ('Bulldozer', '推土机', 'construction-bulldozer.png', '🚧'),
+        ('Crane', '起重机', 'construction-crane.png', '🏗️'),
+        ('Loader', '装载机', 'construction-loader.png', '🚧'),
+        ('Roller', '压路机', 'construction-roller.png', '🚧'),
+        ('Mixer', '搅拌车', 'construction-mixer.png', '🚧'),
+        ('Forklift', '叉车', 'construction-forklift.png', '🚧'),
+        ('Dump Truck', '自卸车', 'construction-dump-truck.png', '🚧'),
+        ('Grader', '平地机', 'construction-grader.png', '🚧'),
+        ('Backhoe', '反铲挖掘机', 'construction-backhoe.png', '🚧'),
+        ('Compactor', '压实机', 'construction-compactor.png', '🚧'),
+        ('Concrete Pump', '混凝土泵车', 'construction-concrete-pump.png', '🚧'),
+        ('Cement Truck', '水泥车', 'construction-cement-truck.png', '🚧'),
+        ('Trencher', '挖沟机', 'construction-trencher.png', '🚧'),
+        ('Scraper', '铲运机', 'construction-scraper.png', '🚧'),
+        ('Pile Driver', '打桩机', 'construction-pile-driver.png', '🚧'),
+        ('Skid Steer', '滑移装载机', 'construction-skid-steer.png', '🚧'),
+        ('Bobcat', '山猫装载机', 'construction-bobcat.png', '🚧'),
+        ('Earth Mover', '土方机械', 'construction-earth-mover.png', '🚧'),
+        ('Drilling Rig', '钻机', 'construction-drilling-rig.png', '🚧'),
+    ]),
+    ('trafficRelated', 'Others', '其他', '🎯', [
+        ('Anchor', '锚', None, '⚓'),
+        ('Fuel Pump', '加油站', None, '⛽'),
+        ('Traffic Light', '红绿灯', None, '🚦'),
+        ('Stop Sign', '停止标志', None, '🛑'),
+        ('Construction', '施工中', None, '🚧'),
+    ]),
+]
+
+HEADER = '''/**
+ * 交通工具数据 - 去重版本
+ * 每个emoji只对应一个交通工具，避免学习歧义
+ * PNG图片来自Twemoji, SVG图片来自Iconify
+ *
+ * Generated by build_vehicles_data.py - do not edit, change the catalog there
+ */
+'''
+
+METHODS = '''
+  getAllVehicles() {
+    return [].concat(__CATEGORY_DATA__);
+  },
+
+  getCategories() {
+    return __CATEGORIES__.map(c => ({ ...c, data: this[c.key] }));
+  },
+
+  getVehiclesWithImages() {
+    return this.getAllVehicles().filter(v => v.image);
+  },
+
+  getVehiclesWithEmoji() {
+    return this.getAllVehicles().filter(v => v.emoji);
+  },
+
+  getQuizQuestion(count = 3) {
+    const vehicles = this.getVehiclesWithImages();
+    const shuffled = [...vehicles].sort(() => Math.random() - 0.5);
+    const correct = shuffled[0];
+    const options = shuffled.slice(0, count).sort(() => Math.random() - 0.5);
+    return { correct, options };
+  }
+};
+
+// 统计
+console.log('Total vehicles:', VehiclesData.getAllVehicles().length);
+console.log('With images:', VehiclesData.getVehiclesWithImages().length);
+console.log('With emoji:', VehiclesData.getVehiclesWithEmoji().length);
+'''
+
+
+def js_literal(value):
+    """JSON is valid JS; also escape the line separators JSON allows but old JS does not"""
+    text = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return text.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').replace('</', '<\\/')
+
+
+def display_name(keyword):
+    """construction-excavator / pile driver -> Pile Driver"""
+    return keyword.replace('construction-', '').replace('-', ' ').title()
+
+
+def twemoji_char(code):
+    """'1f697' or '1f3ce-fe0f' -> the emoji itself"""
+    return ''.join(chr(int(part, 16)) for part in code.split('-'))
+
+
+def usable_image(filename):
+    """filename, the icon under its other extension, or None if neither is on disk"""
+    stem, ext = os.path.splitext(filename)
+    candidates = [filename]
+    if stem + '.png' in VEHICLE_ICONS or filename in VEHICLE_ICONS:
+        candidates.append(stem + ('.png' if ext == '.svg' else '.svg'))
+    for name in candidates:
+        path = os.path.join(IMAGE_DIR, name)
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            return name
+    return None
+
+
+def load_construction(path=CONSTRUCTION_JSON):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def merge(categories=CATEGORIES, construction=None):
+    """[(key, name, chinese, emoji, [vehicle dict])] plus notes on what changed"""
+    if construction is None:
+        construction = load_construction()
+    notes = []
+    known = {chinese for *_, vehicles in categories for _, chinese, _, _ in vehicles}
+
+    merged = []
+    for key, name, chinese, emoji, vehicles in categories:
+        vehicles = list(vehicles)
+        if key == CONSTRUCTION_KEY:
+            for item in construction:
+                # One entry per Chinese name: digger/dozer/dumper are synonyms
+                if item['chinese'] in known:
+                    continue
+                known.add(item['chinese'])
+                vehicles.append((display_name(item['name']), item['chinese'],
+                                 item['filename'], CONSTRUCTION_EMOJI))
+                notes.append(f'added {item["filename"]} ({item["chinese"]})')
+
+        entries = []
+        for v_name, v_chinese, image, v_emoji in vehicles:
+            entry = {'name': v_name, 'chinese': v_chinese}
+            if image:
+                found = usable_image(image)
+                if found is None:
+                    notes.append(f'{image} missing, {v_name} shows its emoji')
+                elif found != image:
+                    notes.append(f'{image} missing, using {found}')
+                if found:
+                    entry['image'] = found
+            if not v_emoji and image in TWEMOJI_VEHICLES:
+                v_emoji = twemoji_char(TWEMOJI_VEHICLES[image][0])
+            if v_emoji:
+                entry['emoji'] = v_emoji
+            entries.append(entry)
+        merged.append((key, name, chinese, emoji, entries))
+    return merged, notes
+
+
+def render(merged):
+    lines = [HEADER, 'const VehiclesData = {']
+    for key, _, _, _, entries in merged:
+        lines.append(f'  {key}:{js_literal(entries)},')
+    methods = (METHODS
+               .replace('__CATEGORY_DATA__', ', '.join(f'this.{key}' for key, *_ in merged))
+               .replace('__CATEGORIES__', js_literal([
+                   {'key': key, 'name': name, 'chinese': chinese, 'emoji': emoji}
+                   for key, name, chinese, emoji, _ in merged])))
+    return '\n'.join(lines) + '\n' + methods
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate js/vehicles-data.js')
+    parser.add_argument('--check', action='store_true',
+                        help='only report whether the file is up to date (exit 1 if not)')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('Vehicles Data Generator')
+    print('=' * 60)
+
+    merged, notes = merge()
+    content = render(merged).encode('utf-8')
+    for note in notes:
+        print(f'  [NOTE] {note}')
+    for key, _, _, _, entries in merged:
+        with_image = sum(1 for e in entries if 'image' in e)
+        print(f'  {key:<22}{len(entries):>3} vehicles, {with_image:>3} with images')
+
+    total = sum(len(entries) for *_, entries in merged)
+    if args.check:
+        with open(DATA_JS, 'rb') as f:
+            current = f.read() == content
+        print(f'\n{total} vehicles, js/vehicles-data.js is '
+              + ('up to date' if current else 'OUT OF DATE'))
+        print('=' * 60)
+        sys.exit(0 if current else 1)
+
+    written = write_if_changed(DATA_JS, content)
+    print(f'\n{total} vehicles, js/vehicles-data.js ' + ('written' if written else 'unchanged'))
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
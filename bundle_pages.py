@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Page Bundler
+Builds a minified single-file version of each game page next to it
+(vehicles.html -> vehicles.min.html):
+- local <script src> files are minified and inlined (when the minified
+  script is at most INLINE_LIMIT bytes), in the same order, so scripts run
+  exactly as before; larger ones stay external
+- local stylesheets are minified and inlined as <style>, with url(...)
+  rebased to the page
+- inline <script>/<style> blocks are minified, then the HTML itself
+Scripts with async/defer/other attributes, remote URLs and missing files
+are left as they are. See minify.py for what the minifiers remove.
+
+A page is rebuilt only when the sha256 of any of its inputs (the page, the
+files it inlines, the bundler itself) changed; keys are kept in
+.bundle-cache.json.
+
+Usage: python3 bundle_pages.py [page.html ...] [--force]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+
+import minify
+from build_atlas import write_if_changed
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, '.bundle-cache.json')
+
+PAGES = ['vehicles.html', 'quiz.html', 'learn.html', 'listen-quiz.html']
+OUTPUT_SUFFIX = '.min.html'
+
+# Largest minified script/stylesheet that is inlined
+INLINE_LIMIT = 48 * 1024
+
+_SCRIPT_RE = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.S | re.I)
+_STYLE_RE = re.compile(r'<style\b([^>]*)>(.*?)</style\s*>', re.S | re.I)
+_LINK_RE = re.compile(r'<link\b([^>]*)>', re.I)
+_ATTR_RE = re.compile(r'''([\w-]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?''')
+_CSS_URL_RE = re.compile(r'''url\(\s*(["']?)([^)"']+)\1\s*\)''')
+
+JS_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+
+
+def parse_attrs(text):
+    return {name.lower(): value.strip('"\'') if value else ''
+            for name, value in _ATTR_RE.findall(text)}
+
+
+def is_local(url):
+    return bool(url) and not re.match(r'^([a-z][a-z0-9+.-]*:|//|#)', url, re.I)
+
+
+def rebase_css(css, css_path):
+    """url(...) in a stylesheet at css_path, made relative to the site root"""
+    base = posixpath.dirname(css_path)
+
+    def fix(m):
+        quote, url = m.group(1), m.group(2).strip()
+        if not is_local(url) or url.startswith('/'):
+            return m.group(0)
+        return f'url({quote}{posixpath.normpath(posixpath.join(base, url))}{quote})'
+    return _CSS_URL_RE.sub(fix, css)
+
+
+def _inline_safe(text, tag):
+    """Keep a closing tag inside inlined code from ending the element early"""
+    return re.sub(rf'</({tag})', r'<\\/\1', text, flags=re.I)
+
+
+class Bundler:
+    """Bundles pages, minifying each input file at most once per run"""
+
+    def __init__(self):
+        self._minified = {}
+
+    def read(self, relpath):
+        try:
+            with open(os.path.join(BASE_DIR, relpath), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def minified(self, kind, data):
+        key = (kind, hashlib.sha256(data).hexdigest())
+        if key not in self._minified:
+            text = data.decode('utf-8')
+            self._minified[key] = minify.minify_js(text) if kind == 'js' else minify.minify_css(text)
+        return self._minified[key]
+
+    def references(self, html):
+        """Local files a page would inline"""
+        refs = []
+        for m in _SCRIPT_RE.finditer(html):
+            attrs = parse_attrs(m.group(1))
+            if is_local(attrs.get('src')):
+                refs.append(attrs['src'])
+        for m in _LINK_RE.finditer(html):
+            attrs = parse_attrs(m.group(1))
+            if attrs.get('rel', '').lower() == 'stylesheet' and is_local(attrs.get('href')):
+                refs.append(attrs['href'])
+        return refs
+
+    def bundle(self, page):
+        """(bundled html, notes, {relpath: bytes} of inlined files)"""
+        with open(os.path.join(BASE_DIR, page), encoding='utf-8') as f:
+            html = f.read()
+        notes = []
+        inlined = {}
+
+        def script(m):
+            attrs = parse_attrs(m.group(1))
+            src = attrs.pop('src', None)
+            if attrs.get('type', '').lower() not in JS_TYPES or set(attrs) - {'type'}:
+                return m.group(0)
+            if src is None:
+                try:
+                    code = minify.minify_js(m.group(2))
+                except minify.MinifyError as e:
+                    notes.append(f'inline script kept as is: {e}')
+                    return m.group(0)
+                return f'<script{m.group(1)}>{code}</script>'
+            if not is_local(src):
+                return m.group(0)
+            data = self.read(src)
+            if data is None:
+                notes.append(f'{src} not found, left as a link')
+                return m.group(0)
+            try:
+                code = self.minified('js', data)
+            except (minify.MinifyError, UnicodeDecodeError) as e:
+                notes.append(f'{src} kept external: {e}')
+                return m.group(0)
+            if len(code.encode('utf-8')) > INLINE_LIMIT:
+                notes.append(f'{src} kept external (over {INLINE_LIMIT // 1024} KB)')
+                return m.group(0)
+            inlined[src] = data
+            type_attr = f' type="{attrs["type"]}"' if attrs.get('type') == 'module' else ''
+            return f'<script{type_attr}>{_inline_safe(code, "script")}</script>'
+
+        def style(m):
+            return f'<style{m.group(1)}>{_inline_safe(minify.minify_css(m.group(2)), "style")}</style>'
+
+        def link(m):
+            attrs = parse_attrs(m.group(1))
+            href = attrs.get('href')
+            if attrs.get('rel', '').lower() != 'stylesheet' or not is_local(href):
+                return m.group(0)
+            data = self.read(href)
+            if data is None:
+                notes.append(f'{href} not found, left as a link')
+                return m.group(0)
+            css = self.minified('css', rebase_css(data.decode('utf-8'), href).encode('utf-8'))
+            if len(css.encode('utf-8')) > INLINE_LIMIT:
+                notes.append(f'{href} kept external (over {INLINE_LIMIT // 1024} KB)')
+                return m.group(0)
+            inlined[href] = data
+            media = f' media="{attrs["media"]}"' if attrs.get('media') else ''
+            return f'<style{media}>{_inline_safe(css, "style")}</style>'
+
+        # Scripts first: their contents may look like tags to the other patterns
+        parts = []
+        pos = 0
+        for m in _SCRIPT_RE.finditer(html):
+            chunk = _STYLE_RE.sub(style, html[pos:m.start()])
+            parts.append(_LINK_RE.sub(link, chunk))
+            parts.append(script(m))
+            pos = m.end()
+        parts.append(_LINK_RE.sub(link, _STYLE_RE.sub(style, html[pos:])))
+        return minify.minify_html(''.join(parts)), notes, inlined
+
+
+def output_path(page):
+    return os.path.join(BASE_DIR, page[:-len('.html')] + OUTPUT_SUFFIX)
+
+
+def cache_key(page, bundler):
+    """sha256 over the page, every file it references and the bundler code"""
+    digest = hashlib.sha256()
+    html = bundler.read(page)
+    for relpath in [page, 'bundle_pages.py', 'minify.py'] + bundler.references(html.decode('utf-8')):
+        data = bundler.read(relpath)
+        digest.update(f'\0{relpath}\0'.encode('utf-8'))
+        digest.update(hashlib.sha256(data).digest() if data is not None else b'missing')
+    return digest.hexdigest()
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    tmp = CACHE_PATH + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp, CACHE_PATH)
+
+
+def file_sha256(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build minified single-file pages')
+    parser.add_argument('pages', nargs='*', default=PAGES, help=f'pages (default: {" ".join(PAGES)})')
+    parser.add_argument('--force', action='store_true', help='rebuild even if the inputs are unchanged')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('Page Bundler')
+    print('=' * 60)
+
+    bundler = Bundler()
+    cache = load_cache()
+    totals = [0, 0, 0, 0]       # bytes before/after, gzip before/after
+    for page in args.pages:
+        key = cache_key(page, bundler)
+        out = output_path(page)
+        entry = cache.get(page)
+        if (not args.force and entry and entry['key'] == key
+                and entry['output'] == file_sha256(out)):
+            print(f'\n  [CACHED] {page} -> {os.path.basename(out)}')
+            report = entry['report']
+        else:
+            html, notes, inlined = bundler.bundle(page)
+            data = html.encode('utf-8')
+            write_if_changed(out, data)
+            sources = [bundler.read(page)] + list(inlined.values())
+            report = {
+                'before': sum(len(d) for d in sources),
+                'after': len(data),
+                'gzip_before': sum(len(gzip.compress(d, mtime=0)) for d in sources),
+                'gzip_after': len(gzip.compress(data, mtime=0)),
+                'inlined': sorted(inlined),
+                'notes': notes,
+            }
+            cache[page] = {'key': key, 'output': hashlib.sha256(data).hexdigest(), 'report': report}
+            print(f'\n  [BUILD] {page} -> {os.path.basename(out)}')
+            for note in notes:
+                print(f'    [NOTE] {note}')
+
+        before, after = report['before'], report['after']
+        print(f"    {before:,} -> {after:,} bytes ({100 - after * 100 // before}% smaller), "
+              f"gzip {report['gzip_before']:,} -> {report['gzip_after']:,}, "
+              f"{len(report['inlined'])} requests saved")
+        totals[0] += before
+        totals[1] += after
+        totals[2] += report['gzip_before']
+        totals[3] += report['gzip_after']
+    save_cache(cache)
+
+    if totals[0]:
+        print(f'\nTotal: {totals[0]:,} -> {totals[1]:,} bytes '
+              f'({100 - totals[1] * 100 // totals[0]}% smaller), '
+              f'gzip {totals[2]:,} -> {totals[3]:,}')
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,30 +7,73 @@ Construction Vehicles Image Download Script
 
 import os
 import re
-import urllib.request
+import queue
+import threading
 import urllib.parse
-import ssl
-import time
 import sys
 import json
 from html.parser import HTMLParser
 
+from api_cache import get_api_cache
+from asset_store import get_store
+from build_vehicles_data import display_name, js_literal
+from download_engine import DownloadEngine
+from http_pool import get_pool
+from job_journal import JobJournal
+from keyword_matcher import KeywordMatcher
+from rate_limiter import get_limiter
+
 # Fix Windows encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
-# Disable SSL verification
-ssl._create_default_https_context = ssl._create_unverified_context
-
 # Save directory
 SAVE_DIR = os.path.join(os.path.dirname(__file__), 'images', 'vehicles')
 
+# 爬取结果（供 --js-only 和资源流水线使用）
+DATA_FILE = os.path.join(os.path.dirname(__file__), 'construction_vehicles_data.json')
+
+# 断点续传日志：每完成一个分类、一批URL、一次下载就追加一行，中断后从这里继续
+JOURNAL_FILE = os.path.join(os.path.dirname(__file__), '.construction-journal.jsonl')
+
 # Ensure directory exists
 os.makedirs(SAVE_DIR, exist_ok=True)
 
 # Wikimedia Commons API endpoint
 WIKI_API = 'https://commons.wikimedia.org/w/api.php'
 
+# MediaWiki maxlag：数据库复制延迟超过这么多秒时 API 会拒绝请求，
+# 此时按 Retry-After 放慢并重试（官方建议值 5）
+MAXLAG = 5
+MAXLAG_RETRIES = 5
+
+# 单张图片大小上限；256px 缩略图约 50KB，原图可达数十MB
+MAX_IMAGE_BYTES = 2 * 1024 * 1024
+
+# 分类爬取设置（默认与原来一致：只爬起始分类，主分类 200 个文件，其余 50 个；
+# 调大 CRAWL_DEPTH 会继续爬子分类，请求数和筛选的标题数随之成倍增加）
+CRAWL_DEPTH = 0             # 从起始分类向下遍历的子分类层数
+CRAWL_WORKERS = 4           # 并发请求的分类数
+CRAWL_PAGE_SIZE = 500       # categorymembers 每页条数（API 上限）
+CATEGORY_FILE_LIMIT = 50    # 每个分类最多取多少个文件
+ROOT_FILE_LIMITS = {        # 个别分类的文件上限
+    'Construction_vehicles': 200,
+}
+CRAWL_QUEUE_SIZE = 1000     # 爬虫与筛选之间的缓冲区大小（限制内存）
+
+# 起始分类：主分类 + 已知相关子分类（不一定是主分类的直接子分类）
+CRAWL_ROOTS = [
+    'Construction_vehicles',
+    'Excavators', 'Bulldozers', 'Wheel_loaders', 'Cranes_(machine)',
+    'Roller_compactors', 'Concrete_mixer_trucks', 'Dump_trucks',
+    'Backhoe_loaders', 'Forklifts', 'Motor_graders',
+    'Articulated_haulers', 'Asphalt_pavers', 'Concrete_pumps',
+    'Crawler_cranes', 'Mobile_cranes', 'Tower_cranes',
+    'Mini_excavators', 'Skid-steer_loaders', 'Telehandlers',
+    'Pile_drivers', 'Road_rollers', 'Steamrollers',
+    'Scrapers_(machines)', 'Trenchers', 'Drilling_rigs',
+]
+
 # 工程车关键词列表（用于筛选）
 CONSTRUCTION_KEYWORDS = [
     # 挖掘机类
@@ -128,88 +171,107 @@ CHINESE_NAMES = {
     'road construction': '道路施工车',
 }
 
-def get_category_images(category_name, limit=100):
-    """
-    使用 Wikimedia Commons API 获取分类下的图片列表
-    """
-    images = []
-    continue_param = None
-
-    while len(images) < limit:
-        params = {
-            'action': 'query',
-            'list': 'categorymembers',
-            'cmtitle': f'Category:{category_name}',
-            'cmtype': 'file',
-            'cmlimit': min(50, limit - len(images)),
-            'format': 'json',
-        }
-
-        if continue_param:
-            params['cmcontinue'] = continue_param
+# 预编译的关键词匹配器
+KEYWORD_MATCHER = KeywordMatcher(CONSTRUCTION_KEYWORDS)
 
-        url = f"{WIKI_API}?{urllib.parse.urlencode(params)}"
+# MediaWiki 单次查询最多 50 个标题 / 缩略图
+API_BATCH_SIZE = 50
 
-        try:
-            headers = {
-                'User-Agent': 'KidsEnglishFun/1.0 (Educational Project; Python)'
-            }
-            request = urllib.request.Request(url, headers=headers)
-
-            with urllib.request.urlopen(request, timeout=30) as response:
-                data = json.loads(response.read().decode('utf-8'))
+# 缩略图宽度，适合学习应用
+THUMB_WIDTH = 256
 
-            if 'query' in data and 'categorymembers' in data['query']:
-                for member in data['query']['categorymembers']:
-                    images.append(member['title'])
+# 已解析的图片URL缓存: wiki_title -> url
+_image_urls = {}
 
-            # Check for continuation
-            if 'continue' in data and 'cmcontinue' in data['continue']:
-                continue_param = data['continue']['cmcontinue']
-            else:
-                break
+# 本次运行的任务日志（main() 中打开）和日志里已爬完的分类: name -> record
+_journal = None
+_crawled = {}
 
-        except Exception as e:
-            print(f'  [ERROR] Failed to fetch category: {e}')
+def api_query(params):
+    """
+    调用 MediaWiki API，返回解析后的 JSON
+    先查本地 SQLite 缓存（api_cache.py）；联网失败时退回到过期的缓存
+    带 maxlag 参数，服务器繁忙时由限速器降速后重试
+    """
+    cache = get_api_cache()
+    body = cache.get(params)
+    if body is not None:
+        return json.loads(body.decode('utf-8'))
+
+    url = f"{WIKI_API}?{urllib.parse.urlencode(dict(params, maxlag=MAXLAG))}"
+    headers = {
+        'User-Agent': 'KidsEnglishFun/1.0 (Educational Project; Python)'
+    }
+    host = urllib.parse.urlsplit(WIKI_API).hostname
+    for attempt in range(MAXLAG_RETRIES + 1):
+        try:
+            with get_pool().request('GET', url, headers=headers, timeout=30) as response:
+                body = response.read()
+                retry_after = response.headers.get('Retry-After')
+        except Exception:
+            body = cache.get(params, stale_ok=True)
+            if body is None:
+                raise
+            return json.loads(body.decode('utf-8'))
+
+        data = json.loads(body.decode('utf-8'))
+        if data.get('error', {}).get('code') != 'maxlag':
             break
+        # 服务器繁忙：限速器降速并暂停，然后重试
+        lag = data['error'].get('lag', MAXLAG)
+        if get_limiter().throttle(host, retry_after or lag) is None or attempt == MAXLAG_RETRIES:
+            raise RuntimeError(f"maxlag: database lag {lag}s")
 
-    return images
+    # API 错误不缓存
+    if 'error' not in data:
+        cache.put(params, body)
+    return data
 
-def get_image_url(filename):
+def _remember_image_urls(pages):
     """
-    获取图片的实际下载URL
+    从 query.pages 中记录每个文件的图片URL（优先缩略图）
     """
-    params = {
-        'action': 'query',
-        'titles': filename,
-        'prop': 'imageinfo',
-        'iiprop': 'url',
-        'iiurlwidth': 256,  # 获取缩略图URL，适合学习应用
-        'format': 'json',
-    }
+    for page_info in pages.values():
+        if 'imageinfo' in page_info:
+            info = page_info['imageinfo'][0]
+            _image_urls[page_info['title']] = info.get('thumburl') or info.get('url')
 
-    url = f"{WIKI_API}?{urllib.parse.urlencode(params)}"
+def get_image_urls(filenames):
+    """
+    批量获取图片的实际下载URL，每次请求最多 50 个标题
+    每批解析结果写入任务日志
+    返回 {filename: url}
+    """
+    missing = [f for f in dict.fromkeys(filenames) if f not in _image_urls]
 
-    try:
-        headers = {
-            'User-Agent': 'KidsEnglishFun/1.0 (Educational Project; Python)'
+    for i in range(0, len(missing), API_BATCH_SIZE):
+        batch = missing[i:i + API_BATCH_SIZE]
+        params = {
+            'action': 'query',
+            'titles': '|'.join(batch),
+            'prop': 'imageinfo',
+            'iiprop': 'url',
+            'iiurlwidth': THUMB_WIDTH,
+            'format': 'json',
         }
-        request = urllib.request.Request(url, headers=headers)
 
-        with urllib.request.urlopen(request, timeout=30) as response:
-            data = json.loads(response.read().decode('utf-8'))
+        try:
+            data = api_query(params)
+            query = data.get('query', {})
+            _remember_image_urls(query.get('pages', {}))
 
-        pages = data.get('query', {}).get('pages', {})
-        for page_id, page_info in pages.items():
-            if 'imageinfo' in page_info:
-                info = page_info['imageinfo'][0]
-                # 优先使用缩略图URL
-                return info.get('thumburl') or info.get('url')
+            # 标题可能被规范化（如下划线转空格），映射回原始标题
+            for item in query.get('normalized', []):
+                if item['to'] in _image_urls:
+                    _image_urls[item['from']] = _image_urls[item['to']]
 
-    except Exception as e:
-        print(f'  [ERROR] Failed to get image URL: {e}')
+            if _journal:
+                _journal.append('urls', urls={f: _image_urls[f] for f in batch if _image_urls.get(f)})
 
-    return None
+        except Exception as e:
+            print(f'  [ERROR] Failed to get image URLs: {e}')
+
+    return {f: _image_urls[f] for f in filenames if _image_urls.get(f)}
 
 def extract_vehicle_name(wiki_title):
     """
@@ -220,15 +282,8 @@ def extract_vehicle_name(wiki_title):
     name = wiki_title.replace('File:', '')
     name = re.sub(r'\.(jpg|jpeg|png|gif|svg|webp)$', '', name, flags=re.IGNORECASE)
 
-    # 转小写用于匹配
-    name_lower = name.lower()
-
-    # 检查是否匹配工程车关键词
-    matched_keyword = None
-    for keyword in CONSTRUCTION_KEYWORDS:
-        if keyword in name_lower:
-            matched_keyword = keyword
-            break
+    # 整词匹配最长的工程车关键词（"road roller" 优先于 "roller"）
+    matched_keyword = KEYWORD_MATCHER.match(name)
 
     return name, matched_keyword
 
@@ -240,6 +295,14 @@ def create_safe_filename(name, keyword):
     base_name = keyword.replace(' ', '-')
     return f"construction-{base_name}.png"
 
+def check_image(head, size):
+    """
+    验证是否为图片
+    """
+    if size < 100:
+        return 'File too small'
+    return None
+
 def download_image(url, filename):
     """
     下载图片
@@ -256,17 +319,9 @@ def download_image(url, filename):
             'User-Agent': 'KidsEnglishFun/1.0 (Educational Project; Python)',
             'Accept': 'image/*,*/*;q=0.8',
         }
-        request = urllib.request.Request(url, headers=headers)
-
-        with urllib.request.urlopen(request, timeout=30) as response:
-            data = response.read()
-
-        # Verify it's actually an image
-        if len(data) < 100:
-            raise Exception('File too small')
-
-        with open(filepath, 'wb') as f:
-            f.write(data)
+        # 流式写入临时文件后原子重命名；缩略图缺失时回退到原图，超过上限直接中止
+        get_store().download(url, filepath, headers=headers, timeout=30,
+                             max_bytes=MAX_IMAGE_BYTES, validate=check_image)
 
         print(f'  [OK] {filename}')
         return True, filepath
@@ -277,167 +332,313 @@ def download_image(url, filename):
 
 def generate_js_data(downloaded_vehicles):
     """
-    生成 JavaScript 数据格式
+    生成 JavaScript 数据格式（经 JSON 转义，名称中的引号不会破坏脚本）
     """
     js_entries = []
     for vehicle in downloaded_vehicles:
-        name = vehicle['name']
-        chinese = vehicle['chinese']
-        image = vehicle['filename']
-
         # 格式化名称: construction-excavator -> Excavator
-        display_name = name.replace('construction-', '').replace('-', ' ').title()
-
-        js_entries.append(
-            f"    {{ name: '{display_name}', chinese: '{chinese}', image: '{image}', emoji: '🚧' }}"
-        )
+        js_entries.append('    ' + js_literal({
+            'name': display_name(vehicle['name']),
+            'chinese': vehicle['chinese'],
+            'image': vehicle['filename'],
+            'emoji': '🚧',
+        }))
 
     return js_entries
 
-def get_subcategories(category_name):
+def print_js_data(downloaded_vehicles):
     """
-    获取子分类列表
+    打印工程车数据预览（js/vehicles-data.js 由 build_vehicles_data.py 生成）
     """
-    subcategories = []
-    params = {
-        'action': 'query',
-        'list': 'categorymembers',
-        'cmtitle': f'Category:{category_name}',
-        'cmtype': 'subcat',
-        'cmlimit': 50,
-        'format': 'json',
-    }
+    js_entries = generate_js_data(downloaded_vehicles)
+
+    print('\n' + '=' * 60)
+    print('Generated JavaScript data for vehicles-data.js:')
+    print('=' * 60)
+    print('\n  // ==================== 工程车类 ====================')
+    print('  constructionVehicles: [')
+    for entry in js_entries:
+        print(entry + ',')
+    print('  ],')
 
-    url = f"{WIKI_API}?{urllib.parse.urlencode(params)}"
+def iter_category_members(category_name, cmtype='file'):
+    """
+    逐个产出分类成员（完整 cmcontinue 分页）
+    member: {'pageid', 'ns', 'title'}
+    """
+    continue_params = {}
 
-    try:
-        headers = {
-            'User-Agent': 'KidsEnglishFun/1.0 (Educational Project; Python)'
+    while True:
+        params = {
+            'action': 'query',
+            'list': 'categorymembers',
+            'cmtitle': f'Category:{category_name}',
+            'cmtype': cmtype,
+            'cmlimit': CRAWL_PAGE_SIZE,
+            'format': 'json',
         }
-        request = urllib.request.Request(url, headers=headers)
+        params.update(continue_params)
+
+        data = api_query(params)
+        for member in data.get('query', {}).get('categorymembers', []):
+            yield member
+
+        if 'continue' not in data:
+            return
+        continue_params = data['continue']
+
+# 爬虫结束标记
+_CRAWL_DONE = object()
+
+def _crawl_category(category_name, file_limit, out, stop):
+    """
+    爬取单个分类：文件标题放入 out 队列，返回子分类列表
+    API 按 subcat、file 的顺序返回，所以文件数到上限时子分类已经拿全
+    完整爬完的分类记入任务日志；日志里已有的分类直接重放，不再请求
+    """
+    record = _crawled.get(category_name)
+    if record:
+        for title in record['files']:
+            if stop.is_set():
+                break
+            out.put(title)
+        print(f'  + {len(record["files"])} images from {category_name} (journal)')
+        return record['subcats']
 
-        with urllib.request.urlopen(request, timeout=30) as response:
-            data = json.loads(response.read().decode('utf-8'))
+    subcategories = []
+    titles = []
+    complete = False
 
-        if 'query' in data and 'categorymembers' in data['query']:
-            for member in data['query']['categorymembers']:
-                # 提取分类名称（去掉 "Category:" 前缀）
-                cat_name = member['title'].replace('Category:', '')
-                subcategories.append(cat_name)
+    try:
+        for member in iter_category_members(category_name, cmtype='subcat|file'):
+            if stop.is_set():
+                break
+            if member.get('ns') == 14:
+                subcategories.append(member['title'].replace('Category:', '', 1))
+            else:
+                out.put(member['title'])
+                titles.append(member['title'])
+                if len(titles) >= file_limit:
+                    break
+        else:
+            complete = True
+        complete = complete or len(titles) >= file_limit
 
     except Exception as e:
-        print(f'  [ERROR] Failed to fetch subcategories: {e}')
+        print(f'  [ERROR] Failed to crawl {category_name}: {e}')
 
+    if complete and _journal:
+        _journal.append('category', name=category_name, subcats=subcategories, files=titles)
+    print(f'  + {len(titles)} images from {category_name}')
     return subcategories
 
-def main():
+def walk_categories(roots, max_depth=CRAWL_DEPTH, workers=CRAWL_WORKERS,
+                    file_limit=CATEGORY_FILE_LIMIT, limits=ROOT_FILE_LIMITS):
+    """
+    广度优先遍历分类树，逐个产出文件标题（生成器）
+    - 每个分类最多取 file_limit 个文件，limits 里的分类按各自的上限
+    - 每层的分类并发爬取，visited 集合避免重复和环
+    - 标题经有界队列流向调用者，内存不随分类大小增长
+    - 调用者提前停止迭代时，爬虫随之停止
+    """
+    out = queue.Queue(maxsize=CRAWL_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def crawl():
+        visited = set(roots)
+        level = list(dict.fromkeys(roots))
+        try:
+            with DownloadEngine(max_workers=workers, per_host=workers) as engine:
+                for depth in range(max_depth + 1):
+                    if not level or stop.is_set():
+                        break
+                    futures = [engine.submit(WIKI_API, _crawl_category,
+                                             category, limits.get(category, file_limit),
+                                             out, stop)
+                               for category in level]
+                    next_level = []
+                    for future in futures:
+                        for subcat in future.result():
+                            if subcat not in visited:
+                                visited.add(subcat)
+                                next_level.append(subcat)
+                    level = next_level
+        finally:
+            out.put(_CRAWL_DONE)
+
+    crawler = threading.Thread(target=crawl, name='category-crawler', daemon=True)
+    crawler.start()
+
+    try:
+        while True:
+            title = out.get()
+            if title is _CRAWL_DONE:
+                break
+            yield title
+    finally:
+        stop.set()
+        # 清空队列，让阻塞在 put() 上的线程结束
+        while crawler.is_alive():
+            try:
+                out.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+def open_journal(restart=False):
+    """
+    打开任务日志：爬取设置或关键词没变、上次又没跑完时接着上次继续
+    """
+    global _journal, _crawled
+    _journal = JobJournal(JOURNAL_FILE, restart=restart, header={
+        'roots': CRAWL_ROOTS,
+        'depth': CRAWL_DEPTH,
+        'file_limit': CATEGORY_FILE_LIMIT,
+        'root_limits': ROOT_FILE_LIMITS,
+        'keywords': CONSTRUCTION_KEYWORDS,
+    })
+    _crawled = {r['name']: r for r in _journal.records('category')}
+    for record in _journal.records('urls'):
+        _image_urls.update(record['urls'])
+    return _journal
+
+def save_data(vehicles):
+    """
+    原子写入爬取结果 JSON（先写临时文件再重命名，中断时不会留下半个文件）
+    """
+    tmp = DATA_FILE + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(vehicles, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, DATA_FILE)
+
+def main(restart=False):
     print('=' * 60)
     print('Construction Vehicles Image Download Script')
     print('从 Wikimedia Commons 爬取工程车图片')
     print('=' * 60)
     print(f'\nSave directory: {SAVE_DIR}')
 
-    # Step 1: 获取分类和子分类下的所有图片
-    print('\n[Step 1] Fetching images from Wikimedia Commons...')
-
-    # 主分类
-    category_images = get_category_images('Construction_vehicles', limit=200)
-    print(f'  Found {len(category_images)} images in main category')
-
-    # 获取子分类
-    subcategories = get_subcategories('Construction_vehicles')
-    print(f'  Found {len(subcategories)} subcategories')
-
-    # 从相关子分类获取更多图片
-    relevant_subcats = [
-        'Excavators', 'Bulldozers', 'Wheel_loaders', 'Cranes_(machine)',
-        'Roller_compactors', 'Concrete_mixer_trucks', 'Dump_trucks',
-        'Backhoe_loaders', 'Forklifts', 'Motor_graders',
-        # 更多子分类
-        'Articulated_haulers', 'Asphalt_pavers', 'Concrete_pumps',
-        'Crawler_cranes', 'Mobile_cranes', 'Tower_cranes',
-        'Mini_excavators', 'Skid-steer_loaders', 'Telehandlers',
-        'Pile_drivers', 'Road_rollers', 'Steamrollers',
-        'Scrapers_(machines)', 'Trenchers', 'Drilling_rigs'
-    ]
-
-    for subcat in relevant_subcats:
-        sub_images = get_category_images(subcat, limit=50)
-        category_images.extend(sub_images)
-        print(f'  + {len(sub_images)} images from {subcat}')
-
-    # 去重
-    category_images = list(set(category_images))
-    print(f'  Total unique images: {len(category_images)}')
-
-    # Step 2: 筛选匹配工程车关键词的图片
-    print('\n[Step 2] Filtering construction vehicle images...')
-    matched_images = []
-    seen_keywords = set()  # 避免重复下载同类型车辆
-
-    for wiki_title in category_images:
-        name, keyword = extract_vehicle_name(wiki_title)
-        if keyword and keyword not in seen_keywords:
-            matched_images.append({
-                'wiki_title': wiki_title,
-                'name': name,
-                'keyword': keyword,
-                'chinese': CHINESE_NAMES.get(keyword, '工程车'),
-            })
-            seen_keywords.add(keyword)
-            print(f'  [MATCH] {keyword}: {name[:50]}...')
-
+    journal = open_journal(restart)
+    if journal.resumed:
+        print(f'\n[RESUME] {os.path.basename(JOURNAL_FILE)}: {journal.summary()}')
+
+    scan = journal.records('scan')
+    if scan:
+        # 上次已经筛选完，直接用日志里的结果
+        print('\n[Step 1+2] Matched images taken from the journal')
+        matched_images = scan[-1]['matched']
+        scanned = scan[-1]['scanned']
+    else:
+        # Step 1 + 2: 遍历分类树，标题边爬边筛选
+        print('\n[Step 1] Crawling categories on Wikimedia Commons...')
+        print(f'  Roots: {len(CRAWL_ROOTS)}, depth: {CRAWL_DEPTH}, workers: {CRAWL_WORKERS}')
+        if _crawled:
+            print(f'  {len(_crawled)} categories replayed from the journal')
+
+        print('\n[Step 2] Filtering construction vehicle images (streamed)...')
+        matched_images = []
+        seen_keywords = set()  # 避免重复下载同类型车辆
+        scanned = 0
+
+        for wiki_title in walk_categories(CRAWL_ROOTS):
+            scanned += 1
+            name, keyword = extract_vehicle_name(wiki_title)
+            if keyword and keyword not in seen_keywords:
+                matched_images.append({
+                    'wiki_title': wiki_title,
+                    'name': name,
+                    'keyword': keyword,
+                    'chinese': CHINESE_NAMES.get(keyword, '工程车'),
+                })
+                seen_keywords.add(keyword)
+                print(f'  [MATCH] {keyword}: {name[:50]}...')
+
+                # 所有关键词都已匹配，无需继续爬取
+                if len(seen_keywords) == len(CONSTRUCTION_KEYWORDS):
+                    break
+
+        journal.append('scan', scanned=scanned, matched=matched_images)
+
+    print(f'\n  Scanned {scanned} images')
     print(f'\n  Matched {len(matched_images)} unique vehicle types')
 
     # Step 3: 下载图片
     print('\n[Step 3] Downloading images...')
-    downloaded_vehicles = []
+    # 日志里已完成的下载（文件还在）不再处理；JSON 由日志逐条生成
+    downloaded_vehicles = [v for v in journal.records('download')
+                           if os.path.exists(os.path.join(SAVE_DIR, v['filename']))]
+    done = {v['filename'] for v in downloaded_vehicles}
+    if done:
+        print(f'  {len(done)} downloads already in the journal')
+
+    # 只为本地还没有的图片批量解析URL（每次请求 50 个）
+    for item in matched_images:
+        item['filename'] = create_safe_filename(item['name'], item['keyword'])
+    image_urls = get_image_urls([item['wiki_title'] for item in matched_images
+                                 if not os.path.exists(os.path.join(SAVE_DIR, item['filename']))])
 
     for item in matched_images:
-        # 获取图片URL
-        image_url = get_image_url(item['wiki_title'])
-        if not image_url:
-            print(f'  [SKIP] Could not get URL for: {item["keyword"]}')
+        filename = item['filename']
+        if filename in done:
             continue
+        if os.path.exists(os.path.join(SAVE_DIR, filename)):
+            # 已存在的文件不联网，也不需要等待
+            print(f'  [SKIP] {filename} exists')
+            success = True
+        elif get_api_cache().offline:
+            print(f'  [SKIP] {filename}: not downloaded (offline)')
+            continue
+        else:
+            # 获取图片URL
+            image_url = image_urls.get(item['wiki_title'])
+            if not image_url:
+                print(f'  [SKIP] Could not get URL for: {item["keyword"]}')
+                continue
 
-        # 生成文件名
-        filename = create_safe_filename(item['name'], item['keyword'])
+            # 下载（upload.wikimedia.org 的速率由 rate_limiter 控制）
+            success, filepath = download_image(image_url, filename)
 
-        # 下载
-        success, filepath = download_image(image_url, filename)
         if success:
-            downloaded_vehicles.append({
+            vehicle = {
                 'name': item['keyword'],
                 'chinese': item['chinese'],
                 'filename': filename,
-            })
-
-        time.sleep(3)  # 增加延迟避免速率限制
+            }
+            journal.append('download', **vehicle)
+            downloaded_vehicles.append(vehicle)
+            done.add(filename)
+            save_data(downloaded_vehicles)
 
     # Step 4: 生成 JavaScript 数据
     print('\n[Step 4] Generating JavaScript data...')
-    js_entries = generate_js_data(downloaded_vehicles)
-
-    print('\n' + '=' * 60)
-    print('Generated JavaScript data for vehicles-data.js:')
-    print('=' * 60)
-    print('\n  // ==================== 工程车类 ====================')
-    print('  constructionVehicles: [')
-    for entry in js_entries:
-        print(entry + ',')
-    print('  ],')
+    print_js_data(downloaded_vehicles)
 
-    # 保存到文件
-    output_file = os.path.join(os.path.dirname(__file__), 'construction_vehicles_data.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(downloaded_vehicles, f, ensure_ascii=False, indent=2)
-    print(f'\n[INFO] Data saved to: {output_file}')
+    # 爬取全部失败时保留上次的结果
+    if downloaded_vehicles:
+        save_data(downloaded_vehicles)
+        print(f'\n[INFO] Data saved to: {DATA_FILE}')
+        print('[INFO] Run python3 build_vehicles_data.py to update js/vehicles-data.js')
+    else:
+        print(f'\n[WARN] Nothing matched, {DATA_FILE} left unchanged')
+    journal.finish()
 
     print('\n' + '=' * 60)
     print(f'Done! Downloaded: {len(downloaded_vehicles)} vehicle images')
+    print(get_pool().report())
+    print(get_api_cache().report())
+    print(get_limiter().report())
     print('=' * 60)
 
     return downloaded_vehicles
 
 if __name__ == '__main__':
-    main()
+    if '--js-only' in sys.argv:
+        # 只根据已保存的 JSON 重新打印 JS 数据，不联网
+        with open(DATA_FILE, encoding='utf-8') as f:
+            print_js_data(json.load(f))
+    else:
+        # --offline: 只用 API 缓存（改了 CONSTRUCTION_KEYWORDS 后几秒内重新筛选）
+        # --refresh: 忽略缓存，重新请求所有查询
+        # --restart: 丢弃上次中断留下的任务日志，从头开始
+        get_api_cache().offline = '--offline' in sys.argv
+        get_api_cache().refresh = '--refresh' in sys.argv
+        main(restart='--restart' in sys.argv or '--refresh' in sys.argv)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Shared Download Engine
+Runs download tasks on a thread pool, limiting how many run against each host
+Used by download_images.py, download_icons.py and download_twemoji.py
+"""
+
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+# Total worker threads across all hosts
+DEFAULT_WORKERS = 8
+
+# Parallel requests allowed against a single host
+DEFAULT_PER_HOST = 4
+
+
+def host_of(url):
+    """Return the host name of a URL (used as the concurrency key)"""
+    return urllib.parse.urlsplit(url).hostname or ''
+
+
+class DownloadEngine:
+    """
+    Thread pool with a per-host concurrency limit
+
+    Usage:
+        with DownloadEngine(per_host=4) as engine:
+            futures = [engine.submit(url, download_fn, arg1, arg2) for ...]
+            results = [f.result() for f in futures]
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+                 host_limits=None, host_delay=0):
+        # host_limits: {host: max parallel requests}, overrides per_host
+        # host_delay: seconds a host slot stays busy after each task (politeness)
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.host_limits = dict(host_limits or {})
+        self.host_delay = host_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='download')
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host):
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                limit = self.host_limits.get(host, self.per_host)
+                sem = threading.BoundedSemaphore(max(1, limit))
+                self._semaphores[host] = sem
+            return sem
+
+    def _run(self, host, func, args, kwargs):
+        sem = self._semaphore(host)
+        with sem:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if self.host_delay:
+                    time.sleep(self.host_delay)
+
+    def submit(self, url, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) as a task bound to the host of url"""
+        return self._executor.submit(self._run, host_of(url), func, args, kwargs)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
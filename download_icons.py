@@ -3,15 +3,22 @@
 Vehicle Icon Download Script
 Uses Iconify API (free, reliable icon library)
 Downloads SVG icons and generates a verification HTML page
+Hedged between the Iconify API and its public mirrors (hedged_fetch.py)
 """
 
 import os
-import urllib.request
-import ssl
-import time
 import sys
 import json
 
+from download_engine import DownloadEngine
+from asset_manifest import get_manifest
+from asset_store import get_store
+from hedged_fetch import AllSourcesFailed, Candidate, get_fetcher
+from http_pool import get_pool
+from rate_limiter import get_limiter
+from verify_gallery import generate_gallery, read_sections
+import svg_tools
+
 # Fix Windows encoding
 if sys.platform == 'win32':
     try:
@@ -19,17 +26,23 @@ if sys.platform == 'win32':
     except:
         pass
 
-# Disable SSL verification
-ssl._create_default_https_context = ssl._create_unverified_context
-
 # Directories
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SAVE_DIR = os.path.join(BASE_DIR, 'images', 'vehicles')
 os.makedirs(SAVE_DIR, exist_ok=True)
 
+# Parallel downloads
+MAX_WORKERS = 8
+PER_HOST_CONCURRENCY = 4
+
+# Iconify SVGs are a few KB
+MAX_BYTES = 256 * 1024
+
 # Iconify API base URL
 # Format: https://api.iconify.design/{prefix}/{name}.svg
 # Popular icon sets: noto (Google Noto Emoji), twemoji, fxemoji, openmoji
+# The same API is mirrored on these hosts; used when the main one is slow or fails
+ICONIFY_HOSTS = ['api.iconify.design', 'api.simplesvg.com', 'api.unisvg.com']
 
 # Vehicle icons mapping: filename -> (icon_set, icon_name, chinese_name)
 # Using multiple icon sets for best coverage
@@ -171,102 +184,78 @@ VEHICLE_ICONS = {
 }
 
 
-def download_icon(filename, icon_set, icon_name, chinese_name):
-    """Download a single icon from Iconify API"""
-    filepath = os.path.join(SAVE_DIR, filename)
-
-    # Skip if exists
-    if os.path.exists(filepath) and os.path.getsize(filepath) > 500:
-        return True, 'exists'
+def icon_url(icon_set, icon_name, host=ICONIFY_HOSTS[0]):
+    """Iconify API URL for an icon"""
+    return f'https://{host}/{icon_set}/{icon_name}.svg?width=128&height=128'
 
-    # Try PNG from Iconify API
-    url = f'https://api.iconify.design/{icon_set}/{icon_name}.svg?width=128&height=128'
 
+def check_svg(path):
+    """Parse the whole downloaded body, so broken or empty icons never reach the iPad"""
+    with open(path, 'rb') as f:
+        data = f.read()
     try:
+        svg_tools.parse(data)
+    except svg_tools.SVGError as e:
+        return f'invalid SVG: {e}'
+    return None
+
+
+def download_icon(filename, icon_set, icon_name, chinese_name):
+    """Download a single icon from Iconify API"""
+    # Saved as SVG (will work in browsers)
+    svg_file = filename.replace('.png', '.svg')
+    svg_path = os.path.join(SAVE_DIR, svg_file)
+    manifest = get_manifest()
+
+    # Try SVG from Iconify API, then its mirrors
+    sources = []
+    for host in ICONIFY_HOSTS:
+        url = icon_url(icon_set, icon_name, host)
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'image/svg+xml,image/*,*/*;q=0.8'
         }
-        request = urllib.request.Request(url, headers=headers)
+        # Conditional GET if the file on disk matches the manifest
+        headers.update(manifest.conditional_headers(svg_file, url, svg_path))
+        # An invalid body fails over to the next mirror
+        sources.append(Candidate(host, url, svg_path, headers, MAX_BYTES, None, check_svg))
 
-        with urllib.request.urlopen(request, timeout=30) as response:
-            data = response.read()
+    try:
+        hedged = get_fetcher().fetch(sources)
+        result, url = hedged.result, hedged.candidate.url
 
-        # Check if we got valid SVG
-        if b'<svg' not in data and b'<?xml' not in data:
-            return False, 'not SVG'
+        if result.status == 304:
+            manifest.touch(svg_file)
+            return True, 'unchanged'
 
-        # Save as SVG (will work in browsers)
-        svg_path = filepath.replace('.png', '.svg')
-        with open(svg_path, 'wb') as f:
-            f.write(data)
+        manifest.record(svg_file, url, result.size, result.sha256,
+                        result.etag, result.last_modified)
 
-        return True, 'downloaded'
+        return True, 'downloaded' if result.saved == 'written' else result.saved
 
+    except AllSourcesFailed as e:
+        return False, str(e)[:60]
     except Exception as e:
         return False, str(e)[:30]
 
 
 def generate_verification_html():
-    """Generate HTML page to verify downloaded icons"""
-    html = '''<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Vehicle Icons Verification</title>
-    <style>
-        body { font-family: Arial; padding: 20px; background: #f5f5f5; }
-        h1 { text-align: center; color: #333; }
-        .grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(150px, 1fr)); gap: 15px; }
-        .card { background: white; border-radius: 10px; padding: 15px; text-align: center; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
-        .card img, .card object { width: 64px; height: 64px; margin-bottom: 10px; }
-        .card .name { font-size: 12px; color: #333; font-weight: bold; }
-        .card .chinese { font-size: 11px; color: #666; }
-        .card .file { font-size: 10px; color: #999; word-break: break-all; }
-        .card.missing { background: #ffe0e0; }
-        .status { text-align: center; margin: 20px 0; padding: 15px; background: white; border-radius: 10px; }
-    </style>
-</head>
-<body>
-    <h1>Vehicle Icons Verification Page</h1>
-    <div class="status">
-        <p>Check each icon to ensure it matches the vehicle name.</p>
-        <p>Red background = missing file</p>
-    </div>
-    <div class="grid">
-'''
-
-    for filename, (icon_set, icon_name, chinese) in VEHICLE_ICONS.items():
-        svg_file = filename.replace('.png', '.svg')
-        svg_path = os.path.join(SAVE_DIR, svg_file)
-        exists = os.path.exists(svg_path)
-
-        card_class = '' if exists else 'missing'
-        img_tag = f'<object data="images/vehicles/{svg_file}" type="image/svg+xml"></object>' if exists else '<div style="width:64px;height:64px;background:#ddd;margin:0 auto 10px;border-radius:10px;">?</div>'
-
-        html += f'''
-        <div class="card {card_class}">
-            {img_tag}
-            <div class="name">{icon_name}</div>
-            <div class="chinese">{chinese}</div>
-            <div class="file">{svg_file}</div>
-        </div>
-'''
-
-    html += '''
-    </div>
-</body>
-</html>
-'''
-
-    verify_path = os.path.join(BASE_DIR, 'verify-icons.html')
-    with open(verify_path, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    return verify_path
+    """Generate HTML pages to verify downloaded icons"""
+    entries = [(filename.replace('.png', '.svg'), icon_name, chinese)
+               for filename, (icon_set, icon_name, chinese) in VEHICLE_ICONS.items()]
+    return generate_gallery(
+        'icons', 'Vehicle Icons Verification Page', entries,
+        notes=['Check each icon to ensure it matches the vehicle name.',
+               'Red background = missing file'],
+        sections=read_sections(__file__, 'VEHICLE_ICONS'))
 
 
 def main():
+    if '--verify-only' in sys.argv:
+        # Rebuild the verification page from files already on disk
+        print(f'Verification page: {generate_verification_html()}')
+        return
+
     print('=' * 50)
     print('Vehicle Icon Download Script (Iconify API)')
     print('=' * 50)
@@ -278,19 +267,31 @@ def main():
     fail = 0
     failed_list = []
 
-    for filename, (icon_set, icon_name, chinese) in VEHICLE_ICONS.items():
-        ok, status = download_icon(filename, icon_set, icon_name, chinese)
-        if ok:
-            success += 1
-            print(f'  [OK] {filename} ({status})')
-        else:
-            fail += 1
-            failed_list.append((filename, chinese, status))
-            print(f'  [FAIL] {filename}: {status}')
-        time.sleep(0.2)
+    with DownloadEngine(max_workers=MAX_WORKERS, per_host=PER_HOST_CONCURRENCY) as engine:
+        futures = [
+            (filename, chinese,
+             engine.submit(icon_url(icon_set, icon_name), download_icon,
+                           filename, icon_set, icon_name, chinese))
+            for filename, (icon_set, icon_name, chinese) in VEHICLE_ICONS.items()
+        ]
+
+        for filename, chinese, future in futures:
+            ok, status = future.result()
+            if ok:
+                success += 1
+                print(f'  [OK] {filename} ({status})')
+            else:
+                fail += 1
+                failed_list.append((filename, chinese, status))
+                print(f'  [FAIL] {filename}: {status}')
 
     print('\n' + '=' * 50)
     print(f'Done! Success: {success}, Failed: {fail}')
+    get_manifest().save()
+    print(get_store().report())
+    print(get_fetcher().report())
+    print(get_pool().report())
+    print(get_limiter().report())
 
     # Generate verification page
     verify_path = generate_verification_html()
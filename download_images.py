@@ -2,27 +2,40 @@
 """
 Vehicle Image Download Script
 Downloads PNG images to images/vehicles/ folder
+Each image is a hedged download (hedged_fetch.py): flaticon first, then
+alternate flaticon icons, the Twemoji PNG and the Iconify SVG of the
+same vehicle when flaticon is slow or fails
 """
 
 import os
-import urllib.request
-import ssl
-import time
 import sys
 
+from download_engine import DownloadEngine
+from asset_manifest import get_manifest
+from asset_store import get_store
+from hedged_fetch import AllSourcesFailed, Candidate, get_fetcher
+from http_pool import get_pool
+from rate_limiter import get_limiter
+import download_icons
+import download_twemoji
+
 # Fix Windows encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
-# Disable SSL verification
-ssl._create_default_https_context = ssl._create_unverified_context
-
 # Save directory
 SAVE_DIR = os.path.join(os.path.dirname(__file__), 'images', 'vehicles')
 
 # Ensure directory exists
 os.makedirs(SAVE_DIR, exist_ok=True)
 
+# Parallel downloads (flaticon blocks aggressive clients, so keep per-host low)
+MAX_WORKERS = 4
+PER_HOST_CONCURRENCY = 2
+
+# 128px icons are a few KB; anything bigger is not what we asked for
+MAX_BYTES = 256 * 1024
+
 # Vehicle images from free icon libraries
 VEHICLE_IMAGES = {
     # === Cars ===
@@ -161,39 +174,99 @@ VEHICLE_IMAGES = {
     'amphibious.png': 'https://cdn-icons-png.flaticon.com/128/2830/2830370.png',
 }
 
-def download_image(filename, url):
-    """Download a single image"""
+# Other flaticon icons of the same vehicle, tried after the main one
+ALTERNATE_IMAGES = {
+    'harvester.png': ['https://cdn-icons-png.flaticon.com/128/2138/2138440.png'],
+    'tank.png': ['https://cdn-icons-png.flaticon.com/128/1085/1085803.png'],
+}
+
+FLATICON_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'image/png,image/*,*/*;q=0.8',
+    'Referer': 'https://www.flaticon.com/'
+}
+
+def check_image(head, size):
+    """Reject bodies too small to be an image (flaticon blocks with tiny replies)"""
+    if size < 100:
+        return 'File too small, might be blocked'
+    return None
+
+def candidates(filename, url):
+    """Sources for one image, best first"""
     filepath = os.path.join(SAVE_DIR, filename)
+    found = [Candidate('flaticon', u, filepath, FLATICON_HEADERS, MAX_BYTES, check_image)
+             for u in [url] + ALTERNATE_IMAGES.get(filename, [])]
+    if filename in download_twemoji.TWEMOJI_VEHICLES:
+        code = download_twemoji.TWEMOJI_VEHICLES[filename][0]
+        found.append(Candidate('twemoji', download_twemoji.twemoji_url(code), filepath,
+                               {'User-Agent': FLATICON_HEADERS['User-Agent']},
+                               download_twemoji.MAX_BYTES, download_twemoji.check_png))
+    if filename in download_icons.VEHICLE_ICONS:
+        icon_set, icon_name, chinese = download_icons.VEHICLE_ICONS[filename]
+        found.append(Candidate('iconify', download_icons.icon_url(icon_set, icon_name),
+                               os.path.join(SAVE_DIR, filename.replace('.png', '.svg')),
+                               {'User-Agent': FLATICON_HEADERS['User-Agent'],
+                                'Accept': 'image/svg+xml,image/*,*/*;q=0.8'},
+                               download_icons.MAX_BYTES, None, download_icons.check_svg))
+    return found
 
-    # Skip if file exists
+def remove_sibling(manifest, filepath):
+    """Delete another format of an image (and its manifest entry)"""
     if os.path.exists(filepath):
-        print(f'  [SKIP] {filename} exists')
-        return True
+        os.remove(filepath)
+        print(f'  [DEL] {os.path.basename(filepath)} (replaced)')
+    manifest.forget(os.path.basename(filepath))
 
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'image/png,image/*,*/*;q=0.8',
-            'Referer': 'https://www.flaticon.com/'
-        }
-        request = urllib.request.Request(url, headers=headers)
+def download_image(filename, url):
+    """Download a single image (from the first source that answers)"""
+    manifest = get_manifest()
+    found = candidates(filename, url)
+    primary = found[0]
+    intact = manifest.is_intact(filename, primary.filepath)
 
-        with urllib.request.urlopen(request, timeout=30) as response:
-            data = response.read()
+    # Conditional GET if the file on disk matches the manifest for that source
+    sources = []
+    for c in found:
+        if intact and c.filepath != primary.filepath:
+            # Only revalidate the intact file; another format must not win over it
+            continue
+        name = os.path.basename(c.filepath)
+        headers = dict(c.headers, **manifest.conditional_headers(name, c.url, c.filepath))
+        sources.append(c._replace(headers=headers))
 
-        # Verify it's actually an image (PNG starts with specific bytes)
-        if len(data) < 100:
-            raise Exception('File too small, might be blocked')
+    try:
+        hedged = get_fetcher().fetch(sources)
+    except AllSourcesFailed as e:
+        if intact:
+            print(f'  [SKIP] {filename} kept, not revalidated: {str(e)[:60]}')
+            return True
+        print(f'  [FAIL] {filename}: {str(e)[:80]}')
+        return False
 
-        with open(filepath, 'wb') as f:
-            f.write(data)
+    winner, result = hedged.candidate, hedged.result
+    name = os.path.basename(winner.filepath)
+    via = '' if winner is sources[0] else f' via {winner.source}'
+    fallback = winner.filepath != primary.filepath
 
-        print(f'  [OK] {filename}')
+    # One file per image: drop the other format a previous run left behind
+    # (an .svg only if this script wrote it; otherwise it is download_icons.py's)
+    for path in {c.filepath for c in found} - {winner.filepath}:
+        entry = manifest.get(os.path.basename(path)) or {}
+        if fallback or entry.get('fallback_for') == filename:
+            remove_sibling(manifest, path)
+
+    if result.status == 304:
+        manifest.touch(name, fallback=fallback)
+        print(f'  [SKIP] {name} unchanged{via}')
         return True
 
-    except Exception as e:
-        print(f'  [FAIL] {filename}: {str(e)[:40]}')
-        return False
+    manifest.record(name, winner.url, result.size, result.sha256,
+                    result.etag, result.last_modified,
+                    fallback_for=filename if fallback else None)
+
+    print(f'  [OK] {name} ({result.saved}){via}')
+    return True
 
 def main():
     print('=' * 50)
@@ -206,15 +279,23 @@ def main():
     success = 0
     fail = 0
 
-    for filename, url in VEHICLE_IMAGES.items():
-        if download_image(filename, url):
-            success += 1
-        else:
-            fail += 1
-        time.sleep(0.3)
+    with DownloadEngine(max_workers=MAX_WORKERS, per_host=PER_HOST_CONCURRENCY) as engine:
+        futures = [engine.submit(url, download_image, filename, url)
+                   for filename, url in VEHICLE_IMAGES.items()]
+
+        for future in futures:
+            if future.result():
+                success += 1
+            else:
+                fail += 1
 
     print('\n' + '=' * 50)
     print(f'Done! Success: {success}, Failed: {fail}')
+    get_manifest().save()
+    print(get_store().report())
+    print(get_fetcher().report())
+    print(get_pool().report())
+    print(get_limiter().report())
     print('=' * 50)
 
 if __name__ == '__main__':
@@ -2,28 +2,41 @@
 """
 Download vehicle icons from Twemoji (Twitter's open source emoji)
 These are high quality, consistent PNG images
+Hedged between jsDelivr and the cdnjs mirror (hedged_fetch.py)
 """
 
 import os
-import urllib.request
-import ssl
-import time
 import sys
 
+from download_engine import DownloadEngine
+from asset_manifest import get_manifest
+from asset_store import get_store
+from hedged_fetch import AllSourcesFailed, Candidate, get_fetcher
+from http_pool import get_pool
+from rate_limiter import get_limiter
+from verify_gallery import generate_gallery, read_sections
+
 if sys.platform == 'win32':
     try:
         sys.stdout.reconfigure(encoding='utf-8', errors='replace')
     except:
         pass
 
-ssl._create_default_https_context = ssl._create_unverified_context
-
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SAVE_DIR = os.path.join(BASE_DIR, 'images', 'vehicles')
 os.makedirs(SAVE_DIR, exist_ok=True)
 
+# Parallel downloads (jsDelivr handles many concurrent requests fine)
+MAX_WORKERS = 8
+PER_HOST_CONCURRENCY = 6
+
+# 72x72 PNGs are 1-5 KB
+MAX_BYTES = 64 * 1024
+
 # Twemoji CDN: https://cdn.jsdelivr.net/gh/twitter/twemoji@latest/assets/72x72/{code}.png
 # Code is the emoji's Unicode codepoint in lowercase hex
+# cdnjs serves the same files; used when jsDelivr is slow or fails
+TWEMOJI_MIRROR = 'https://cdnjs.cloudflare.com/ajax/libs/twemoji/14.0.2/72x72/{code}.png'
 
 # Mapping: filename -> (twemoji_code, english_name, chinese_name)
 # These are all verified to exist in Twemoji
@@ -100,98 +113,76 @@ TWEMOJI_VEHICLES = {
 }
 
 
+def twemoji_url(code):
+    """Twemoji CDN URL for an emoji code"""
+    return f'https://cdn.jsdelivr.net/gh/twitter/twemoji@latest/assets/72x72/{code}.png'
+
+
+def twemoji_urls(code):
+    """Twemoji URLs for an emoji code, best first"""
+    return [twemoji_url(code), TWEMOJI_MIRROR.format(code=code)]
+
+
+def check_png(head, size):
+    """Reject tiny bodies and anything without a PNG signature"""
+    if size < 500:
+        return 'too small'
+    # Verify PNG signature
+    if not head.startswith(b'\x89PNG'):
+        return 'not PNG'
+    return None
+
+
 def download_twemoji(filename, code, english, chinese):
     """Download a single Twemoji PNG"""
     filepath = os.path.join(SAVE_DIR, filename)
+    manifest = get_manifest()
 
-    if os.path.exists(filepath) and os.path.getsize(filepath) > 500:
-        return True, 'exists'
-
-    # Twemoji CDN URL
-    url = f'https://cdn.jsdelivr.net/gh/twitter/twemoji@latest/assets/72x72/{code}.png'
-
-    try:
+    sources = []
+    for source, url in zip(('jsdelivr', 'cdnjs'), twemoji_urls(code)):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        request = urllib.request.Request(url, headers=headers)
+        # Conditional GET if the file on disk matches the manifest
+        headers.update(manifest.conditional_headers(filename, url, filepath))
+        sources.append(Candidate(source, url, filepath, headers, MAX_BYTES, check_png))
 
-        with urllib.request.urlopen(request, timeout=30) as response:
-            data = response.read()
-
-        if len(data) < 500:
-            return False, 'too small'
-
-        # Verify PNG signature
-        if not data.startswith(b'\x89PNG'):
-            return False, 'not PNG'
+    try:
+        hedged = get_fetcher().fetch(sources)
+    except AllSourcesFailed as e:
+        return False, str(e)[:60]
 
-        with open(filepath, 'wb') as f:
-            f.write(data)
+    result, url = hedged.result, hedged.candidate.url
+    if result.status == 304:
+        manifest.touch(filename)
+        return True, 'unchanged'
 
-        return True, 'OK'
+    manifest.record(filename, url, result.size, result.sha256,
+                    result.etag, result.last_modified)
 
-    except Exception as e:
-        return False, str(e)[:30]
+    status = 'OK' if result.saved == 'written' else result.saved
+    return True, status if hedged.candidate is sources[0] else f'{status} via {hedged.candidate.source}'
 
 
 def generate_verification_html():
-    """Generate HTML verification page"""
-    html = '''<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Twemoji Vehicle Icons - Verification</title>
-    <style>
-        body { font-family: Arial; padding: 20px; background: #f0f4f8; }
-        h1 { text-align: center; color: #333; }
-        .info { text-align: center; background: white; padding: 15px; border-radius: 10px; margin-bottom: 20px; }
-        .grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(140px, 1fr)); gap: 12px; }
-        .card { background: white; border-radius: 12px; padding: 12px; text-align: center; box-shadow: 0 2px 8px rgba(0,0,0,0.1); }
-        .card img { width: 72px; height: 72px; margin-bottom: 8px; }
-        .card .en { font-size: 13px; font-weight: bold; color: #333; }
-        .card .zh { font-size: 12px; color: #666; margin-top: 4px; }
-        .card.missing { background: #ffe0e0; }
-        .card.ok { border: 2px solid #4CAF50; }
-    </style>
-</head>
-<body>
-    <h1>Twemoji Vehicle Icons</h1>
-    <div class="info">
-        <p><strong>Instructions:</strong> Check each icon matches its label.</p>
-        <p>Green border = downloaded successfully | Red background = missing</p>
-    </div>
-    <div class="grid">
-'''
-
-    for filename, (code, english, chinese) in TWEMOJI_VEHICLES.items():
-        filepath = os.path.join(SAVE_DIR, filename)
-        exists = os.path.exists(filepath) and os.path.getsize(filepath) > 500
-
-        card_class = 'ok' if exists else 'missing'
-        img_tag = f'<img src="images/vehicles/{filename}" alt="{english}">' if exists else '<div style="width:72px;height:72px;background:#eee;margin:0 auto 8px;border-radius:10px;line-height:72px;">?</div>'
-
-        html += f'''
-        <div class="card {card_class}">
-            {img_tag}
-            <div class="en">{english}</div>
-            <div class="zh">{chinese}</div>
-        </div>
-'''
-
-    html += '''
-    </div>
-</body>
-</html>
-'''
-
-    path = os.path.join(BASE_DIR, 'verify-twemoji.html')
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(html)
-    return path
+    """Generate HTML verification pages"""
+    entries = [(filename, english, chinese)
+               for filename, (code, english, chinese) in TWEMOJI_VEHICLES.items()]
+    return generate_gallery(
+        'twemoji', 'Twemoji Vehicle Icons', entries,
+        notes=['<strong>Instructions:</strong> Check each icon matches its label.',
+               'Green border = downloaded successfully | Red background = missing'],
+        # Anything smaller is an error page, not an icon
+        min_size=500,
+        sections=read_sections(__file__, 'TWEMOJI_VEHICLES'))
 
 
 def main():
+    if '--verify-only' in sys.argv:
+        # Rebuild the verification page from files already on disk
+        print(f'Verification page: {generate_verification_html()}')
+        return
+
     print('=' * 50)
     print('Twemoji Vehicle Icons Downloader')
     print('=' * 50)
@@ -202,18 +193,29 @@ def main():
     success = 0
     fail = 0
 
-    for filename, (code, english, chinese) in TWEMOJI_VEHICLES.items():
-        ok, status = download_twemoji(filename, code, english, chinese)
-        if ok:
-            success += 1
-            print(f'  [OK] {filename}')
-        else:
-            fail += 1
-            print(f'  [FAIL] {filename}: {status}')
-        time.sleep(0.15)
+    with DownloadEngine(max_workers=MAX_WORKERS, per_host=PER_HOST_CONCURRENCY) as engine:
+        futures = [
+            (filename, engine.submit(twemoji_url(code), download_twemoji,
+                                     filename, code, english, chinese))
+            for filename, (code, english, chinese) in TWEMOJI_VEHICLES.items()
+        ]
+
+        for filename, future in futures:
+            ok, status = future.result()
+            if ok:
+                success += 1
+                print(f'  [OK] {filename} ({status})')
+            else:
+                fail += 1
+                print(f'  [FAIL] {filename}: {status}')
 
     print('\n' + '=' * 50)
     print(f'Done! Success: {success}, Failed: {fail}')
+    get_manifest().save()
+    print(get_store().report())
+    print(get_fetcher().report())
+    print(get_pool().report())
+    print(get_limiter().report())
 
     verify = generate_verification_html()
     print(f'\nVerification page: {verify}')
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate Image Finder
+Computes a 64-bit perceptual hash (DCT pHash) for every PNG in
+images/vehicles and groups images whose hashes differ in at most
+--threshold bits, e.g. car.png / red-car.png. Byte-identical files of
+any image type (JPEG, SVG too) are grouped by sha256; other files (such
+as the .gz/.br siblings written by precompress.py) are ignored.
+
+Hashes are cached by file mtime and size in images/vehicles/.phash-cache.json,
+so a rerun on an unchanged directory does no decoding. Decoding runs on a
+process pool; NumPy is used for the DCT when installed.
+
+Usage: python3 find_duplicates.py [--threshold N] [--json report.json]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import png_codec
+from validate_assets import IMAGE_EXTENSIONS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.path.join(BASE_DIR, 'images', 'vehicles')
+CACHE_PATH = os.path.join(IMAGE_DIR, '.phash-cache.json')
+
+# Image is reduced to SAMPLE x SAMPLE gray, the top-left HASH_SIZE x HASH_SIZE
+# DCT coefficients (minus DC) are compared with their median
+SAMPLE = 32
+HASH_SIZE = 8
+
+# Max differing bits (of 64) for two images to count as near-duplicates
+DEFAULT_THRESHOLD = 8
+
+# Bump when the hash algorithm changes, to invalidate the cache
+CACHE_VERSION = 1
+
+_DCT = [[math.cos(math.pi * (2 * x + 1) * u / (2 * SAMPLE)) for x in range(SAMPLE)]
+        for u in range(HASH_SIZE)]
+
+
+def gray_thumbnail(width, height, rgba):
+    """SAMPLE x SAMPLE luma (composited on white), box-averaged"""
+    gray = [0.0] * (SAMPLE * SAMPLE)
+    counts = [0] * (SAMPLE * SAMPLE)
+    for y in range(height):
+        row = (y * SAMPLE // height) * SAMPLE
+        offset = y * width * 4
+        for x in range(width):
+            i = offset + x * 4
+            a = rgba[i + 3] / 255
+            luma = 0.299 * rgba[i] + 0.587 * rgba[i + 1] + 0.114 * rgba[i + 2]
+            cell = row + x * SAMPLE // width
+            gray[cell] += luma * a + 255 * (1 - a)
+            counts[cell] += 1
+    return [g / c if c else 255.0 for g, c in zip(gray, counts)]
+
+
+def dct_hash(gray):
+    """64-bit pHash of a SAMPLE x SAMPLE gray image, as an int"""
+    if np is not None:
+        basis = np.array(_DCT)
+        coeffs = (basis @ np.array(gray).reshape(SAMPLE, SAMPLE) @ basis.T).flatten().tolist()
+    else:
+        # C @ G @ C^T, only the HASH_SIZE x HASH_SIZE corner is needed
+        rows = [[sum(c * gray[y * SAMPLE + x] for x, c in enumerate(basis)) for basis in _DCT]
+                for y in range(SAMPLE)]
+        coeffs = [sum(_DCT[u][y] * rows[y][v] for y in range(SAMPLE))
+                  for u in range(HASH_SIZE) for v in range(HASH_SIZE)]
+
+    # The DC term only says how bright the image is
+    median = sorted(coeffs[1:])[len(coeffs) // 2 - 1]
+    value = 0
+    for c in coeffs:
+        value = (value << 1) | (c > median)
+    return value
+
+
+def hash_file(path):
+    """Worker: (filename, sha256, phash hex or None, note)"""
+    filename = os.path.basename(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    sha256 = hashlib.sha256(data).hexdigest()
+    if not png_codec.is_png(data):
+        return filename, sha256, None, 'not a PNG'
+    try:
+        width, height, rgba = png_codec.decode(data)
+    except png_codec.PNGError as e:
+        return filename, sha256, None, str(e)
+    return filename, sha256, f'{dct_hash(gray_thumbnail(width, height, rgba)):016x}', None
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get('files', {}) if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(files):
+    tmp = CACHE_PATH + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f, indent=1, sort_keys=True)
+    os.replace(tmp, CACHE_PATH)
+
+
+def scan(directory=IMAGE_DIR):
+    """{filename: {'mtime', 'size', 'sha256', 'phash', 'note'}}, reusing the cache"""
+    cache = load_cache()
+    entries = {}
+    todo = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            if os.path.splitext(entry.name)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            st = entry.stat()
+            cached = cache.get(entry.name)
+            if cached and cached['mtime'] == st.st_mtime_ns and cached['size'] == st.st_size:
+                entries[entry.name] = cached
+            else:
+                entries[entry.name] = {'mtime': st.st_mtime_ns, 'size': st.st_size}
+                todo.append(entry.path)
+
+    if todo:
+        with ProcessPoolExecutor() as pool:
+            for filename, sha256, phash, note in pool.map(hash_file, sorted(todo), chunksize=4):
+                entries[filename].update(sha256=sha256, phash=phash, note=note)
+    if todo or len(entries) != len(cache):
+        save_cache(entries)
+    return entries, len(todo)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def group(items, linked):
+    """Connected components of items under the linked(a, b) relation"""
+    parent = {item: item for item in items}
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for i, a in enumerate(items):
+        for b in items[i + 1:]:
+            if linked(a, b):
+                parent[find(a)] = find(b)
+
+    groups = {}
+    for item in items:
+        groups.setdefault(find(item), []).append(item)
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: g[0])
+
+
+def find_groups(entries, threshold=DEFAULT_THRESHOLD):
+    """(exact groups by sha256, near groups by pHash distance)"""
+    by_sha = {}
+    for name, entry in entries.items():
+        by_sha.setdefault(entry['sha256'], []).append(name)
+    exact = sorted(sorted(names) for names in by_sha.values() if len(names) > 1)
+
+    # One representative per exact group, so exact copies are not repeated below
+    hashes = {}
+    for names in by_sha.values():
+        first = sorted(names)[0]
+        if entries[first].get('phash'):
+            hashes[first] = int(entries[first]['phash'], 16)
+    near = group(sorted(hashes), lambda a, b: hamming(hashes[a], hashes[b]) <= threshold)
+    return exact, near, hashes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find duplicate and near-duplicate vehicle images')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f'max differing hash bits (default {DEFAULT_THRESHOLD})')
+    parser.add_argument('--json', help='also write the groups to this JSON file')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('Near-duplicate Image Finder')
+    print('=' * 60)
+
+    entries, hashed = scan()
+    skipped = sorted(name for name, e in entries.items() if not e.get('phash'))
+    print(f'\nFiles: {len(entries)}, hashed now: {hashed}, cached: {len(entries) - hashed}, '
+          f'not hashable: {len(skipped)} (DCT: {"NumPy" if np is not None else "pure Python"})')
+
+    exact, near, hashes = find_groups(entries, args.threshold)
+
+    print(f'\nIdentical files ({len(exact)} groups):')
+    for names in exact:
+        print('  = ' + ', '.join(names))
+
+    print(f'\nNear-duplicates within {args.threshold} bits ({len(near)} groups):')
+    for names in near:
+        first = hashes[names[0]]
+        print('  ~ ' + ', '.join(f'{n} ({hamming(first, hashes[n])})' if i else n
+                                 for i, n in enumerate(names)))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'threshold': args.threshold, 'identical': exact, 'near': near,
+                       'not_hashed': skipped}, f, indent=2)
+        print(f'\nReport saved to: {args.json}')
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Hedged Multi-source Fetching
+An asset that several providers can serve gets an ordered candidate list.
+The first candidate starts at once; if it has not finished within the
+latency budget of its host, the next one starts alongside it (a failure
+starts the next one immediately). Time a request spends queued in the
+rate limiter is added to the budget, so our own pacing never counts as a
+slow host. The first valid body wins, the others
+are cancelled and their partial files dropped.
+
+Each candidate downloads to its own staging file next to its target, so
+two providers writing the same filename never collide; only the winner is
+renamed into place. The budget of a host is the 90th percentile of its
+recent download times, so hedges only fire for the slow tail.
+"""
+
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from asset_store import DownloadCancelled, get_store
+from download_engine import host_of
+from rate_limiter import get_limiter
+
+# Budget used until a host has MIN_SAMPLES timings
+DEFAULT_BUDGET = 1.0
+MIN_BUDGET = 0.3
+MAX_BUDGET = 5.0
+MIN_SAMPLES = 5
+LATENCY_WINDOW = 50
+
+# Threads shared by all hedged downloads
+DEFAULT_WORKERS = 8
+
+# One way to get an asset:
+#   source: short provider name used in reports ('flaticon', 'twemoji', ...)
+#   filepath: where the asset is saved if this candidate wins
+#   headers/max_bytes/validate/verify: passed to AssetStore.download
+Candidate = namedtuple('Candidate', 'source url filepath headers max_bytes validate verify',
+                       defaults=(None,))
+
+# Outcome of a hedged download:
+#   candidate: the winner; result: its asset_store.Downloaded
+#   started: candidates started; errors: [(source, error text)] of the ones that failed
+Hedged = namedtuple('Hedged', 'candidate result started errors')
+
+
+class AllSourcesFailed(Exception):
+    """Every candidate failed"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f'{source}: {error}' for source, error in errors) or 'no candidates')
+
+
+def staging_path(candidate):
+    return f'{candidate.filepath}.{candidate.source}'
+
+
+class _Race:
+    """Shared state of one asset's candidates: the first to claim it wins"""
+
+    def __init__(self):
+        self.cancel = threading.Event()
+        self.lock = threading.Lock()
+        self.winner = None
+
+
+class HedgedFetcher:
+    """
+    Usage:
+        fetcher = get_fetcher()
+        hedged = fetcher.fetch([Candidate('flaticon', url, path, headers, 256 * 1024, check), ...])
+        hedged.candidate.source, hedged.result.status
+        print(fetcher.report())
+    """
+
+    def __init__(self, store=None, max_workers=DEFAULT_WORKERS, budget=None):
+        self.store = store or get_store()
+        self.budget_override = budget
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self._latency = {}      # host -> recent download seconds
+        self._lock = threading.Lock()
+        self.stats = {'assets': 0, 'primary': 0, 'fallback': 0, 'hedged': 0,
+                      'cancelled': 0, 'failed': 0}
+
+    def budget(self, host):
+        """Seconds to wait for a host before starting the next candidate"""
+        if self.budget_override is not None:
+            return self.budget_override
+        with self._lock:
+            samples = sorted(self._latency.get(host, ()))
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_BUDGET
+        p90 = samples[min(len(samples) - 1, len(samples) * 9 // 10)]
+        return min(MAX_BUDGET, max(MIN_BUDGET, p90))
+
+    def _record_latency(self, host, seconds):
+        with self._lock:
+            self._latency.setdefault(host, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _run(self, candidate, race, queued):
+        """Download one candidate to its staging file; place it if it wins"""
+        if race.cancel.is_set():
+            raise DownloadCancelled(candidate.url)
+        staging = staging_path(candidate)
+        start = time.monotonic() + queued
+        # A rejected body (InvalidContent) is just a failed candidate, checked
+        # before it can win; the pool already slows a host down on 429/503
+        # and Retry-After
+        result = self.store.download(candidate.url, staging, headers=candidate.headers,
+                                     timeout=30, max_bytes=candidate.max_bytes,
+                                     validate=candidate.validate, cancel=race.cancel,
+                                     verify=candidate.verify)
+        self._record_latency(host_of(candidate.url), max(0.0, time.monotonic() - start))
+
+        with race.lock:
+            won = race.winner is None
+            if won:
+                race.winner = candidate
+                race.cancel.set()
+                if result.status == 200:
+                    self.store.move(staging, candidate.filepath)
+        if not won:
+            if result.status == 200:
+                os.remove(staging)
+            raise DownloadCancelled(candidate.url)
+        return result
+
+    def fetch(self, candidates):
+        """
+        Download the first candidate that succeeds (see module docstring)
+        Returns Hedged; raises AllSourcesFailed if none does.
+        """
+        self._count('assets')
+        race = _Race()
+        pending = {}            # future -> candidate
+        errors = []
+        started = 0
+        deadline = None         # when the next candidate starts anyway
+
+        def start_next():
+            nonlocal started, deadline
+            candidate = candidates[started]
+            started += 1
+            host = host_of(candidate.url)
+            queued = get_limiter().delay(host)
+            deadline = time.monotonic() + queued + self.budget(host)
+            pending[self._executor.submit(self._run, candidate, race, queued)] = candidate
+
+        if candidates:
+            start_next()
+        while pending:
+            timeout = None
+            if started < len(candidates):
+                timeout = max(0.0, deadline - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Still no answer within the budget: hedge with the next source
+                self._count('hedged')
+                start_next()
+                continue
+
+            for future in done:
+                candidate = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append((candidate.source, str(e)[:60]))
+                    # A failed source does not wait for the budget
+                    if started < len(candidates):
+                        start_next()
+                    continue
+                # The losers stop streaming on their own (race.cancel is set)
+                with self._lock:
+                    self.stats['cancelled'] += len(pending)
+                self._count('primary' if candidate is candidates[0] else 'fallback')
+                return Hedged(candidate, result, started, errors)
+
+        self._count('failed')
+        raise AllSourcesFailed(errors)
+
+    def report(self):
+        s = self.stats
+        return (f"Hedged: {s['assets']} assets, {s['primary']} from the first source, "
+                f"{s['fallback']} from a fallback, {s['hedged']} hedges started, "
+                f"{s['cancelled']} cancelled, {s['failed']} failed")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_default_fetcher = None
+_default_lock = threading.Lock()
+
+
+def get_fetcher():
+    """Shared fetcher used by the download scripts"""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = HedgedFetcher()
+        return _default_fetcher
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Keep-alive HTTP Connection Pool
+Keeps persistent HTTP/1.1 connections per host and reuses one SSL context,
+resuming TLS sessions when a new connection to a known host is needed.
+Replaces urllib.request.urlopen in all download scripts.
+Requests are paced per host by rate_limiter; a 429/503 is retried after
+its Retry-After (a few times) before it is raised.
+Hosts listed in $ASSET_HOST_OVERRIDES are sent to another address over
+plain HTTP (used by bench_downloads.py to point the scripts at a local
+stand-in for the real CDNs).
+"""
+
+import http.client
+import json
+import os
+import ssl
+import threading
+import urllib.parse
+
+from rate_limiter import get_limiter
+
+# Idle connections kept open per host
+DEFAULT_MAX_IDLE = 8
+
+# Socket timeout in seconds
+DEFAULT_TIMEOUT = 30
+
+# Redirects followed before giving up
+MAX_REDIRECTS = 5
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# "Slow down" responses, retried up to MAX_THROTTLE_RETRIES times
+THROTTLE_CODES = (429, 503)
+MAX_THROTTLE_RETRIES = 3
+
+# {"host": "address:port", ...}
+HOST_OVERRIDES_ENV = 'ASSET_HOST_OVERRIDES'
+
+# Errors that mean a reused keep-alive connection was closed by the server
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                 ConnectionResetError, BrokenPipeError, ConnectionAbortedError)
+
+
+class HTTPError(Exception):
+    """Raised for responses with status >= 400 (same message as urllib)"""
+
+    def __init__(self, url, status, reason, headers):
+        super().__init__(f'HTTP Error {status}: {reason}')
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection that resumes a cached TLS session for its host"""
+
+    def __init__(self, host, port=None, *, context, sessions, **kwargs):
+        super().__init__(host, port, context=context, **kwargs)
+        self._sessions = sessions
+        self.tls_resumed = False
+
+    def connect(self):
+        # Plain TCP connect, then wrap with our shared context + cached session
+        http.client.HTTPConnection.connect(self)
+        session = self._sessions.get(self.host)
+        try:
+            self.sock = self._context.wrap_socket(
+                self.sock, server_hostname=self.host, session=session)
+        except ssl.SSLError:
+            if session is None:
+                raise
+            # Server refused the old session, do a full handshake
+            self._sessions.pop(self.host, None)
+            http.client.HTTPConnection.connect(self)
+            self.sock = self._context.wrap_socket(self.sock, server_hostname=self.host)
+        self.tls_resumed = self.sock.session_reused
+        self.remember_session()
+
+    def remember_session(self):
+        # TLS 1.3 tickets arrive after the handshake, so this is also
+        # called when the connection goes back to the pool
+        if self.sock is not None and getattr(self.sock, 'session', None):
+            self._sessions[self.host] = self.sock.session
+
+
+class Response:
+    """
+    Streaming response from the pool
+    The connection returns to the pool once the body is fully read,
+    or is discarded when the response is closed early.
+    """
+
+    def __init__(self, pool, key, conn, raw, url):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._raw = raw
+        self.url = url
+        self.status = raw.status
+        self.reason = raw.reason
+        self.headers = raw.headers
+
+    def read(self, amt=None):
+        data = self._raw.read(amt) if amt is not None else self._raw.read()
+        if self._raw.isclosed():
+            self._release()
+        return data
+
+    def _release(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._raw.will_close or not self._raw.isclosed():
+            conn.close()
+        else:
+            self._pool._put(self._key, conn)
+
+    def close(self):
+        if self._conn is not None and not self._raw.isclosed():
+            # Body not consumed, connection can't be reused
+            self._conn.close()
+            self._conn = None
+            self._raw.close()
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Per-host pool of persistent HTTP/1.1 connections
+
+    Usage:
+        pool = get_pool()
+        data = pool.fetch(url, headers={'User-Agent': '...'})
+        print(pool.report())
+    """
+
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE, timeout=DEFAULT_TIMEOUT, verify=False,
+                 limiter=None, overrides=None):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        # Per-host pacing (rate_limiter.RateLimiter), None to send freely
+        self.limiter = limiter
+        # {host: (address, port)}: requests for host go there over plain HTTP
+        self.overrides = dict(overrides or {})
+        # One context for every connection (verification stays off, as the
+        # scripts did before with the global monkeypatch)
+        if verify:
+            self.context = ssl.create_default_context()
+        else:
+            self.context = ssl._create_unverified_context()
+        self._sessions = {}
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'connections': 0,
+            'reused': 0,
+            'tls_resumed': 0,
+        }
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def _new_conn(self, scheme, host, port, timeout):
+        self._count('connections')
+        if scheme == 'https':
+            return _HTTPSConnection(host, port, context=self.context,
+                                    sessions=self._sessions, timeout=timeout)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _get(self, key):
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                return conns.pop()
+        return None
+
+    def _put(self, key, conn):
+        if isinstance(conn, _HTTPSConnection):
+            conn.remember_session()
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_idle:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def _send(self, conn, method, target, headers):
+        conn.request(method, target, headers=headers)
+        return conn.getresponse()
+
+    def _request_once(self, method, url, headers, timeout):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise ValueError(f'Unsupported URL scheme: {url}')
+        host = parts.hostname
+        port = parts.port
+        if host in self.overrides:
+            # Keep the real name in the Host header so the stand-in knows who it plays
+            headers = dict(headers, Host=parts.netloc)
+            scheme = 'http'
+            host, port = self.overrides[host]
+        key = (scheme, host, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        self._count('requests')
+        conn = self._get(key)
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                raw = self._send(conn, method, target, headers)
+                self._count('reused')
+                return Response(self, key, conn, raw, url)
+            except _STALE_ERRORS:
+                # Server dropped the idle connection, fall through to a new one
+                conn.close()
+
+        conn = self._new_conn(scheme, host, port, timeout)
+        try:
+            raw = self._send(conn, method, target, headers)
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        if getattr(conn, 'tls_resumed', False):
+            self._count('tls_resumed')
+        return Response(self, key, conn, raw, url)
+
+    def request(self, method, url, headers=None, timeout=None, allow_errors=False):
+        """
+        Send a request and return a streaming Response
+        Follows redirects; raises HTTPError for status >= 400 unless allow_errors
+        """
+        headers = dict(headers or {})
+        headers.setdefault('Connection', 'keep-alive')
+        timeout = timeout or self.timeout
+
+        redirects = 0
+        retries = 0
+        while True:
+            host = urllib.parse.urlsplit(url).hostname or ''
+            if self.limiter is not None:
+                self.limiter.acquire(host)
+            response = self._request_once(method, url, headers, timeout)
+
+            if self.limiter is not None:
+                if response.status in THROTTLE_CODES:
+                    pause = self.limiter.throttle(host, response.headers.get('Retry-After'))
+                    if pause is not None and retries < MAX_THROTTLE_RETRIES:
+                        # The limiter holds the next request back until the pause is over
+                        retries += 1
+                        response.read()
+                        continue
+                else:
+                    self.limiter.success(host)
+
+            if response.status in REDIRECT_CODES and response.headers.get('Location'):
+                response.read()
+                redirects += 1
+                if redirects > MAX_REDIRECTS:
+                    raise HTTPError(url, response.status, 'Too many redirects', response.headers)
+                url = urllib.parse.urljoin(url, response.headers['Location'])
+                continue
+            if response.status >= 400 and not allow_errors:
+                response.read()
+                raise HTTPError(url, response.status, response.reason, response.headers)
+            return response
+
+    def fetch(self, url, headers=None, timeout=None):
+        """GET a URL and return the whole body as bytes"""
+        with self.request('GET', url, headers=headers, timeout=timeout) as response:
+            return response.read()
+
+    def reuse_rate(self):
+        requests = self.stats['requests']
+        return self.stats['reused'] / requests if requests else 0.0
+
+    def report(self):
+        """One-line summary of connection reuse for the end of a run"""
+        s = self.stats
+        return (f"Connections: {s['requests']} requests over {s['connections']} connections, "
+                f"{s['reused']} reused ({self.reuse_rate():.0%}), "
+                f"{s['tls_resumed']} TLS sessions resumed")
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def overrides_from_env():
+    """{host: (address, port)} from $ASSET_HOST_OVERRIDES, or {}"""
+    text = os.environ.get(HOST_OVERRIDES_ENV)
+    if not text:
+        return {}
+    overrides = {}
+    for host, target in json.loads(text).items():
+        address, _, port = target.rpartition(':')
+        overrides[host] = (address, int(port))
+    return overrides
+
+
+def get_pool():
+    """Shared pool used by all download scripts"""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool(limiter=get_limiter(), overrides=overrides_from_env())
+        return _default_pool
@@ -0,0 +1,2 @@
+// Generated by build_atlas.py - do not edit
+window.VehicleAtlas = {"airplane.png": "vi-airplane", "ambulance.png": "vi-ambulance", "articulated-truck.png": "vi-articulated-truck", "bicycle.png": "vi-bicycle", "bullet-train.png": "vi-bullet-train", "bus.png": "vi-bus", "cable-car.png": "vi-cable-car", "canoe.png": "vi-canoe", "car.png": "vi-car", "construction-backhoe.png": "vi-construction-backhoe", "delivery-truck.png": "vi-delivery-truck", "ferry.png": "vi-ferry", "fire-engine.png": "vi-fire-engine", "flying-saucer.png": "vi-flying-saucer", "funicular.png": "vi-funicular", "gondola.png": "vi-gondola", "helicopter.png": "vi-helicopter", "high-speed-train.png": "vi-high-speed-train", "hot-air-balloon.png": "vi-hot-air-balloon", "kick-scooter.png": "vi-kick-scooter", "light-rail.png": "vi-light-rail", "metro.png": "vi-metro", "monorail.png": "vi-monorail", "motor-scooter.png": "vi-motor-scooter", "motorcycle.png": "vi-motorcycle", "motorized-wheelchair.png": "vi-motorized-wheelchair", "parachute.png": "vi-parachute", "pickup-truck.png": "vi-pickup-truck", "police-car.png": "vi-police-car", "racing-car.png": "vi-racing-car", "rickshaw.png": "vi-rickshaw", "rocket.png": "vi-rocket", "roller-skate.png": "vi-roller-skate", "sailboat.png": "vi-sailboat", "skateboard.png": "vi-skateboard", "sled.png": "vi-sled", "small-airplane.png": "vi-small-airplane", "speedboat.png": "vi-speedboat", "suv.png": "vi-suv", "taxi.png": "vi-taxi", "tractor.png": "vi-tractor", "train.png": "vi-train", "tram.png": "vi-tram", "trolleybus.png": "vi-trolleybus", "wheelchair.png": "vi-wheelchair"};
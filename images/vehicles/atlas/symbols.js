@@ -0,0 +1,2 @@
+// Generated by build_svg_sprite.py - do not edit
+window.VehicleSymbols = {"cargo-ship.svg": "sym-cargo-ship", "houseboat.svg": "sym-houseboat", "minivan.svg": "sym-minivan", "rowboat.svg": "sym-rowboat"};
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Append-only Job Journal
+Records every finished unit of work of a long run (a category page, a
+resolved URL, a finished download) as one JSON line, flushed and fsynced
+before the work counts as done. An interrupted run replays the journal
+and continues where it stopped; a torn last line from a crash is dropped.
+
+The first line is a header describing the job (e.g. the keyword list).
+A journal whose header differs, or that ends with a 'finished' record,
+is started afresh.
+"""
+
+import json
+import os
+import threading
+
+
+class JobJournal:
+    """
+    Usage:
+        journal = JobJournal(path, header={'keywords': [...]})
+        for record in journal.records('page'): ...      # replay
+        journal.append('page', category=..., members=[...])
+        journal.finish()
+    """
+
+    def __init__(self, path, header=None, restart=False):
+        self.path = path
+        self.header = dict(header or {})
+        self._lock = threading.Lock()
+        self._records = []
+        self.resumed = False
+
+        if not restart:
+            self._load()
+        if self.resumed:
+            return
+        self._records = []
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'header', **self.header}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        records = []
+        good = 0
+        for line in data.splitlines(keepends=True):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break               # torn write: everything after it is ignored
+            if not line.endswith(b'\n'):
+                break
+            records.append(record)
+            good += len(line)
+        if not records or records[0] != {'type': 'header', **self.header}:
+            return
+        if records[-1]['type'] == 'finished':
+            return
+        if good < len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(good)
+        self._records = records[1:]
+        self.resumed = True
+
+    def records(self, type):
+        """Replayed and new records of one type, in order"""
+        with self._lock:
+            return [r for r in self._records if r['type'] == type]
+
+    def append(self, type, **fields):
+        """Durably record one finished unit of work"""
+        record = {'type': type, **fields}
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._records.append(record)
+        return record
+
+    def finish(self):
+        """Mark the job complete; the next run starts a new journal"""
+        self.append('finished')
+
+    def summary(self):
+        counts = {}
+        with self._lock:
+            for r in self._records:
+                counts[r['type']] = counts.get(r['type'], 0) + 1
+        return ', '.join(f'{n} {t}' for t, n in sorted(counts.items())) or 'empty'
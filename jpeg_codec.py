@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Minimal JPEG Codec (standard library only)
+Reads the Wikimedia thumbnails in images/vehicles without Pillow:
+baseline Huffman decoding (restart markers, any chroma subsampling),
+IDCT and YCbCr to RGBA, plus lossless re-compression: the same
+coefficients re-encoded with optimal Huffman tables (like jpegtran
+-optimize) and metadata segments dropped. Progressive and
+arithmetic-coded JPEGs are not supported; Commons serves its thumbnails
+as baseline.
+"""
+
+import heapq
+import math
+import struct
+
+# Natural (row-major) index of each zigzag position
+ZIGZAG = [
+    0, 1, 8, 16, 9, 2, 3, 10, 17, 24, 32, 25, 18, 11, 4, 5,
+    12, 19, 26, 33, 40, 48, 41, 34, 27, 20, 13, 6, 7, 14, 21, 28,
+    35, 42, 49, 56, 57, 50, 43, 36, 29, 22, 15, 23, 30, 37, 44, 51,
+    58, 59, 52, 45, 38, 31, 39, 46, 53, 60, 61, 54, 47, 55, 62, 63,
+]
+
+# Segments that change how the image looks (ICC profile, Adobe color
+# transform); every other APPn and COM is stripped
+KEEP_APP = (0xE0, 0xE2, 0xEE)
+
+# IDCT basis: _COS[x][u] = c(u) / 2 * cos((2x + 1) u pi / 16)
+_COS = [[(math.sqrt(0.5) if u == 0 else 1.0) / 2 * math.cos((2 * x + 1) * u * math.pi / 16)
+         for u in range(8)] for x in range(8)]
+
+
+class JPEGError(ValueError):
+    """Malformed or unsupported JPEG"""
+
+
+def is_jpeg(data):
+    return data[:3] == b'\xff\xd8\xff'
+
+
+def _entropy_end(data, pos):
+    """Index of the first marker after entropy-coded data starting at pos"""
+    while True:
+        pos = data.find(b'\xff', pos)
+        if pos < 0 or pos + 1 >= len(data):
+            return len(data)
+        nxt = data[pos + 1]
+        if nxt == 0x00 or 0xD0 <= nxt <= 0xD7 or nxt == 0xFF:
+            pos += 1 if nxt == 0xFF else 2
+            continue
+        return pos
+
+
+def iter_segments(data):
+    """
+    Yield (marker, body) for each segment; the entropy-coded data after
+    SOS is yielded as (None, bytes)
+    """
+    if not is_jpeg(data):
+        raise JPEGError('not a JPEG file')
+    pos = 2
+    while pos < len(data):
+        if data[pos] != 0xFF:
+            raise JPEGError(f'expected a marker at byte {pos}')
+        while pos + 1 < len(data) and data[pos + 1] == 0xFF:
+            pos += 1            # fill bytes
+        if pos + 1 >= len(data):
+            raise JPEGError('truncated marker')
+        marker = data[pos + 1]
+        if marker == 0xD9:
+            return
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        if pos + 4 > len(data):
+            raise JPEGError('truncated segment')
+        length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        if length < 2 or pos + 2 + length > len(data):
+            raise JPEGError(f'bad length of segment {marker:#04x}')
+        yield marker, data[pos + 4:pos + 2 + length]
+        pos += 2 + length
+        if marker == 0xDA:
+            end = _entropy_end(data, pos)
+            yield None, data[pos:end]
+            pos = end
+    raise JPEGError('missing EOI marker')
+
+
+class _Huffman:
+    """Canonical Huffman table decoded bit by bit (T.81 F.2.2.3)"""
+
+    def __init__(self, body):
+        counts = body[:16]
+        self.values = body[16:16 + sum(counts)]
+        if len(self.values) != sum(counts):
+            raise JPEGError('truncated Huffman table')
+        self.maxcode = [-1] * 17
+        self.valptr = [0] * 17
+        self.mincode = [0] * 17
+        code = k = 0
+        for length in range(1, 17):
+            n = counts[length - 1]
+            if n:
+                self.valptr[length] = k
+                self.mincode[length] = code
+                code += n
+                k += n
+                self.maxcode[length] = code - 1
+            code <<= 1
+
+    def decode(self, bits):
+        code = 0
+        for length in range(1, 17):
+            code = (code << 1) | bits.bit()
+            if code <= self.maxcode[length]:
+                return self.values[self.valptr[length] + code - self.mincode[length]]
+        raise JPEGError('bad Huffman code')
+
+
+class _Bits:
+    """MSB-first bit reader over unstuffed entropy data (padded with 1 bits)"""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.acc = 0
+        self.left = 0
+
+    def bit(self):
+        if not self.left:
+            self.acc = self.data[self.pos] if self.pos < len(self.data) else 0xFF
+            self.pos += 1
+            self.left = 8
+        self.left -= 1
+        return (self.acc >> self.left) & 1
+
+    def receive(self, n):
+        """n bits as a signed coefficient (T.81 F.2.2.1 EXTEND)"""
+        value = 0
+        for _ in range(n):
+            value = (value << 1) | self.bit()
+        if value < 1 << (n - 1):
+            value -= (1 << n) - 1
+        return value
+
+
+def _restart_intervals(scan):
+    """Entropy data split at RSTn markers, with byte stuffing removed"""
+    parts = []
+    start = pos = 0
+    while True:
+        pos = scan.find(b'\xff', pos)
+        if pos < 0 or pos + 1 >= len(scan):
+            break
+        if 0xD0 <= scan[pos + 1] <= 0xD7:
+            parts.append(scan[start:pos])
+            start = pos = pos + 2
+        else:
+            pos += 2
+    parts.append(scan[start:])
+    return [p.replace(b'\xff\x00', b'\xff') for p in parts]
+
+
+def _idct(coef):
+    """8x8 dequantized coefficients (natural order) -> 64 samples 0..255"""
+    tmp = [0.0] * 64
+    for v in range(0, 64, 8):
+        row = coef[v:v + 8]
+        if not any(row[1:]):
+            dc = row[0] * _COS[0][0]
+            for x in range(8):
+                tmp[v + x] = dc
+            continue
+        for x in range(8):
+            c = _COS[x]
+            tmp[v + x] = (c[0] * row[0] + c[1] * row[1] + c[2] * row[2] + c[3] * row[3]
+                          + c[4] * row[4] + c[5] * row[5] + c[6] * row[6] + c[7] * row[7])
+    out = [0] * 64
+    for x in range(8):
+        col = [tmp[v * 8 + x] for v in range(8)]
+        for y in range(8):
+            c = _COS[y]
+            s = (c[0] * col[0] + c[1] * col[1] + c[2] * col[2] + c[3] * col[3]
+                 + c[4] * col[4] + c[5] * col[5] + c[6] * col[6] + c[7] * col[7])
+            s = int(round(s)) + 128
+            out[y * 8 + x] = 0 if s < 0 else 255 if s > 255 else s
+    return out
+
+
+class _Component:
+    def __init__(self, cid, h, v, tq):
+        self.id = cid
+        self.h = h
+        self.v = v
+        self.tq = tq
+        self.blocks = {}        # (bx, by) -> 64 quantized coefficients, zigzag order
+        self.pred = 0
+
+
+class _Frame:
+    def __init__(self):
+        self.width = self.height = 0
+        self.comps = []
+        self.quant = {}
+        self.huffman = {}
+        self.interval = 0
+        # Scans in file order: (SOS body, [(component, DC table id, AC table id)], MCUs);
+        # an MCU is [(component, bx, by), ...] in coding order
+        self.scans = []
+
+    def mcu_grid(self):
+        hmax = max(c.h for c in self.comps)
+        vmax = max(c.v for c in self.comps)
+        return hmax, vmax, -(-self.width // (8 * hmax)), -(-self.height // (8 * vmax))
+
+
+def _read_block(bits, comp, dc, ac):
+    """One block's quantized coefficients in zigzag order"""
+    t = dc.decode(bits)
+    comp.pred += bits.receive(t) if t else 0
+    zz = [0] * 64
+    zz[0] = comp.pred
+    k = 1
+    while k < 64:
+        rs = ac.decode(bits)
+        run, size = rs >> 4, rs & 15
+        if not size:
+            if run != 15:
+                break           # end of block
+            k += 16
+            continue
+        k += run
+        if k > 63:
+            raise JPEGError('coefficient index out of range')
+        zz[k] = bits.receive(size)
+        k += 1
+    return zz
+
+
+def _scan_mcus(frame, scan_comps):
+    hmax, vmax, mcux, mcuy = frame.mcu_grid()
+    if len(scan_comps) == 1:
+        # Non-interleaved: one block per MCU over the component's own size
+        comp = scan_comps[0][0]
+        cols = -(-(-(-frame.width * comp.h // hmax)) // 8)
+        rows = -(-(-(-frame.height * comp.v // vmax)) // 8)
+        return [[(comp, x, y)] for y in range(rows) for x in range(cols)]
+    return [[(comp, mx * comp.h + h, my * comp.v + v)
+             for comp, _, _ in scan_comps for v in range(comp.v) for h in range(comp.h)]
+            for my in range(mcuy) for mx in range(mcux)]
+
+
+def _read_scan(frame, scan, scan_comps):
+    try:
+        tables = {comp.id: (frame.huffman[(0, td)], frame.huffman[(1, ta)])
+                  for comp, td, ta in scan_comps}
+    except KeyError:
+        raise JPEGError('scan uses a missing Huffman table')
+    mcus = _scan_mcus(frame, scan_comps)
+    intervals = _restart_intervals(scan)
+    per = frame.interval or len(mcus)
+    for n, mcu in enumerate(mcus):
+        if n % per == 0:
+            part = n // per
+            bits = _Bits(intervals[part] if part < len(intervals) else b'')
+            for comp, _, _ in scan_comps:
+                comp.pred = 0
+        for comp, bx, by in mcu:
+            dc, ac = tables[comp.id]
+            comp.blocks[(bx, by)] = _read_block(bits, comp, dc, ac)
+    return mcus
+
+
+def _parse(data):
+    """
+    (frame, layout): every block's coefficients, and the file as a list of
+    ('segment', marker, body) / ('scan', index) items
+    """
+    frame = _Frame()
+    layout = []
+    scan_comps = scan_header = None
+    for marker, body in iter_segments(data):
+        if marker is None:
+            if not frame.comps or scan_comps is None:
+                raise JPEGError('scan before frame header')
+            mcus = _read_scan(frame, body, scan_comps)
+            frame.scans.append((scan_header, scan_comps, mcus))
+            layout.append(('scan', len(frame.scans) - 1))
+            continue
+        if marker == 0xDB:
+            pos = 0
+            while pos < len(body):
+                precision, tq = body[pos] >> 4, body[pos] & 15
+                size = 128 if precision else 64
+                table = body[pos + 1:pos + 1 + size]
+                frame.quant[tq] = list(struct.unpack('>64H', table)) if precision else list(table)
+                pos += 1 + size
+        elif marker == 0xC4:
+            pos = 0
+            while pos < len(body):
+                table = _Huffman(body[pos + 1:])
+                frame.huffman[(body[pos] >> 4, body[pos] & 15)] = table
+                pos += 17 + len(table.values)
+            continue            # rewritten per scan by recompress()
+        elif marker in (0xC0, 0xC1):
+            if body[0] != 8:
+                raise JPEGError(f'{body[0]}-bit samples are not supported')
+            frame.height, frame.width, count = struct.unpack('>HHB', body[1:6])
+            frame.comps = [_Component(body[6 + 3 * i], body[7 + 3 * i] >> 4, body[7 + 3 * i] & 15,
+                                      body[8 + 3 * i]) for i in range(count)]
+            if not frame.width or not frame.height or not frame.comps:
+                raise JPEGError('empty frame')
+        elif 0xC2 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            raise JPEGError('only baseline JPEG is supported')
+        elif marker == 0xDD:
+            frame.interval = struct.unpack('>H', body[:2])[0]
+        elif marker == 0xDA:
+            by_id = {c.id: c for c in frame.comps}
+            scan_comps = []
+            for i in range(body[0]):
+                comp = by_id.get(body[1 + 2 * i])
+                if comp is None:
+                    raise JPEGError('scan of an unknown component')
+                scan_comps.append((comp, body[2 + 2 * i] >> 4, body[2 + 2 * i] & 15))
+            scan_header = body
+            continue
+        layout.append(('segment', marker, body))
+    if not frame.scans:
+        raise JPEGError('no image data')
+    return frame, layout
+
+
+def decode(data):
+    """Decode baseline JPEG bytes to (width, height, RGBA bytearray)"""
+    frame, _ = _parse(data)
+    hmax, vmax, mcux, mcuy = frame.mcu_grid()
+    planes = []
+    for comp in frame.comps:
+        quant = frame.quant.get(comp.tq)
+        if quant is None:
+            raise JPEGError('missing quantization table')
+        stride = mcux * comp.h * 8
+        plane = bytearray(stride * mcuy * comp.v * 8)
+        for (bx, by), zz in comp.blocks.items():
+            coef = [0] * 64
+            for k in range(64):
+                if zz[k]:
+                    coef[ZIGZAG[k]] = zz[k] * quant[k]
+            samples = _idct(coef)
+            for y in range(8):
+                start = (by * 8 + y) * stride + bx * 8
+                plane[start:start + 8] = bytes(samples[y * 8:y * 8 + 8])
+        planes.append((plane, stride))
+    return frame.width, frame.height, _to_rgba(frame, planes)
+
+
+def _to_rgba(frame, planes):
+    comps, width, height = frame.comps, frame.width, frame.height
+    hmax, vmax, _, _ = frame.mcu_grid()
+    rgba = bytearray(b'\xff' * (width * height * 4))
+    # Nearest-neighbour chroma upsampling: source column of each x per component
+    xmaps = [[x * c.h // hmax for x in range(width)] for c in comps]
+
+    if len(comps) == 1:
+        (plane, stride), xmap = planes[0], xmaps[0]
+        for y in range(height):
+            row = (y * comps[0].v // vmax) * stride
+            out = y * width * 4
+            for x in range(width):
+                g = plane[row + xmap[x]]
+                rgba[out] = rgba[out + 1] = rgba[out + 2] = g
+                out += 4
+        return rgba
+
+    if len(comps) != 3:
+        raise JPEGError(f'{len(comps)}-component (CMYK) JPEG is not supported')
+    (py, _), (pcb, _), (pcr, _) = planes
+    xy, xcb, xcr = xmaps
+    for y in range(height):
+        ry, rcb, rcr = ((y * c.v // vmax) * stride for c, (_, stride) in zip(comps, planes))
+        out = y * width * 4
+        for x in range(width):
+            lum = py[ry + xy[x]]
+            cb = pcb[rcb + xcb[x]] - 128
+            cr = pcr[rcr + xcr[x]] - 128
+            r = int(lum + 1.402 * cr + 0.5)
+            g = int(lum - 0.344136 * cb - 0.714136 * cr + 0.5)
+            b = int(lum + 1.772 * cb + 0.5)
+            rgba[out] = 0 if r < 0 else 255 if r > 255 else r
+            rgba[out + 1] = 0 if g < 0 else 255 if g > 255 else g
+            rgba[out + 2] = 0 if b < 0 else 255 if b > 255 else b
+            out += 4
+    return rgba
+
+
+def _block_symbols(zz, pred):
+    """(DC or AC, Huffman symbol, extra bits, extra length) of one block"""
+    diff = zz[0] - pred
+    size = abs(diff).bit_length()
+    yield 0, size, diff & ((1 << size) - 1) if diff >= 0 else (diff - 1) & ((1 << size) - 1), size
+    run = 0
+    last = max((k for k in range(1, 64) if zz[k]), default=0)
+    for k in range(1, last + 1):
+        value = zz[k]
+        if not value:
+            run += 1
+            continue
+        while run > 15:
+            yield 1, 0xF0, 0, 0
+            run -= 16
+        size = abs(value).bit_length()
+        yield 1, (run << 4) | size, value & ((1 << size) - 1) if value >= 0 else \
+            (value - 1) & ((1 << size) - 1), size
+        run = 0
+    if last < 63:
+        yield 1, 0x00, 0, 0
+
+
+def _optimal_table(freq):
+    """
+    Huffman (bits, values) for symbol counts, limited to 16-bit codes and
+    never using the all-ones code (T.81 Annex K.2/K.3)
+    """
+    # A reserved symbol guarantees no code is all ones
+    heap = [(count, symbol, [symbol]) for symbol, count in freq.items()] + [(0, 256, [256])]
+    heapq.heapify(heap)
+    lengths = dict.fromkeys(list(freq) + [256], 0)
+    if len(heap) == 1:
+        lengths[256] = 1
+    while len(heap) > 1:
+        c1, s1, a = heapq.heappop(heap)
+        c2, s2, b = heapq.heappop(heap)
+        for symbol in a + b:
+            lengths[symbol] += 1
+        heapq.heappush(heap, (c1 + c2, min(s1, s2), a + b))
+
+    bits = [0] * (max(16, max(lengths.values())) + 1)
+    for length in lengths.values():
+        bits[length] += 1
+    for i in range(len(bits) - 1, 16, -1):
+        while bits[i]:
+            j = i - 2
+            while not bits[j]:
+                j -= 1
+            bits[i] -= 2
+            bits[i - 1] += 1
+            bits[j + 1] += 2
+            bits[j] -= 1
+    i = 16
+    while not bits[i]:
+        i -= 1
+    bits[i] -= 1            # drop the reserved symbol's code
+    values = sorted(freq, key=lambda s: (lengths[s], -freq[s], s))
+    return bits[1:17], values
+
+
+class _BitWriter:
+    """MSB-first bit writer with 0xFF byte stuffing"""
+
+    def __init__(self):
+        self.out = bytearray()
+        self.acc = 0
+        self.count = 0
+
+    def write(self, value, length):
+        self.acc = (self.acc << length) | value
+        self.count += length
+        while self.count >= 8:
+            self.count -= 8
+            byte = (self.acc >> self.count) & 0xFF
+            self.out.append(byte)
+            if byte == 0xFF:
+                self.out.append(0)
+        self.acc &= (1 << self.count) - 1
+
+    def flush(self):
+        """Pad the last byte with 1 bits"""
+        if self.count:
+            self.write((1 << (8 - self.count)) - 1, 8 - self.count)
+
+
+def _encode_scan(frame, scan_comps, mcus):
+    """(DHT body, entropy-coded bytes) of a scan with optimal Huffman tables"""
+    tables = {comp.id: (td, ta) for comp, td, ta in scan_comps}
+    per = frame.interval or len(mcus)
+
+    def symbols():
+        preds = {}
+        for n, mcu in enumerate(mcus):
+            if n % per == 0:
+                preds.clear()
+                if n:
+                    yield None          # restart marker
+            for comp, bx, by in mcu:
+                zz = comp.blocks[(bx, by)]
+                td, ta = tables[comp.id]
+                for cls, symbol, extra, length in _block_symbols(zz, preds.get(comp.id, 0)):
+                    yield (cls, td if cls == 0 else ta), symbol, extra, length
+                preds[comp.id] = zz[0]
+
+    events = list(symbols())
+    freqs = {}
+    for event in events:
+        if event is not None:
+            table = freqs.setdefault(event[0], {})
+            table[event[1]] = table.get(event[1], 0) + 1
+
+    dht = bytearray()
+    codes = {}
+    for (cls, tid), freq in sorted(freqs.items()):
+        bits, values = _optimal_table(freq)
+        dht += bytes([(cls << 4) | tid]) + bytes(bits) + bytes(values)
+        code = k = 0
+        table = codes[(cls, tid)] = {}
+        for length in range(1, 17):
+            for _ in range(bits[length - 1]):
+                table[values[k]] = (code, length)
+                code += 1
+                k += 1
+            code <<= 1
+
+    writer = _BitWriter()
+    restart = 0
+    for event in events:
+        if event is None:
+            writer.flush()
+            writer.out += bytes([0xFF, 0xD0 + restart % 8])
+            restart += 1
+            continue
+        key, symbol, extra, length = event
+        code, size = codes[key][symbol]
+        writer.write(code, size)
+        if length:
+            writer.write(extra, length)
+    writer.flush()
+    return bytes(dht), bytes(writer.out)
+
+
+def recompress(data):
+    """
+    Losslessly smaller JPEG: the same coefficients re-encoded with optimal
+    Huffman tables, EXIF/XMP/comment segments dropped. Returns data
+    unchanged if not smaller.
+    """
+    frame, layout = _parse(data)
+    out = [b'\xff\xd8']
+    for item in layout:
+        if item[0] == 'scan':
+            header, scan_comps, mcus = frame.scans[item[1]]
+            dht, entropy = _encode_scan(frame, scan_comps, mcus)
+            out.append(struct.pack('>BBH', 0xFF, 0xC4, len(dht) + 2) + dht)
+            out.append(struct.pack('>BBH', 0xFF, 0xDA, len(header) + 2) + header + entropy)
+            continue
+        _, marker, body = item
+        if (0xE0 <= marker <= 0xEF and marker not in KEEP_APP) or marker == 0xFE:
+            continue
+        out.append(struct.pack('>BBH', 0xFF, marker, len(body) + 2) + body)
+    out.append(b'\xff\xd9')
+    result = b''.join(out)
+    return result if len(result) < len(data) else data
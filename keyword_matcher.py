@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher
+Finds the longest whole-word keyword in a title with one pass over its words.
+Keywords are stored in a word-level trie, so "road roller" wins over "roller"
+and "bulldozer" no longer matches "dozer".
+"""
+
+import re
+
+_WORD_RE = re.compile(r'[a-z]+')
+
+# Plural endings accepted on any keyword word ("excavators", "buses")
+_PLURAL_SUFFIXES = ('es', 's')
+
+# Marks the end of a keyword inside a trie node
+_END = None
+
+
+def split_words(text):
+    """Lowercase letter runs; digits, punctuation, '_' and '-' separate words"""
+    return _WORD_RE.findall(text.lower())
+
+
+class KeywordMatcher:
+    """
+    Longest whole-word match against a fixed keyword list
+
+    Usage:
+        matcher = KeywordMatcher(['roller', 'road roller'])
+        matcher.match('File:Old road rollers.jpg')  # -> 'road roller'
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._trie = {}
+        for keyword in self.keywords:
+            node = self._trie
+            for word in split_words(keyword):
+                child = node.setdefault(word, {})
+                # Plural spellings share the same child, so matching is
+                # a single dict lookup per word
+                for suffix in _PLURAL_SUFFIXES:
+                    node.setdefault(word + suffix, child)
+                node = child
+            # Keep the first spelling if a keyword is listed twice
+            node.setdefault(_END, keyword)
+
+    def match(self, text):
+        """Return the longest keyword found in text, or None"""
+        words = split_words(text)
+        count = len(words)
+        trie = self._trie
+        best = None
+
+        for start, word in enumerate(words):
+            node = trie.get(word)
+            if node is None:
+                continue
+            pos = start
+            while node is not None:
+                keyword = node.get(_END)
+                if keyword is not None and (best is None or len(keyword) > len(best)):
+                    best = keyword
+                pos += 1
+                if pos == count:
+                    break
+                node = node.get(words[pos])
+
+        return best
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Minifiers for the front-end pages (standard library only)
+Conservative by design: they only remove what cannot change behaviour.
+- JS: comments and whitespace. Strings, template literals and regex
+  literals are copied verbatim; a line break is kept wherever automatic
+  semicolon insertion could depend on it.
+- CSS: comments, whitespace around { } ; , > and after :, the last ;
+  of a block. Quoted strings are kept as they are.
+- HTML: comments (not <!--[if ...]) and runs of whitespace between tags,
+  collapsed to one space or line break. <pre>/<textarea> are untouched;
+  <script>/<style> contents are left to the JS/CSS minifiers.
+"""
+
+import re
+
+# A regex (not a division) may follow these keywords
+_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                   'throw', 'case', 'do', 'else', 'yield', 'await'}
+
+# A line break after/before these never ends a statement, so it can go
+_JOIN_AFTER = set('{([,;:=?&|*%<>!~^+-')
+_JOIN_BEFORE = set(')]},;.?:=&|*%<>')
+
+_SPACE = ' \t\r\n\f\v\u00a0\ufeff\u2028\u2029'
+
+
+class MinifyError(ValueError):
+    pass
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch in '_$\\' or ord(ch) > 127
+
+
+def _skip_string(src, i):
+    """Index after the string starting at src[i]"""
+    quote = src[i]
+    i += 1
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1
+        if ch == '\n':
+            break
+        i += 1
+    raise MinifyError(f'unterminated string at offset {i}')
+
+
+def _skip_template(src, i):
+    """Index after the template literal starting at src[i] (nested ${} included)"""
+    i += 1
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+        elif ch == '`':
+            return i + 1
+        elif src.startswith('${', i):
+            i = _skip_braces(src, i + 2)
+        else:
+            i += 1
+    raise MinifyError('unterminated template literal')
+
+
+def _skip_braces(src, i):
+    """Index after the } closing an expression that starts at src[i]"""
+    depth = 1
+    while i < len(src):
+        ch = src[i]
+        if ch in '\'"':
+            i = _skip_string(src, i)
+            continue
+        if ch == '`':
+            i = _skip_template(src, i)
+            continue
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise MinifyError('unterminated ${ in template literal')
+
+
+def _skip_regex(src, i):
+    """Index after the regex literal (with flags) starting at src[i]"""
+    i += 1
+    in_class = False
+    while i < len(src):
+        ch = src[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == '\n':
+            break
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            i += 1
+            while i < len(src) and _is_word(src[i]):
+                i += 1
+            return i
+        i += 1
+    raise MinifyError(f'unterminated regex at offset {i}')
+
+
+def _regex_allowed(last):
+    """Whether a / after the last token starts a regex literal"""
+    if last is None:
+        return True
+    if last[0] in '\'"`' or last[0].isdigit() or (last[0] == '/' and len(last) > 1):
+        return False     # after a string, number or regex: division
+    if _is_word(last[-1]):
+        return last in _REGEX_KEYWORDS
+    return last[-1] not in ')]}'
+
+
+def minify_js(src):
+    out = []
+    last = None             # last significant token
+    pending = None          # whitespace seen since it: None, ' ' or '\n'
+    i = 0
+    n = len(src)
+
+    def emit(token):
+        nonlocal last, pending
+        if pending and out:
+            prev, first = last[-1], token[0]
+            if pending == '\n' and not (
+                    (prev in _JOIN_AFTER and not last.endswith(('++', '--')))
+                    or (first in _JOIN_BEFORE and not (first == '.' and token[1:2].isdigit()))
+                    or token == '/'):
+                out.append('\n')
+            elif ((_is_word(prev) and _is_word(first))
+                  or (prev in '+-' and first == prev)
+                  or (prev == '/' and first in '/*')
+                  or (prev == '/' and len(last) > 1 and _is_word(first))     # regex flags
+                  or (prev == '<' and first == '!')
+                  or (prev.isdigit() and first == '.')):
+                out.append(' ')
+        out.append(token)
+        last = token
+        pending = None
+
+    while i < n:
+        ch = src[i]
+        if ch in _SPACE:
+            j = i
+            while j < n and src[j] in _SPACE:
+                j += 1
+            pending = '\n' if '\n' in src[i:j] or pending == '\n' else ' '
+            i = j
+        elif src.startswith('//', i):
+            j = src.find('\n', i)
+            i = n if j < 0 else j
+        elif src.startswith('/*', i):
+            j = src.find('*/', i + 2)
+            if j < 0:
+                raise MinifyError('unterminated comment')
+            pending = '\n' if '\n' in src[i:j] or pending == '\n' else (pending or ' ')
+            i = j + 2
+        elif ch in '\'"':
+            j = _skip_string(src, i)
+            emit(src[i:j])
+            i = j
+        elif ch == '`':
+            j = _skip_template(src, i)
+            emit(src[i:j])
+            i = j
+        elif ch == '/' and _regex_allowed(last):
+            j = _skip_regex(src, i)
+            emit(src[i:j])
+            i = j
+        elif ch.isdigit() or (ch == '.' and src[i + 1:i + 2].isdigit()):
+            j = i + 1
+            while j < n and (_is_word(src[j]) or src[j] == '.'
+                             or (src[j] in '+-' and src[j - 1] in 'eE' and not src[i:j].startswith('0x'))):
+                j += 1
+            emit(src[i:j])
+            i = j
+        elif _is_word(ch):
+            j = i + 1
+            while j < n and _is_word(src[j]):
+                j += 1
+            emit(src[i:j])
+            i = j
+        else:
+            # Runs of + and - are kept together so a++ / a-- are recognised
+            j = i + 1
+            if ch in '+-':
+                while j < n and src[j] == ch:
+                    j += 1
+            emit(src[i:j])
+            i = j
+    return ''.join(out)
+
+
+_CSS_TOKEN_RE = re.compile(r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/|[^"'/]+|/''', re.S)
+_CSS_JOIN_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def _squeeze_css(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = _CSS_JOIN_RE.sub(r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}')
+
+
+def minify_css(src):
+    out = []
+    chunk = []
+    for token in _CSS_TOKEN_RE.findall(src):
+        if token[0] in '"\'':
+            # Strings are kept as they are
+            out.append(_squeeze_css(''.join(chunk)))
+            out.append(token)
+            chunk = []
+        elif token.startswith('/*'):
+            chunk.append(' ')
+        else:
+            chunk.append(token)
+    out.append(_squeeze_css(''.join(chunk)))
+    return ''.join(out).strip()
+
+
+_HTML_TOKEN_RE = re.compile(
+    r'''<!--.*?-->|<(script|style|pre|textarea)\b.*?</\1\s*>|<(?:"[^"]*"|'[^']*'|[^'">])*>''', re.S | re.I)
+
+
+def minify_html(html):
+    """Drop comments and collapse whitespace in text between tags"""
+    out = []
+    pos = 0
+    for m in _HTML_TOKEN_RE.finditer(html):
+        out.append(_collapse(html[pos:m.start()]))
+        token = m.group(0)
+        if not (token.startswith('<!--') and not token.startswith('<!--[if')):
+            out.append(token)
+        pos = m.end()
+    out.append(_collapse(html[pos:]))
+    return ''.join(out).strip() + '\n'
+
+
+def _collapse(text):
+    return re.sub(r'\s+', lambda m: '\n' if '\n' in m.group(0) else ' ', text)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Image Optimization Script
+Post-download stage for images/vehicles, run on a process pool:
+- losslessly re-compresses every PNG in place (ancillary chunks stripped,
+  IDAT re-deflated at maximum level), and the Wikimedia JPEGs saved as
+  .png (optimal Huffman tables, metadata stripped)
+- writes square-canvas 1x/2x PNG variants to images/vehicles/variants/,
+  padding photos of any aspect ratio to a transparent square
+Reports before/after byte counts per file. JPEGs are decoded with Pillow
+when installed, otherwise with jpeg_codec (baseline only).
+"""
+
+import hashlib
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import jpeg_codec
+import png_codec
+from asset_manifest import get_manifest
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.path.join(BASE_DIR, 'images', 'vehicles')
+VARIANT_DIR = os.path.join(IMAGE_DIR, 'variants')
+
+# vehicles.html shows icons at 72x72 CSS pixels
+VARIANT_SIZES = {
+    '1x': 72,
+    '2x': 144,
+}
+
+
+def sniff(data):
+    """Short name of the real file type"""
+    if png_codec.is_png(data):
+        return 'PNG'
+    if data[:3] == b'\xff\xd8\xff':
+        return 'JPEG'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'WebP'
+    return 'unknown'
+
+
+def decode(data, kind):
+    """(width, height, RGBA) of a PNG, or of a JPEG/WebP via Pillow or jpeg_codec"""
+    if kind == 'PNG':
+        return png_codec.decode(data)
+    if Image is not None:
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert('RGBA')
+            return image.width, image.height, bytearray(image.tobytes())
+    if kind == 'JPEG':
+        return jpeg_codec.decode(data)
+    return None
+
+
+def recompress(data, kind):
+    """Losslessly smaller bytes of the same image (data itself if not smaller)"""
+    if kind == 'PNG':
+        return png_codec.recompress(data)
+    if kind == 'JPEG':
+        try:
+            return jpeg_codec.recompress(data)
+        except jpeg_codec.JPEGError:
+            return data         # e.g. progressive: still decodable by Pillow
+    return data
+
+
+def variant_path(filename, scale):
+    name, _ = os.path.splitext(filename)
+    return os.path.join(VARIANT_DIR, f'{name}@{scale}.png')
+
+
+def _write_atomic(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def optimize_file(filepath):
+    """
+    Worker: optimize one file
+    Returns {'file', 'status', 'before', 'after', 'variants', 'sha256'}
+    """
+    filename = os.path.basename(filepath)
+    result = {'file': filename, 'status': 'ok', 'before': 0, 'after': 0,
+              'variants': 0, 'sha256': None}
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    result['before'] = result['after'] = len(data)
+
+    kind = sniff(data)
+    if kind == 'unknown' or (kind == 'WebP' and Image is None):
+        # No decoder for these; they are served as downloaded
+        result['status'] = f'skipped ({kind})'
+        return result
+    if kind != 'PNG':
+        result['status'] = f'ok ({kind})'
+
+    try:
+        optimized = recompress(data, kind)
+        if len(optimized) < len(data):
+            _write_atomic(filepath, optimized)
+            result['after'] = len(optimized)
+            result['sha256'] = hashlib.sha256(optimized).hexdigest()
+
+        # Variants are rebuilt only when the source is newer
+        source_mtime = os.path.getmtime(filepath)
+        stale = [scale for scale in VARIANT_SIZES
+                 if not os.path.exists(variant_path(filename, scale))
+                 or os.path.getmtime(variant_path(filename, scale)) < source_mtime]
+        if stale:
+            width, height, rgba = decode(optimized, kind)
+            size, square = png_codec.pad_to_square(width, height, rgba)
+            for scale in stale:
+                target = VARIANT_SIZES[scale]
+                pixels = png_codec.resize(size, size, square, target, target)
+                _write_atomic(variant_path(filename, scale),
+                              png_codec.encode(target, target, pixels))
+                result['variants'] += 1
+
+    except (png_codec.PNGError, jpeg_codec.JPEGError, OSError) as e:
+        result['status'] = f'error ({e})'
+
+    return result
+
+
+def list_images(directory=IMAGE_DIR):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith('.png') and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def main():
+    print('=' * 60)
+    print('Image Optimization')
+    print('=' * 60)
+    os.makedirs(VARIANT_DIR, exist_ok=True)
+
+    files = list_images()
+    print(f'\nImages: {len(files)}, variants: {", ".join(f"{k}={v}px" for k, v in VARIANT_SIZES.items())}\n')
+
+    manifest = get_manifest()
+    total_before = total_after = variants = 0
+
+    with ProcessPoolExecutor() as pool:
+        for r in pool.map(optimize_file, files, chunksize=4):
+            total_before += r['before']
+            total_after += r['after']
+            variants += r['variants']
+            saved = r['before'] - r['after']
+            print(f"  [{r['status']}] {r['file']}: {r['before']:,} -> {r['after']:,} bytes"
+                  + (f' (-{saved:,})' if saved else ''))
+            if r['sha256']:
+                # Keep the manifest entry intact so conditional GETs still apply
+                manifest.update_local(r['file'], r['after'], r['sha256'])
+
+    manifest.save()
+
+    print('\n' + '=' * 60)
+    print(f'Done! {total_before:,} -> {total_after:,} bytes '
+          f'(saved {total_before - total_after:,}), {variants} variants written')
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
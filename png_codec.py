@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Minimal PNG Codec (standard library only)
+Reads and writes the PNGs in images/vehicles without Pillow:
+chunk walking with CRC checks, zlib + filter reversal to RGBA,
+RGBA/palette encoding, lossless re-compression and simple resampling.
+Interlaced (Adam7) images are not supported; none of our sources use them.
+"""
+
+import struct
+import zlib
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Chunks that change how the image looks; everything else is stripped
+KEEP_CHUNKS = (b'IHDR', b'PLTE', b'tRNS', b'IDAT', b'IEND')
+
+# Samples per pixel for each color type
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class PNGError(ValueError):
+    """Malformed or unsupported PNG"""
+
+
+def is_png(data):
+    return data[:8] == PNG_SIGNATURE
+
+
+def iter_chunks(data):
+    """
+    Yield (type, body, crc_ok) for every chunk
+    Raises PNGError when the signature is missing or a chunk is truncated
+    """
+    if not is_png(data):
+        raise PNGError('not a PNG file')
+    pos = 8
+    end = len(data)
+    while pos < end:
+        if pos + 8 > end:
+            raise PNGError('truncated chunk header')
+        length, ctype = struct.unpack('>I4s', data[pos:pos + 8])
+        body_end = pos + 8 + length
+        if body_end + 4 > end:
+            raise PNGError(f'truncated {ctype.decode("latin-1")} chunk')
+        body = data[pos + 8:body_end]
+        crc, = struct.unpack('>I', data[body_end:body_end + 4])
+        yield ctype, body, zlib.crc32(ctype + body) == crc
+        pos = body_end + 4
+        if ctype == b'IEND':
+            return
+    raise PNGError('missing IEND chunk')
+
+
+def _chunk(ctype, body):
+    return struct.pack('>I', len(body)) + ctype + body + struct.pack('>I', zlib.crc32(ctype + body))
+
+
+class PNGInfo:
+    """Header fields plus the pieces needed to decode"""
+
+    def __init__(self, data):
+        self.chunks = []
+        idat = []
+        for ctype, body, crc_ok in iter_chunks(data):
+            if not crc_ok:
+                raise PNGError(f'bad CRC in {ctype.decode("latin-1")} chunk')
+            self.chunks.append((ctype, body))
+            if ctype == b'IDAT':
+                idat.append(body)
+        if not self.chunks or self.chunks[0][0] != b'IHDR':
+            raise PNGError('IHDR is not the first chunk')
+        (self.width, self.height, self.bit_depth, self.color_type,
+         _, _, self.interlace) = struct.unpack('>IIBBBBB', self.chunks[0][1])
+        if self.color_type not in _CHANNELS:
+            raise PNGError(f'bad color type {self.color_type}')
+        if not idat:
+            raise PNGError('no IDAT chunk')
+        self.idat = b''.join(idat)
+        self.palette = self.get(b'PLTE')
+        self.trns = self.get(b'tRNS')
+
+    def get(self, ctype):
+        for name, body in self.chunks:
+            if name == ctype:
+                return body
+        return None
+
+    @property
+    def bits_per_pixel(self):
+        return _CHANNELS[self.color_type] * self.bit_depth
+
+    @property
+    def stride(self):
+        return (self.width * self.bits_per_pixel + 7) // 8
+
+    @property
+    def bpp(self):
+        # Byte distance used by the filters (at least 1)
+        return max(1, self.bits_per_pixel // 8)
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa = abs(p - a)
+    pb = abs(p - b)
+    pc = abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def unfilter(raw, height, stride, bpp):
+    """Reverse the per-row PNG filters; returns a list of row bytearrays"""
+    rows = []
+    prev = bytearray(stride)
+    pos = 0
+    for _ in range(height):
+        if pos + 1 + stride > len(raw):
+            raise PNGError('image data is truncated')
+        ftype = raw[pos]
+        row = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if ftype == 0:
+            pass
+        elif ftype == 1:
+            for i in range(bpp, stride):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif ftype == 2:
+            for i in range(stride):
+                row[i] = (row[i] + prev[i]) & 0xFF
+        elif ftype == 3:
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                up_left = prev[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + _paeth(left, prev[i], up_left)) & 0xFF
+        else:
+            raise PNGError(f'bad filter type {ftype}')
+        rows.append(row)
+        prev = row
+    return rows
+
+
+def _filter_row(ftype, row, prev, bpp):
+    n = len(row)
+    out = bytearray(n)
+    if ftype == 0:
+        out[:] = row
+    elif ftype == 1:
+        for i in range(n):
+            out[i] = (row[i] - (row[i - bpp] if i >= bpp else 0)) & 0xFF
+    elif ftype == 2:
+        for i in range(n):
+            out[i] = (row[i] - prev[i]) & 0xFF
+    elif ftype == 3:
+        for i in range(n):
+            left = row[i - bpp] if i >= bpp else 0
+            out[i] = (row[i] - ((left + prev[i]) >> 1)) & 0xFF
+    else:
+        for i in range(n):
+            left = row[i - bpp] if i >= bpp else 0
+            up_left = prev[i - bpp] if i >= bpp else 0
+            out[i] = (row[i] - _paeth(left, prev[i], up_left)) & 0xFF
+    return out
+
+
+def filter_rows(rows, bpp, adaptive=True):
+    """
+    Filter rows for compression
+    adaptive: pick the filter with the smallest sum of signed bytes per row
+    (the usual heuristic); otherwise use filter 0 everywhere
+    """
+    out = bytearray()
+    prev = bytearray(len(rows[0])) if rows else bytearray()
+    for row in rows:
+        if not adaptive:
+            out.append(0)
+            out += row
+        else:
+            best = None
+            for ftype in range(5):
+                candidate = _filter_row(ftype, row, prev, bpp)
+                score = sum(b if b < 128 else 256 - b for b in candidate)
+                if best is None or score < best[0]:
+                    best = (score, ftype, candidate)
+            out.append(best[1])
+            out += best[2]
+        prev = row
+    return bytes(out)
+
+
+def _expand_samples(row, width, bit_depth, channels):
+    """Split a row into integer samples (1/2/4/8/16 bit)"""
+    count = width * channels
+    if bit_depth == 8:
+        return list(row[:count])
+    if bit_depth == 16:
+        return [row[i] for i in range(0, count * 2, 2)]  # keep the high byte
+    per_byte = 8 // bit_depth
+    mask = (1 << bit_depth) - 1
+    samples = []
+    for byte in row:
+        for k in range(per_byte):
+            samples.append((byte >> (8 - bit_depth * (k + 1))) & mask)
+    return samples[:count]
+
+
+def decode(data):
+    """Decode PNG bytes to (width, height, RGBA bytearray)"""
+    info = PNGInfo(data)
+    if info.interlace:
+        raise PNGError('interlaced PNG is not supported')
+    try:
+        raw = zlib.decompress(info.idat)
+    except zlib.error as e:
+        raise PNGError(f'bad IDAT stream: {e}')
+    rows = unfilter(raw, info.height, info.stride, info.bpp)
+
+    width = info.width
+    depth = info.bit_depth
+    ctype = info.color_type
+    channels = _CHANNELS[ctype]
+    rgba = bytearray(width * info.height * 4)
+    # Scale low bit depth gray to 0..255
+    scale = 255 // ((1 << depth) - 1) if depth < 8 and ctype == 0 else 1
+
+    palette = None
+    if ctype == 3:
+        if not info.palette:
+            raise PNGError('palette image without PLTE')
+        alphas = info.trns or b''
+        palette = []
+        for i in range(len(info.palette) // 3):
+            alpha = alphas[i] if i < len(alphas) else 255
+            palette.append(bytes(info.palette[i * 3:i * 3 + 3]) + bytes([alpha]))
+
+    trns_key = None
+    if info.trns and ctype in (0, 2):
+        values = struct.unpack(f'>{len(info.trns) // 2}H', info.trns)
+        trns_key = tuple(values)
+
+    pos = 0
+    for row in rows:
+        samples = _expand_samples(row, width, depth, channels)
+        if ctype == 3:
+            for index in samples:
+                if index >= len(palette):
+                    raise PNGError('palette index out of range')
+                rgba[pos:pos + 4] = palette[index]
+                pos += 4
+        elif ctype == 6:
+            rgba[pos:pos + width * 4] = bytes(samples)
+            pos += width * 4
+        elif ctype == 2:
+            for i in range(0, len(samples), 3):
+                r, g, b = samples[i:i + 3]
+                alpha = 0 if trns_key and depth == 8 and (r, g, b) == trns_key else 255
+                rgba[pos:pos + 4] = bytes((r, g, b, alpha))
+                pos += 4
+        elif ctype == 4:
+            for i in range(0, len(samples), 2):
+                v, alpha = samples[i], samples[i + 1]
+                rgba[pos:pos + 4] = bytes((v, v, v, alpha))
+                pos += 4
+        else:
+            for v in samples:
+                alpha = 0 if trns_key and v == trns_key[0] else 255
+                v *= scale
+                rgba[pos:pos + 4] = bytes((v, v, v, alpha))
+                pos += 4
+    return width, info.height, rgba
+
+
+def encode(width, height, rgba, level=9):
+    """
+    Encode RGBA pixels as PNG
+    Uses an 8-bit palette when the image has 256 colors or fewer
+    """
+    colors = {}
+    for i in range(0, len(rgba), 4):
+        colors.setdefault(bytes(rgba[i:i + 4]), len(colors))
+        if len(colors) > 256:
+            break
+
+    if len(colors) <= 256:
+        stride = width
+        pixels = bytearray(colors[bytes(rgba[i:i + 4])] for i in range(0, len(rgba), 4))
+        rows = [pixels[y * stride:(y + 1) * stride] for y in range(height)]
+        ihdr = struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)
+        ordered = sorted(colors, key=colors.get)
+        plte = b''.join(c[:3] for c in ordered)
+        alphas = bytes(c[3] for c in ordered).rstrip(b'\xff')
+        extra = _chunk(b'PLTE', plte) + (_chunk(b'tRNS', alphas) if alphas else b'')
+        # Palette data usually compresses best unfiltered
+        raw = filter_rows(rows, 1, adaptive=False)
+    else:
+        stride = width * 4
+        rows = [rgba[y * stride:(y + 1) * stride] for y in range(height)]
+        ihdr = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+        extra = b''
+        raw = filter_rows(rows, 4)
+
+    return (PNG_SIGNATURE + _chunk(b'IHDR', ihdr) + extra +
+            _chunk(b'IDAT', zlib.compress(raw, level)) + _chunk(b'IEND', b''))
+
+
+def recompress(data, level=9):
+    """
+    Lossless re-compression: keep only KEEP_CHUNKS, merge IDATs and
+    re-deflate at max level, trying the original filters, no filters
+    and adaptive filters. Returns the smallest result (may be data itself).
+    """
+    info = PNGInfo(data)
+    raw = zlib.decompress(info.idat)
+    candidates = [raw]
+    if not info.interlace:
+        rows = unfilter(raw, info.height, info.stride, info.bpp)
+        candidates.append(filter_rows(rows, info.bpp, adaptive=False))
+        if info.bit_depth >= 8 and info.color_type != 3:
+            candidates.append(filter_rows(rows, info.bpp))
+    idat = min((zlib.compress(c, level) for c in candidates), key=len)
+
+    out = [PNG_SIGNATURE]
+    for ctype, body in info.chunks:
+        if ctype == b'IDAT':
+            if idat is not None:
+                out.append(_chunk(b'IDAT', idat))
+                idat = None
+        elif ctype in KEEP_CHUNKS:
+            out.append(_chunk(ctype, body))
+    result = b''.join(out)
+    return result if len(result) < len(data) else data
+
+
+def pad_to_square(width, height, rgba):
+    """Center the image on a transparent square canvas"""
+    size = max(width, height)
+    if width == height:
+        return size, rgba
+    out = bytearray(size * size * 4)
+    left = (size - width) // 2
+    top = (size - height) // 2
+    for y in range(height):
+        src = y * width * 4
+        dst = ((top + y) * size + left) * 4
+        out[dst:dst + width * 4] = rgba[src:src + width * 4]
+    return size, out
+
+
+def resize(width, height, rgba, new_width, new_height):
+    """
+    Area-average resampling on premultiplied alpha
+    (box filter when shrinking, bilinear-like blend when enlarging)
+    """
+    if (width, height) == (new_width, new_height):
+        return bytearray(rgba)
+
+    def spans(src, dst):
+        # For each destination pixel: [(source index, weight), ...]
+        result = []
+        scale = src / dst
+        for d in range(dst):
+            if scale >= 1:
+                start, end = d * scale, (d + 1) * scale
+            else:
+                center = (d + 0.5) * scale - 0.5
+                start = max(0.0, min(src - 1.0, center))
+                end = start + 1
+            weights = []
+            s = int(start)
+            while s < end and s < src:
+                w = min(end, s + 1) - max(start, s)
+                if w > 0:
+                    weights.append((s, w))
+                s += 1
+            total = sum(w for _, w in weights) or 1
+            result.append([(s, w / total) for s, w in weights])
+        return result
+
+    xs = spans(width, new_width)
+    ys = spans(height, new_height)
+
+    # Premultiply so transparent pixels don't darken edges
+    pre = [0.0] * (width * height * 4)
+    for i in range(0, len(rgba), 4):
+        a = rgba[i + 3] / 255
+        pre[i] = rgba[i] * a
+        pre[i + 1] = rgba[i + 1] * a
+        pre[i + 2] = rgba[i + 2] * a
+        pre[i + 3] = rgba[i + 3]
+
+    # Horizontal pass
+    tmp = [0.0] * (new_width * height * 4)
+    for y in range(height):
+        row = y * width * 4
+        out_row = y * new_width * 4
+        for x, weights in enumerate(xs):
+            r = g = b = a = 0.0
+            for s, w in weights:
+                i = row + s * 4
+                r += pre[i] * w
+                g += pre[i + 1] * w
+                b += pre[i + 2] * w
+                a += pre[i + 3] * w
+            o = out_row + x * 4
+            tmp[o] = r
+            tmp[o + 1] = g
+            tmp[o + 2] = b
+            tmp[o + 3] = a
+
+    # Vertical pass + un-premultiply
+    out = bytearray(new_width * new_height * 4)
+    for y, weights in enumerate(ys):
+        for x in range(new_width):
+            r = g = b = a = 0.0
+            for s, w in weights:
+                i = (s * new_width + x) * 4
+                r += tmp[i] * w
+                g += tmp[i + 1] * w
+                b += tmp[i + 2] * w
+                a += tmp[i + 3] * w
+            o = (y * new_width + x) * 4
+            if a > 0:
+                k = 255 / a
+                out[o] = min(255, int(r * k + 0.5))
+                out[o + 1] = min(255, int(g * k + 0.5))
+                out[o + 2] = min(255, int(b * k + 0.5))
+                out[o + 3] = min(255, int(a + 0.5))
+    return out
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Precompression Build Step
+Writes a .gz sibling (and .br when the brotli module is installed) next to
+every HTML/JS/CSS/SVG file, so serve.py can send compressed bytes with no
+work per request. Files are only recompressed when their sha256 changed
+(tracked in .precompress.json); files that do not get meaningfully smaller
+get no sibling, and siblings of deleted or no-longer-worthwhile files are
+removed.
+
+Usage: python3 precompress.py [--force]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(BASE_DIR, '.precompress.json')
+
+EXTENSIONS = ('.html', '.js', '.css', '.svg')
+SKIP_DIRS = {'node_modules', 'pptx-workspace', 'quarantine', '__pycache__'}
+
+# Encoding -> sibling suffix, in server preference order
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+# Keep a sibling only if it saves at least this much
+MIN_SAVING_BYTES = 256
+MAX_RATIO = 0.9
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    # mtime=0 keeps the output byte-identical between runs
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encodings():
+    return [e for e in ENCODINGS if e != 'br' or brotli is not None]
+
+
+def worthwhile(original, compressed):
+    return (len(original) - len(compressed) >= MIN_SAVING_BYTES
+            and len(compressed) <= len(original) * MAX_RATIO)
+
+
+def list_sources(directory=BASE_DIR):
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS)
+        for name in files:
+            if name.endswith(EXTENSIONS) and not name.startswith('.'):
+                found.append(os.path.relpath(os.path.join(root, name), directory).replace(os.sep, '/'))
+    return sorted(found)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _write(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_state():
+    try:
+        with open(STATE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    tmp = STATE_PATH + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+
+def precompress(relpath, state, encodings, force=False):
+    """(status, original size, {encoding: size}) for one file"""
+    path = os.path.join(BASE_DIR, relpath)
+    with open(path, 'rb') as f:
+        data = f.read()
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    old = state.get(relpath)
+    if (not force and old and old['sha256'] == sha256 and old['encodings'] == encodings
+            and all(os.path.exists(path + ENCODINGS[e]) for e in old['written'])):
+        return 'same', len(data), old['written']
+
+    written = {}
+    for encoding in encodings:
+        sibling = path + ENCODINGS[encoding]
+        body = compress(data, encoding)
+        if worthwhile(data, body):
+            _write(sibling, body)
+            # Never older than the source, so the server trusts it
+            st = os.stat(path)
+            os.utime(sibling, ns=(st.st_atime_ns, st.st_mtime_ns))
+            written[encoding] = len(body)
+        else:
+            _remove(sibling)
+    state[relpath] = {'sha256': sha256, 'encodings': encodings, 'written': written}
+    return 'write', len(data), written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write .gz/.br siblings for text assets')
+    parser.add_argument('--force', action='store_true', help='recompress every file')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('Precompress Text Assets')
+    print('=' * 60)
+    encodings = available_encodings()
+    print(f'\nEncodings: {", ".join(encodings)}'
+          + ('' if brotli else ' (pip install brotli for .br)') + '\n')
+
+    state = load_state()
+    sources = list_sources()
+
+    # Siblings of files that are gone
+    for relpath in sorted(set(state) - set(sources)):
+        for suffix in ENCODINGS.values():
+            _remove(os.path.join(BASE_DIR, relpath + suffix))
+        del state[relpath]
+
+    rewritten = 0
+    total = {e: [0, 0] for e in encodings}    # bytes before/after for files with a sibling
+    for relpath in sources:
+        status, size, written = precompress(relpath, state, encodings, args.force)
+        if status == 'write':
+            rewritten += 1
+            sizes = ', '.join(f'{e} {n:,}' for e, n in written.items()) or 'not worth it'
+            print(f'  [WRITE] {relpath}: {size:,} -> {sizes}')
+        for encoding, n in written.items():
+            total[encoding][0] += size
+            total[encoding][1] += n
+    save_state(state)
+
+    print(f'\nFiles: {len(sources)}, recompressed: {rewritten}, unchanged: {len(sources) - rewritten}')
+    for encoding, (before, after) in total.items():
+        if before:
+            print(f'  {encoding}: {before:,} -> {after:,} bytes ({100 - after * 100 // before}% smaller)')
+    print('=' * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Adaptive Per-host Rate Limiter
+One token bucket per host. Every request takes a token; the refill rate
+adapts AIMD-style:
+- each successful response adds INCREASE requests/second (up to max_rate)
+- a 429/503 or a MediaWiki maxlag error halves the rate
+  (at most once per DECREASE_COOLDOWN, since parallel requests all get
+  throttled together) and empties the bucket
+- Retry-After (seconds or an HTTP date) pauses the host until then
+So the rate climbs back towards what the host allows and drops as soon as
+the host pushes back. Used by http_pool for every request.
+"""
+
+import email.utils
+import threading
+import time
+
+# (start, max) requests/second per host
+HOST_RATES = {
+    'commons.wikimedia.org': (2.0, 10.0),
+    'upload.wikimedia.org': (1.0, 5.0),
+    'cdn-icons-png.flaticon.com': (2.0, 8.0),
+    'api.iconify.design': (5.0, 20.0),
+    'cdn.jsdelivr.net': (10.0, 50.0),
+}
+DEFAULT_RATE = (5.0, 20.0)
+MIN_RATE = 0.2
+
+# Tokens a host may save up while idle
+BURST = 4
+
+# AIMD parameters
+INCREASE = 0.25             # requests/second added per success
+DECREASE = 0.5              # rate multiplied by this when throttled
+DECREASE_COOLDOWN = 1.0     # seconds between two decreases
+
+# Pause used when the host throttles without saying for how long
+DEFAULT_BACKOFF = 2.0
+
+# Longer Retry-After values are not waited out
+MAX_RETRY_AFTER = 120.0
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delay or HTTP date), or None"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket whose refill rate is adjusted by AIMD"""
+
+    def __init__(self, rate, max_rate, min_rate=MIN_RATE, burst=BURST):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.tokens = 1.0
+        self.paused_until = 0.0
+        self.waiting = 0            # threads blocked in acquire()
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'throttled': 0, 'waited': 0.0}
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a request may be sent; returns the seconds waited"""
+        waited = 0.0
+        with self._lock:
+            self.waiting += 1
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    self.waiting -= 1
+                    self.stats['requests'] += 1
+                    self.stats['waited'] += waited
+                    return waited
+                else:
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def delay(self):
+        """Estimated seconds before a new request would be sent (queue included)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            pause = max(0.0, self.paused_until - now)
+            return pause + max(0.0, self.waiting + 1 - self.tokens) / self.rate
+
+    def success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + INCREASE)
+
+    def throttle(self, retry_after=None):
+        """Multiplicative decrease plus a pause; returns the pause in seconds"""
+        pause = DEFAULT_BACKOFF if retry_after is None else retry_after
+        with self._lock:
+            now = time.monotonic()
+            self.stats['throttled'] += 1
+            if now - self._last_decrease >= DECREASE_COOLDOWN:
+                self.rate = max(self.min_rate, self.rate * DECREASE)
+                self._last_decrease = now
+            self.tokens = 0.0
+            self._updated = now
+            self.paused_until = max(self.paused_until, now + pause)
+        return pause
+
+
+class RateLimiter:
+    """
+    Usage:
+        limiter = get_limiter()
+        limiter.acquire(host)
+        ... send ...
+        limiter.success(host)  or  limiter.throttle(host, response.headers.get('Retry-After'))
+        print(limiter.report())
+    """
+
+    def __init__(self, host_rates=None):
+        self.host_rates = dict(HOST_RATES, **(host_rates or {}))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(*self.host_rates.get(host, DEFAULT_RATE))
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, host):
+        return self.bucket(host).acquire()
+
+    def delay(self, host):
+        return self.bucket(host).delay()
+
+    def success(self, host):
+        self.bucket(host).success()
+
+    def throttle(self, host, retry_after=None):
+        """
+        Record that the host pushed back; returns the pause in seconds, or
+        None if Retry-After asks for more than MAX_RETRY_AFTER (give up)
+        """
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None and seconds > MAX_RETRY_AFTER:
+            self.bucket(host).throttle(MAX_RETRY_AFTER)
+            return None
+        return self.bucket(host).throttle(seconds)
+
+    def report(self):
+        """One line per host for the end of a run"""
+        with self._lock:
+            buckets = sorted(self._buckets.items())
+        lines = []
+        for host, b in buckets:
+            s = b.stats
+            lines.append(f"Rate {host}: {s['requests']} requests, {s['throttled']} throttled, "
+                         f"now {b.rate:.1f}/s (max {b.max_rate:g}), waited {s['waited']:.1f}s")
+        return '\n'.join(lines) or 'Rate: no requests'
+
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+
+def get_limiter():
+    """Shared limiter used by the connection pool"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
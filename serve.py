@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Static File Server for the classroom (standard library only)
+Drop-in replacement for `python3 -m http.server 8080`:
+- one thread per connection, HTTP/1.1 keep-alive (pipelined requests are
+  answered in order)
+- file bodies sent with socket.sendfile() (zero-copy os.sendfile where
+  the OS has it)
+- ETag / Last-Modified validators, 304 Not Modified, single byte Range
+  requests (206 / 416) with If-Range
+- Cache-Control per file type: pages are revalidated every time (cheap
+  304s), images/scripts/styles are cached for --max-age seconds, and
+  content-hashed files from build_dist.py are immutable
+- Accept-Encoding negotiation: a fresh .br/.gz sibling written by
+  precompress.py is sent as-is, so compression costs nothing per request
+Dotfiles (.git, manifests, caches) are never served and there are no
+directory listings.
+
+Usage: python3 serve.py [port] [--bind ADDR] [--directory DIR] [--max-age SECONDS] [--quiet]
+"""
+
+import argparse
+import email.utils
+import mimetypes
+import os
+import posixpath
+import re
+import socket
+import sys
+import urllib.parse
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PORT = 8080
+
+# Seconds an idle keep-alive connection is kept open
+KEEP_ALIVE_TIMEOUT = 15
+
+# Cache-Control for assets (images, scripts, styles, fonts)
+DEFAULT_MAX_AGE = 24 * 3600
+
+# Pages and data that change when the game is edited: always revalidate
+REVALIDATE_TYPES = ('text/html', 'application/json', 'application/manifest+json')
+
+# Content-hashed names written by build_dist.py (car.1a2b3c4d5e.png) never change
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{10}\.\w+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Service workers must always be revalidated so updates are seen
+NO_CACHE_FILES = ('sw.js',)
+
+# Precompressed siblings (see precompress.py), in preference order
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+mimetypes.add_type('image/svg+xml', '.svg')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+
+
+def http_date(timestamp):
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+def parse_http_date(value):
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return parsed.timestamp() if parsed else None
+
+
+def make_etag(st):
+    """Strong validator from mtime and size (no need to hash the file)"""
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def etag_matches(header, etag):
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)"""
+    if header.strip() == '*':
+        return True
+    tags = [t.strip() for t in header.split(',')]
+    return any(t.removeprefix('W/') == etag for t in tags)
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single 'bytes=' range, None to ignore the
+    header (multiple ranges, other units), or 'unsatisfiable'
+    """
+    units, _, spec = header.partition('=')
+    if units.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if not first:                   # suffix: last N bytes
+            length = int(last)
+            if length <= 0:
+                return 'unsatisfiable'
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, min(end, size - 1)
+
+
+def accepted_encodings(header):
+    """Content codings the client accepts (q > 0)"""
+    accepted = set()
+    for item in (header or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    if '*' in accepted:
+        accepted.update(coding for coding, _ in PRECOMPRESSED)
+    return accepted
+
+
+def precompressed_sibling(path, st, accept_encoding):
+    """(encoding, sibling path) of a fresh precompressed file the client accepts"""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding not in accepted:
+            continue
+        try:
+            sibling = os.stat(path + suffix)
+        except OSError:
+            continue
+        # A sibling older than its source is stale; fall back to the source
+        if sibling.st_mtime_ns >= st.st_mtime_ns:
+            return encoding, path + suffix
+    return None, None
+
+
+class StaticHandler(BaseHTTPRequestHandler):
+    """GET/HEAD for files under the server's directory"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'EngGame'
+    timeout = KEEP_ALIVE_TIMEOUT
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def serve(self, send_body):
+        path = self.resolve()
+        if path is None:
+            return
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return
+        encoding, sibling = precompressed_sibling(path, st, self.headers.get('Accept-Encoding'))
+        try:
+            f = open(sibling or path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return
+
+        with f:
+            last_modified = http_date(st.st_mtime)
+            ctype = self.guess_type(path)
+            vary = any(os.path.exists(path + suffix) for _, suffix in PRECOMPRESSED)
+
+            # Each representation needs its own validator
+            st = os.fstat(f.fileno())
+            etag = make_etag(st)
+            if encoding:
+                etag = etag[:-1] + f'-{encoding}"'
+
+            if self.not_modified(etag, st.st_mtime):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_validators(path, etag, last_modified, ctype, vary)
+                self.end_headers()
+                return
+
+            size = st.st_size
+            start, end = 0, size - 1
+            status = HTTPStatus.OK
+            range_header = self.headers.get('Range')
+            if range_header and self.if_range_ok(etag, st.st_mtime):
+                byte_range = parse_range(range_header, size)
+                if byte_range == 'unsatisfiable':
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header('Content-Range', f'bytes */{size}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if byte_range:
+                    start, end = byte_range
+                    status = HTTPStatus.PARTIAL_CONTENT
+
+            length = end - start + 1 if size else 0
+            self.send_response(status)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Length', str(length))
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            if status == HTTPStatus.PARTIAL_CONTENT:
+                self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            self.send_validators(path, etag, last_modified, ctype, vary)
+            self.end_headers()
+
+            if send_body and length:
+                self.wfile.flush()
+                self.connection.sendfile(f, start, length)
+
+    def resolve(self):
+        """Filesystem path for the request, or None after sending an error/redirect"""
+        url_path = urllib.parse.urlsplit(self.path).path
+        parts = [p for p in posixpath.normpath(urllib.parse.unquote(url_path)).split('/') if p]
+        if any(p.startswith('.') for p in parts):
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return None
+
+        path = os.path.join(self.server.directory, *parts)
+        if os.path.isdir(path):
+            if not url_path.endswith('/'):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header('Location', url_path + '/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return None
+        return path
+
+    def not_modified(self, etag, mtime):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        since = parse_http_date(self.headers.get('If-Modified-Since'))
+        return since is not None and int(mtime) <= since
+
+    def if_range_ok(self, etag, mtime):
+        """Honour Range only if If-Range (when sent) still matches the file"""
+        if_range = self.headers.get('If-Range')
+        if if_range is None:
+            return True
+        if if_range.startswith('"'):
+            return if_range == etag     # strong comparison only
+        date = parse_http_date(if_range)
+        return date is not None and int(mtime) == int(date)
+
+    def send_validators(self, path, etag, last_modified, ctype, vary):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Cache-Control', self.cache_control(path, ctype))
+        if vary:
+            self.send_header('Vary', 'Accept-Encoding')
+
+    def cache_control(self, path, ctype):
+        name = os.path.basename(path)
+        if ctype.split(';')[0] in REVALIDATE_TYPES or name in NO_CACHE_FILES:
+            return 'no-cache'
+        if HASHED_NAME_RE.search(name):
+            return IMMUTABLE
+        return f'public, max-age={self.server.max_age}'
+
+    def guess_type(self, path):
+        ctype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if ctype.startswith('text/') or ctype in ('application/json', 'image/svg+xml'):
+            ctype += '; charset=utf-8'
+        return ctype
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class StaticServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, directory=BASE_DIR, max_age=DEFAULT_MAX_AGE, quiet=False):
+        self.directory = os.path.abspath(directory)
+        self.max_age = max_age
+        self.quiet = quiet
+        if ':' in address[0]:
+            self.address_family = socket.AF_INET6
+        super().__init__(address, StaticHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the game to iPads on the local network')
+    parser.add_argument('port', nargs='?', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--bind', default='0.0.0.0', help='address to listen on (default: all)')
+    parser.add_argument('--directory', default=BASE_DIR, help='folder to serve (default: this project)')
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE,
+                        help=f'Cache-Control max-age for images/scripts/styles (default {DEFAULT_MAX_AGE})')
+    parser.add_argument('--quiet', action='store_true', help='do not log each request')
+    args = parser.parse_args()
+
+    server = StaticServer((args.bind, args.port), args.directory, args.max_age, args.quiet)
+    print(f'Serving {server.directory} on http://{args.bind}:{args.port}/ (Ctrl+C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('\nStopped')
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
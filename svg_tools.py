@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+SVG Validation and Minification
+Parses an SVG with the stdlib XML parser, rejects files that would not
+render (empty, not well-formed, no <svg> root, no size, nothing to draw,
+scripts), and re-serializes the rest compactly:
+- comments, metadata/title/desc and editor (Inkscape/Sodipodi) markup dropped
+- whitespace collapsed, colors shortened
+- path data re-tokenized and rounded to PRECISION decimals; relative
+  commands carry their rounding error forward so shapes do not drift
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+
+# Decimals kept in coordinates (Iconify icons use a 128 unit viewBox)
+PRECISION = 2
+
+DROP_ELEMENTS = {'metadata', 'title', 'desc'}
+DRAWABLE = {'path', 'circle', 'ellipse', 'rect', 'line', 'polygon', 'polyline', 'use', 'image', 'text'}
+FORBIDDEN = {'script', 'foreignObject'}
+
+# Plain lengths that are safe to round; transforms and opacities are left alone
+ROUND_ATTRS = {'x', 'y', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy', 'r', 'rx', 'ry',
+               'width', 'height', 'stroke-width', 'fx', 'fy'}
+COLOR_ATTRS = {'fill', 'stroke', 'stop-color', 'color', 'flood-color'}
+
+# Root attributes that have no meaning inside a <symbol>
+ROOT_DROP = {'width', 'height', 'version', 'x', 'y', 'xmlns', 'viewBox'}
+
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_SKIP_RE = re.compile(r'[\s,]*')
+_HEX_RE = re.compile(r'^#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3$')
+_URL_REF_RE = re.compile(r'url\(#([^)]+)\)')
+
+# Parameters per path command
+ARITY = {'M': 2, 'L': 2, 'T': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'A': 7, 'Z': 0}
+
+# Which parameters are x (0) and y (1) coordinates; None = length/angle/flag
+AXES = {
+    'M': (0, 1), 'L': (0, 1), 'T': (0, 1),
+    'H': (0,), 'V': (1,),
+    'C': (0, 1, 0, 1, 0, 1), 'S': (0, 1, 0, 1), 'Q': (0, 1, 0, 1),
+    'A': (None, None, None, None, None, 0, 1),
+    'Z': (),
+}
+
+
+class SVGError(ValueError):
+    """SVG is empty, malformed or would not render"""
+
+
+def _local(name):
+    return name.rsplit('}', 1)[-1]
+
+
+def _namespace(name):
+    return name[1:].split('}', 1)[0] if name.startswith('{') else ''
+
+
+def parse(data):
+    """Parse and validate SVG bytes; returns the root Element or raises SVGError"""
+    if not data or not data.strip():
+        raise SVGError('empty file')
+    if b'<!ENTITY' in data:
+        raise SVGError('entity declarations are not allowed')
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError as e:
+        raise SVGError(f'not well-formed XML ({e})')
+
+    if root.tag != f'{{{SVG_NS}}}svg':
+        raise SVGError(f'root element is <{_local(root.tag)}>, not <svg>')
+    # A <symbol> sprite is never drawn itself, so it needs no size
+    sprite = len(root) and all(_local(child.tag) in ('symbol', 'defs') for child in root)
+    if view_box(root) is None and not sprite:
+        raise SVGError('no viewBox or numeric width/height')
+
+    drawable = False
+    for element in root.iter():
+        name = _local(element.tag)
+        if name in FORBIDDEN:
+            raise SVGError(f'contains <{name}>')
+        if any(_local(attr).startswith('on') for attr in element.attrib):
+            raise SVGError(f'event handler on <{name}>')
+        if name in DRAWABLE:
+            drawable = True
+    if not drawable:
+        raise SVGError('nothing to draw')
+    return root
+
+
+def view_box(root):
+    """The root viewBox string, derived from width/height when missing"""
+    box = root.get('viewBox')
+    if box:
+        return ' '.join(box.replace(',', ' ').split())
+    try:
+        width = float(root.get('width', '').replace('px', ''))
+        height = float(root.get('height', '').replace('px', ''))
+    except ValueError:
+        return None
+    return f'0 0 {format_number(width, 6)} {format_number(height, 6)}'
+
+
+def format_number(value, precision=PRECISION):
+    """Shortest decimal text: 0.50 -> .5, -0.0 -> 0"""
+    text = f'{round(value, precision):.{precision}f}'.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        return '0'
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def parse_path(d):
+    """Split path data into [(command, [numbers])]; arc flags are read one digit each"""
+    segments = []
+    pos = 0
+    command = None
+    params = None
+    while True:
+        pos = _SKIP_RE.match(d, pos).end()
+        if pos >= len(d):
+            break
+        char = d[pos]
+        if char.isalpha():
+            command = char
+            if command.upper() not in ARITY:
+                raise SVGError(f'unknown path command {command!r}')
+            params = []
+            segments.append((command, params))
+            pos += 1
+            continue
+        if command is None:
+            raise SVGError('path data does not start with a command')
+        arity = ARITY[command.upper()]
+        if arity == 0:
+            raise SVGError(f'numbers after {command!r}')
+        index = len(params) % arity
+        if command.upper() == 'A' and index in (3, 4):
+            if char not in '01':
+                raise SVGError('bad arc flag')
+            params.append(int(char))
+            pos += 1
+            continue
+        m = _NUMBER_RE.match(d, pos)
+        if not m:
+            raise SVGError(f'bad path data near {d[pos:pos + 10]!r}')
+        params.append(float(m.group()))
+        pos = m.end()
+
+    for command, params in segments:
+        arity = ARITY[command.upper()]
+        if arity and (not params or len(params) % arity):
+            raise SVGError(f'wrong number of values for {command!r}')
+    return segments
+
+
+def _join(tokens):
+    """Join numbers with the fewest separators the path grammar allows"""
+    out = []
+    previous = None
+    for token in tokens:
+        if previous is not None and not token.startswith('-') and not (
+                token.startswith('.') and ('.' in previous or 'e' in previous)):
+            out.append(' ')
+        out.append(token)
+        previous = token
+    return ''.join(out)
+
+
+def minify_path(d, precision=PRECISION):
+    """Round path data, compensating relative commands for earlier rounding"""
+    out = []                    # [command, tokens]
+    error = [0.0, 0.0]          # true position - drawn position
+    start_error = [0.0, 0.0]    # same, at the current subpath start
+    for command, params in parse_path(d):
+        upper = command.upper()
+        relative = command.islower()
+        if upper == 'Z':
+            error = list(start_error)
+            out.append([command, []])
+            continue
+
+        arity = ARITY[upper]
+        axes = AXES[upper]
+        tokens = []
+        for offset in range(0, len(params), arity):
+            group = params[offset:offset + arity]
+            end = list(error)
+            for index, (value, axis) in enumerate(zip(group, axes)):
+                if axis is None:
+                    tokens.append(str(value) if upper == 'A' and index in (3, 4)
+                                  else format_number(value, precision))
+                    continue
+                target = value + error[axis] if relative else value
+                rounded = float(format_number(target, precision))
+                tokens.append(format_number(rounded, precision))
+                # The last x/y of a group is where the pen ends up
+                end[axis] = (target - rounded)
+            error = end
+            if upper == 'M' and offset == 0:
+                start_error = list(error)
+        if out and out[-1][0] == command and upper != 'M':
+            # A repeated command letter is implied
+            out[-1][1].extend(tokens)
+        else:
+            out.append([command, tokens])
+    return ''.join(command + _join(tokens) for command, tokens in out)
+
+
+def _short_color(value):
+    value = value.strip()
+    m = _HEX_RE.match(value)
+    if m:
+        return '#' + ''.join(m.groups()).lower()
+    return value.lower() if value.startswith('#') else value
+
+
+def _minify_attr(name, value, precision):
+    value = ' '.join(value.split())
+    if name == 'd':
+        return minify_path(value, precision)
+    if name in ('points',):
+        return _join(format_number(float(n), precision) for n in _NUMBER_RE.findall(value))
+    if name in ROUND_ATTRS:
+        try:
+            return format_number(float(value), precision)
+        except ValueError:
+            return value    # percentages and units
+    if name in COLOR_ATTRS:
+        return _short_color(value)
+    return value
+
+
+def _serialize(element, id_prefix, precision, out):
+    name = _local(element.tag)
+    attrs = []
+    for attr, value in element.attrib.items():
+        ns = _namespace(attr)
+        local = _local(attr)
+        if ns == XLINK_NS and local == 'href':
+            attr_name = 'xlink:href'
+        elif ns:
+            continue    # editor namespaces, xml:space
+        else:
+            attr_name = local
+        value = _minify_attr(local, value, precision)
+        if id_prefix:
+            if local == 'id':
+                value = f'{id_prefix}-{value}'
+            elif local == 'href' and value.startswith('#'):
+                value = f'#{id_prefix}-{value[1:]}'
+            else:
+                value = _URL_REF_RE.sub(lambda m: f'url(#{id_prefix}-{m.group(1)})', value)
+        attrs.append(f' {attr_name}={quoteattr(value)}')
+
+    out.append(f'<{name}{"".join(attrs)}')
+    text = ' '.join((element.text or '').split())
+    children = [c for c in element if _keep(c)]
+    if not text and not children:
+        out.append('/>')
+        return
+    out.append('>' + escape(text))
+    for child in children:
+        _serialize(child, id_prefix, precision, out)
+        tail = ' '.join((child.tail or '').split())
+        out.append(escape(tail))
+    out.append(f'</{name}>')
+
+
+def _keep(element):
+    return (isinstance(element.tag, str) and _namespace(element.tag) == SVG_NS
+            and _local(element.tag) not in DROP_ELEMENTS)
+
+
+def _body(root, id_prefix, precision):
+    out = []
+    for child in root:
+        if _keep(child):
+            _serialize(child, id_prefix, precision, out)
+    return ''.join(out)
+
+
+def _root_attrs(root, precision):
+    attrs = ''
+    for attr, value in root.attrib.items():
+        if _namespace(attr) or attr in ROOT_DROP:
+            continue
+        attrs += f' {attr}={quoteattr(_minify_attr(attr, value, precision))}'
+    return attrs
+
+
+def minify(data, precision=PRECISION):
+    """Validated, minified standalone SVG as bytes"""
+    root = parse(data)
+    svg = (f'<svg xmlns="{SVG_NS}"'
+           + (f' xmlns:xlink="{XLINK_NS}"' if XLINK_NS.encode() in data else '')
+           + f' viewBox="{view_box(root)}"'
+           + ''.join(f' {k}={quoteattr(root.get(k))}' for k in ('width', 'height') if root.get(k))
+           + _root_attrs(root, precision) + '>'
+           + _body(root, None, precision) + '</svg>')
+    return svg.encode('utf-8')
+
+
+def to_symbol(data, symbol_id, precision=PRECISION):
+    """Validated, minified <symbol> for a sprite; inner ids are prefixed with symbol_id"""
+    root = parse(data)
+    return (f'<symbol id={quoteattr(symbol_id)} viewBox="{view_box(root)}"'
+            + _root_attrs(root, precision) + '>'
+            + _body(root, symbol_id, precision) + '</symbol>')
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Asset Integrity Validator
+Checks every image under images/vehicles on a process pool:
+- PNG: walks all chunks and verifies each CRC, inflates the IDAT stream
+  and checks it holds exactly the bytes the header promises
+- JPEG: walks the marker segments, needs a frame header and an end marker
+- WebP: RIFF length must match the file, known VP8/VP8L/VP8X chunk
+- SVG: parsed as XML and validated with svg_tools
+Anything else (an HTML error page, a truncated body) is reported as bad.
+A file whose content does not match its extension is only a warning,
+since browsers sniff images anyway.
+
+Usage:
+    python3 validate_assets.py                      # summary, exit 1 if bad files
+    python3 validate_assets.py --report report.json
+    python3 validate_assets.py --quarantine         # move bad files to quarantine/
+"""
+
+import argparse
+import json
+import os
+import shutil
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import png_codec
+import svg_tools
+
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    except:
+        pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.path.join(BASE_DIR, 'images', 'vehicles')
+QUARANTINE_DIR = os.path.join(BASE_DIR, 'quarantine')
+
+IMAGE_EXTENSIONS = {'.png': 'PNG', '.jpg': 'JPEG', '.jpeg': 'JPEG', '.webp': 'WebP', '.svg': 'SVG'}
+
+# Adam7 passes: (x start, y start, x step, y step)
+_ADAM7 = [(0, 0, 8, 8), (4, 0, 8, 8), (0, 4, 4, 8), (2, 0, 4, 4), (0, 2, 2, 4), (1, 0, 2, 2), (0, 1, 1, 2)]
+
+
+class Invalid(Exception):
+    pass
+
+
+def sniff(data):
+    """Real content type from the first bytes"""
+    if png_codec.is_png(data):
+        return 'PNG'
+    if data[:3] == b'\xff\xd8\xff':
+        return 'JPEG'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'WebP'
+    head = data[:512].lstrip().lower()
+    if head.startswith(b'<!doctype html') or head.startswith(b'<html'):
+        return 'HTML'
+    if b'<svg' in head:
+        return 'SVG'
+    return 'unknown'
+
+
+def _expected_idat_size(info):
+    if not info.interlace:
+        return info.height * (info.stride + 1)
+    total = 0
+    for x0, y0, dx, dy in _ADAM7:
+        width = (info.width - x0 + dx - 1) // dx
+        height = (info.height - y0 + dy - 1) // dy
+        if width and height:
+            total += height * ((width * info.bits_per_pixel + 7) // 8 + 1)
+    return total
+
+
+def check_png(data):
+    try:
+        info = png_codec.PNGInfo(data)    # every chunk CRC, IHDR first, IEND present
+    except png_codec.PNGError as e:
+        raise Invalid(str(e))
+    if not info.width or not info.height:
+        raise Invalid('zero width or height')
+    if info.color_type == 3 and not info.palette:
+        raise Invalid('palette image without PLTE')
+
+    expected = _expected_idat_size(info)
+    inflater = zlib.decompressobj()
+    try:
+        # Cap the output so a bogus stream cannot blow up memory
+        raw = inflater.decompress(info.idat, expected + 1)
+    except zlib.error as e:
+        raise Invalid(f'bad IDAT stream: {e}')
+    if len(raw) != expected or not inflater.eof:
+        raise Invalid(f'IDAT holds {len(raw)}{"" if inflater.eof else "+ (unterminated)"} '
+                      f'bytes, header needs {expected}')
+    return f'{info.width}x{info.height}'
+
+
+def check_jpeg(data):
+    pos = 2
+    size = None
+    while True:
+        if pos + 4 > len(data):
+            raise Invalid('truncated before image data')
+        if data[pos] != 0xFF:
+            raise Invalid(f'bad marker at byte {pos}')
+        marker = data[pos + 1]
+        if marker == 0xFF:      # fill byte
+            pos += 1
+            continue
+        length, = struct.unpack('>H', data[pos + 2:pos + 4])
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            if pos + 9 > len(data):
+                raise Invalid('truncated frame header')
+            height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+            size = f'{width}x{height}'
+        if marker == 0xDA:      # start of scan: entropy-coded data follows
+            break
+        pos += 2 + length
+    if size is None:
+        raise Invalid('no frame header')
+    if data.rstrip(b'\x00')[-2:] != b'\xff\xd9':
+        raise Invalid('truncated (no end-of-image marker)')
+    return size
+
+
+def check_webp(data):
+    riff_size, = struct.unpack('<I', data[4:8])
+    if riff_size + 8 != len(data):
+        raise Invalid(f'RIFF says {riff_size + 8} bytes, file has {len(data)}')
+    if data[12:16] not in (b'VP8 ', b'VP8L', b'VP8X'):
+        raise Invalid(f'unknown WebP chunk {data[12:16]!r}')
+    return None
+
+
+def check_svg(data):
+    try:
+        root = svg_tools.parse(data)
+    except svg_tools.SVGError as e:
+        raise Invalid(str(e))
+    return svg_tools.view_box(root)
+
+
+CHECKS = {'PNG': check_png, 'JPEG': check_jpeg, 'WebP': check_webp, 'SVG': check_svg}
+
+
+def check_file(path):
+    """Worker: report entry for one file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    declared = IMAGE_EXTENSIONS[os.path.splitext(path)[1].lower()]
+    kind = sniff(data)
+    result = {
+        'file': os.path.relpath(path, BASE_DIR).replace(os.sep, '/'),
+        'size': len(data),
+        'declared': declared,
+        'detected': kind,
+        'status': 'ok',
+        'detail': None,
+    }
+    if not data:
+        result.update(status='bad', detail='empty file')
+        return result
+    if kind not in CHECKS:
+        result.update(status='bad', detail=f'{kind} content, not an image')
+        return result
+    try:
+        result['detail'] = CHECKS[kind](data)
+    except (Invalid, struct.error) as e:
+        result.update(status='bad', detail=str(e) or 'truncated')
+        return result
+    if kind != declared:
+        result.update(status='warn', detail=f'{kind} data in a .{path.rsplit(".", 1)[-1]} file')
+    return result
+
+
+def list_assets(directory=IMAGE_DIR):
+    """Every image file under directory, sorted"""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in files:
+            if not name.startswith('.') and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def quarantine(relpath):
+    """Move a bad file out of the served tree, keeping its relative path"""
+    dest = os.path.join(QUARANTINE_DIR, relpath)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    shutil.move(os.path.join(BASE_DIR, relpath), dest)
+    return os.path.relpath(dest, BASE_DIR).replace(os.sep, '/')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deep integrity check of images/vehicles')
+    parser.add_argument('--report', help='write the JSON report to this file')
+    parser.add_argument('--quarantine', action='store_true',
+                        help='move bad files to quarantine/ (outside the served tree)')
+    args = parser.parse_args()
+
+    print('=' * 60)
+    print('Asset Integrity Validator')
+    print('=' * 60)
+
+    files = list_assets()
+    with ProcessPoolExecutor() as pool:
+        results = list(pool.map(check_file, files, chunksize=8))
+
+    counts = {'ok': 0, 'warn': 0, 'bad': 0}
+    for r in results:
+        counts[r['status']] += 1
+        if r['status'] != 'ok':
+            print(f"  [{r['status'].upper()}] {r['file']}: {r['detail']}")
+
+    if args.quarantine:
+        for r in results:
+            if r['status'] == 'bad':
+                r['quarantined'] = quarantine(r['file'])
+                print(f"  [MOVED] {r['file']} -> {r['quarantined']}")
+
+    print(f"\nChecked {len(results)} files: {counts['ok']} ok, "
+          f"{counts['warn']} warnings, {counts['bad']} bad")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'summary': counts, 'files': results}, f, ensure_ascii=False, indent=2)
+        print(f'Report saved to: {args.report}')
+    print('=' * 60)
+
+    if counts['bad'] and not args.quarantine:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
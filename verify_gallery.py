@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Verification Gallery Generator
+Shared by download_icons.py and download_twemoji.py. Indexes the image
+directory with one os.scandir pass, then streams the gallery through a
+buffered writer: an index page (verify-<name>.html) with per-category
+counts, and one page per category (split further every PAGE_SIZE cards)
+under verify/<name>/. Thumbnails use loading="lazy" with a fixed size so
+pages stay responsive on an iPad with thousands of assets.
+
+Categories are the commented sections of the script's mapping table
+("# === Cars ==="), falling back to js/vehicles-data.js.
+"""
+
+import html
+import os
+import re
+
+from build_atlas import read_categories
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.path.join(BASE_DIR, 'images', 'vehicles')
+PAGES_DIR = os.path.join(BASE_DIR, 'verify')
+
+# Cards per page
+PAGE_SIZE = 200
+
+# Buffer size for the page writer
+WRITE_BUFFER = 64 * 1024
+
+# Images in no table section and not referenced by js/vehicles-data.js
+OTHER = 'other'
+
+_TABLE_KEY_RE = re.compile(r"""^\s*['"]([^'"]+)['"]\s*:""")
+_SECTION_RE = re.compile(r'^\s*#\s*(.+?)\s*$')
+
+STYLE = '''
+        body { font-family: Arial; padding: 20px; background: #f0f4f8; }
+        h1 { text-align: center; color: #333; }
+        .info { text-align: center; background: white; padding: 15px; border-radius: 10px; margin-bottom: 20px; }
+        .nav { text-align: center; margin: 15px 0; }
+        .nav a { display: inline-block; margin: 4px; padding: 8px 14px; background: white; border-radius: 8px; color: #333; text-decoration: none; }
+        .nav a.bad { background: #ffe0e0; }
+        .nav a.current { background: #4CAF50; color: white; }
+        .grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(140px, 1fr)); gap: 12px; }
+        .card { background: white; border-radius: 12px; padding: 12px; text-align: center; box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+                content-visibility: auto; contain-intrinsic-size: 140px 130px; }
+        .card img, .card .none { width: 72px; height: 72px; margin: 0 auto 8px; display: block; }
+        .card .none { background: #eee; border-radius: 10px; line-height: 72px; }
+        .card .en { font-size: 13px; font-weight: bold; color: #333; }
+        .card .zh { font-size: 12px; color: #666; margin-top: 4px; }
+        .card .file { font-size: 10px; color: #999; word-break: break-all; }
+        .card.missing { background: #ffe0e0; }
+        .card.ok { border: 2px solid #4CAF50; }
+'''
+
+
+def scan_images(directory=IMAGE_DIR):
+    """{filename: size} for every file, from a single directory scan"""
+    sizes = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file():
+                sizes[entry.name] = entry.stat().st_size
+    return sizes
+
+
+def read_sections(path, table):
+    """
+    {base name: section} from the comments inside a mapping table, e.g.
+        VEHICLE_ICONS = {
+            # === Cars ===
+            'suv.png': ...
+    Each key belongs to the last comment above it.
+    """
+    sections = {}
+    section = None
+    inside = False
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not inside:
+                inside = line.startswith(f'{table} = {{')
+                continue
+            if line.startswith('}'):
+                break
+            m = _SECTION_RE.match(line)
+            if m:
+                section = m.group(1).strip('= ')
+                continue
+            m = _TABLE_KEY_RE.match(line)
+            if m and section:
+                sections.setdefault(os.path.splitext(m.group(1))[0], section)
+    return sections
+
+
+def categorize(filenames, sections=None):
+    """
+    {filename: category} matched by base name: the table section if known,
+    else the js/vehicles-data.js category
+    """
+    by_stem = {}
+    for category, images in read_categories().items():
+        for image in images:
+            by_stem.setdefault(os.path.splitext(image)[0], category)
+    by_stem.update(sections or {})
+    return {name: by_stem.get(os.path.splitext(name)[0], OTHER) for name in filenames}
+
+
+def _page_name(category, number):
+    slug = re.sub(r'[^a-z0-9]+', '-', category.lower()).strip('-') or OTHER
+    return f'{slug}.html' if number == 1 else f'{slug}-{number}.html'
+
+
+def _head(out, title):
+    out.write('<!DOCTYPE html>\n<html>\n<head>\n    <meta charset="UTF-8">\n'
+              '    <meta name="viewport" content="width=device-width, initial-scale=1">\n'
+              f'    <title>{html.escape(title)}</title>\n    <style>{STYLE}    </style>\n'
+              f'</head>\n<body>\n    <h1>{html.escape(title)}</h1>\n')
+
+
+def _nav(out, pages, current, index_href):
+    out.write(f'    <div class="nav"><a href="{index_href}">Index</a>')
+    for category, number, href, missing in pages:
+        label = category if number == 1 else f'{category} {number}'
+        cls = 'current' if href == current else ('bad' if missing else '')
+        out.write(f'<a class="{cls}" href="{href}">{html.escape(label)}</a>')
+    out.write('</div>\n')
+
+
+def generate_gallery(name, title, entries, notes=(), min_size=1, sections=None):
+    """
+    Write the gallery for one download script
+    entries: [(filename, label, sublabel)]; a file smaller than min_size
+    bytes counts as missing. sections: read_sections() of the script's
+    table. Returns the index page path.
+    """
+    sizes = scan_images()
+    categories = categorize((filename for filename, _, _ in entries), sections)
+
+    grouped = {}
+    for entry in entries:
+        grouped.setdefault(categories[entry[0]], []).append(entry)
+
+    page_dir = os.path.join(PAGES_DIR, name)
+    os.makedirs(page_dir, exist_ok=True)
+    index_path = os.path.join(BASE_DIR, f'verify-{name}.html')
+    image_href = os.path.relpath(IMAGE_DIR, page_dir).replace(os.sep, '/')
+    index_href = os.path.relpath(index_path, page_dir).replace(os.sep, '/')
+
+    # (category, page number, file name, missing count) in table order
+    pages = []
+    chunks = []
+    for category in sorted(grouped, key=lambda c: c == OTHER):
+        items = grouped[category]
+        for start in range(0, len(items), PAGE_SIZE):
+            chunk = items[start:start + PAGE_SIZE]
+            missing = sum(1 for f, _, _ in chunk if sizes.get(f, 0) < min_size)
+            pages.append((category, start // PAGE_SIZE + 1,
+                          _page_name(category, start // PAGE_SIZE + 1), missing))
+            chunks.append(chunk)
+
+    written = set()
+    for (category, number, href, _), chunk in zip(pages, chunks):
+        path = os.path.join(page_dir, href)
+        written.add(href)
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as out:
+            _head(out, f'{title} - {category}')
+            _nav(out, pages, href, index_href)
+            out.write('    <div class="grid">\n')
+            for filename, label, sublabel in chunk:
+                ok = sizes.get(filename, 0) >= min_size
+                alt = html.escape(label, quote=True)
+                img = (f'<img src="{image_href}/{html.escape(filename, quote=True)}" alt="{alt}" '
+                       f'loading="lazy" decoding="async" width="72" height="72">'
+                       if ok else '<div class="none">?</div>')
+                out.write(f'        <div class="card {"ok" if ok else "missing"}">{img}'
+                          f'<div class="en">{html.escape(label)}</div>'
+                          f'<div class="zh">{html.escape(sublabel)}</div>'
+                          f'<div class="file">{html.escape(filename)}</div></div>\n')
+            out.write('    </div>\n')
+            _nav(out, pages, href, index_href)
+            out.write('</body>\n</html>\n')
+
+    # Pages left over from a bigger catalog
+    for stale in os.listdir(page_dir):
+        if stale.endswith('.html') and stale not in written:
+            os.remove(os.path.join(page_dir, stale))
+
+    total_missing = sum(p[3] for p in pages)
+    with open(index_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as out:
+        _head(out, title)
+        out.write('    <div class="info">\n')
+        for note in notes:
+            out.write(f'        <p>{note}</p>\n')
+        out.write(f'        <p>{len(entries)} assets, {total_missing} missing</p>\n    </div>\n')
+        out.write('    <div class="nav">')
+        for (category, number, href, missing), chunk in zip(pages, chunks):
+            label = category if number == 1 else f'{category} {number}'
+            extra = f', {missing} missing' if missing else ''
+            out.write(f'<a class="{"bad" if missing else ""}" href="verify/{name}/{href}">'
+                      f'{html.escape(label)} ({len(chunk)}{extra})</a>')
+        out.write('</div>\n</body>\n</html>\n')
+
+    return index_path